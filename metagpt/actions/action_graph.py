@@ -7,6 +7,14 @@
 """
 from __future__ import annotations
 
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from metagpt.logs import logger
+
 # from metagpt.actions.action_node import ActionNode
 
 
@@ -17,10 +25,14 @@ class ActionGraph:
         self.nodes = {}
         self.edges = {}
         self.execution_order = []
+        self.outputs: Dict[str, str] = {}  # node key -> output of its last run, the context of its next nodes
+        self.durations: Dict[str, float] = {}  # node key -> seconds of its last run
+        self.dirty = set()  # keys of the nodes to run
 
     def add_node(self, node):
         """Add a node to the graph"""
         self.nodes[node.key] = node
+        self.mark_dirty(node.key)
 
     def add_edge(self, from_node: "ActionNode", to_node: "ActionNode"):
         """Add an edge to the graph"""
@@ -29,21 +41,106 @@ class ActionGraph:
         self.edges[from_node.key].append(to_node.key)
         from_node.add_next(to_node)
         to_node.add_prev(from_node)
+        self.mark_dirty(to_node.key)
+
+    def mark_dirty(self, *keys: str):
+        """Mark the nodes and all their descendants to run again by the next `run`"""
+        queue = deque(keys)
+        while queue:
+            key = queue.popleft()
+            if key not in self.dirty:
+                self.dirty.add(key)
+                queue.extend(self.edges.get(key, []))
+
+    def levels(self) -> List[List[str]]:
+        """Group the nodes by topological level with Kahn's algorithm, a node only depends on the former levels"""
+        keys = list(dict.fromkeys([*self.nodes, *self.edges, *(k for targets in self.edges.values() for k in targets)]))
+        in_degree = {k: 0 for k in keys}
+        for targets in self.edges.values():
+            for k in targets:
+                in_degree[k] += 1
+
+        levels = []
+        level = [k for k in keys if in_degree[k] == 0]
+        while level:
+            levels.append(level)
+            next_level = []
+            for k in level:
+                for next_key in self.edges.get(k, []):
+                    in_degree[next_key] -= 1
+                    if in_degree[next_key] == 0:
+                        next_level.append(next_key)
+            level = next_level
+
+        if sum(len(i) for i in levels) != len(keys):
+            raise ValueError(f"ActionGraph has a cycle among {[k for k in keys if in_degree[k] > 0]}")
+        return levels
 
     def topological_sort(self):
         """Topological sort the graph"""
-        visited = set()
-        stack = []
+        self.execution_order = [k for level in self.levels() for k in level]
+
+    async def run(self, context: str, llm, max_concurrency: int = 8, **kwargs) -> ActionGraph:
+        """Fill the dirty nodes level by level, the nodes of a level concurrently.
+
+        A node is filled with the context and the outputs of its previous nodes, so after `mark_dirty` only the
+        changed subgraph runs again and the other nodes keep their outputs. If a node fails or the run is cancelled,
+        the running nodes are cancelled and the unfinished ones stay dirty for the next run.
+
+        :param context: Everything the nodes should know.
+        :param llm: Large Language Model to fill the nodes.
+        :param max_concurrency: The number of nodes filled at a time.
+        :param kwargs: Passed to `ActionNode.fill`.
+        :return: self
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _run(key: str):
+            node = self.nodes[key]
+            prev_outputs = [
+                f"## {prev.key}\n{self.outputs[prev.key]}" for prev in node.prevs if prev.key in self.outputs
+            ]
+            async with semaphore:
+                start = time.perf_counter()
+                await node.fill(context="\n\n".join([context, *prev_outputs]), llm=llm, **kwargs)
+                self.durations[key] = time.perf_counter() - start
+            ic = node.instruct_content
+            self.outputs[key] = json.dumps(ic.model_dump(), ensure_ascii=False) if ic else node.content
+            self.dirty.discard(key)
+
+        levels = self.levels()
+        self.execution_order = [k for level in levels for k in level]
+        for level in levels:
+            tasks = [asyncio.create_task(_run(k)) for k in level if k in self.dirty and k in self.nodes]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
 
-        def visit(k):
-            if k not in visited:
-                visited.add(k)
-                if k in self.edges:
-                    for next_node in self.edges[k]:
-                        visit(next_node)
-                stack.insert(0, k)
+        path, seconds = self.critical_path()
+        logger.info(f"ActionGraph critical path: {' -> '.join(path)}, {seconds:.3f}s")
+        return self
 
-        for key in self.nodes:
-            visit(key)
+    def critical_path(self) -> Tuple[List[str], float]:
+        """The path with the longest total duration of the last runs, the lower bound of a run of the whole graph"""
+        longest: Dict[str, Tuple[float, Optional[str]]] = {}  # key -> (seconds of the longest path to it, prev key)
+        for k in self.execution_order:
+            longest.setdefault(k, (0.0, None))
+            seconds = longest[k][0] + self.durations.get(k, 0.0)
+            longest[k] = (seconds, longest[k][1])
+            for next_key in self.edges.get(k, []):
+                if next_key not in longest or longest[next_key][0] < seconds:
+                    longest[next_key] = (seconds, k)
+        if not longest:
+            return [], 0.0
 
-        self.execution_order = stack
+        key = max(longest, key=lambda k: longest[k][0])
+        seconds = longest[key][0]
+        path = []
+        while key is not None:
+            path.append(key)
+            key = longest[key][1]
+        return path[::-1], seconds
@@ -8,21 +8,38 @@
 NOTE: You should use typing.List instead of list to do type annotation. Because in the markdown extraction process,
   we can use typing to extract the type of the node, but we cannot use built-in list to extract.
 """
+import asyncio
+import contextlib
 import json
 import typing
+from collections import OrderedDict
 from enum import Enum
+from graphlib import TopologicalSorter
 from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 from pydantic import BaseModel, Field, create_model, model_validator
-from tenacity import retry, stop_after_attempt, wait_random_exponential
-
-from metagpt.actions.action_outcls_registry import register_action_outcls
+from tenacity import (
+    AsyncRetrying,
+    retry,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from metagpt.actions.action_outcls_registry import (
+    exact_key,
+    get_model_json_schema,
+    register_action_outcls,
+)
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.llm import BaseLLM
-from metagpt.logs import logger
+from metagpt.logs import logger, observe_llm_stream
 from metagpt.provider.postprocess.llm_output_postprocess import llm_output_postprocess
 from metagpt.utils.common import OutputParser, general_after_log
 from metagpt.utils.human_interaction import HumanInteraction
+from metagpt.utils.llm_response_cache import LLMCacheMissError, bypass_cached_responses
+from metagpt.utils.stream_json_parser import StreamJSONParser
 
 
 class ReviewMode(Enum):
@@ -38,6 +55,10 @@ class ReviseMode(Enum):
 
 TAG = "CONTENT"
 
+# compiled instructions and examples of the node trees, keyed by their structure
+COMPILED_PROMPTS_CACHE_SIZE = 1024
+_compiled_prompts: OrderedDict[tuple, str] = OrderedDict()
+
 LANGUAGE_CONSTRAINT = "Language: Please use the same language as Human INPUT."
 FORMAT_CONSTRAINT = f"Format: output wrapped inside [{TAG}][/{TAG}] like format example, nothing else."
 
@@ -166,6 +187,7 @@ class ActionNode:
         self.schema = schema
         self.prevs = []
         self.nexts = []
+        self._failed_prompts = set()  # prompts whose last response failed, not to get it from the cache again
 
     def __str__(self):
         return (
@@ -347,10 +369,30 @@ class ActionNode:
         text = self.compile_to(nodes, schema, kv_sep)
         return self.tagging(text, schema, tag)
 
+    def _compile_f_cached(self, kind, schema, mode, tag, format_func, kv_sep, exclude=None) -> str:
+        """_compile_f, cached by the structure of the node tree, so a tree is compiled once"""
+        key = (kind, self.structure_key(), schema, mode, tag, tuple(exclude or []))
+        if key not in _compiled_prompts:
+            _compiled_prompts[key] = self._compile_f(schema, mode, tag, format_func, kv_sep, exclude=exclude)
+            if len(_compiled_prompts) > COMPILED_PROMPTS_CACHE_SIZE:
+                _compiled_prompts.popitem(last=False)
+        _compiled_prompts.move_to_end(key)
+        return _compiled_prompts[key]
+
+    def structure_key(self) -> typing.Hashable:
+        """Hashable key of the node tree, equal for the trees rendering the same keys, types, instructions and examples"""
+        return (
+            self.key,
+            repr(self.expected_type),
+            self.instruction,
+            exact_key(self.example),
+            tuple(child.structure_key() for child in self.children.values()),
+        )
+
     def compile_instruction(self, schema="markdown", mode="children", tag="", exclude=None) -> str:
         """compile to raw/json/markdown template with all/root/children nodes"""
         format_func = lambda i: f"{i.expected_type}  # {i.instruction}"
-        return self._compile_f(schema, mode, tag, format_func, kv_sep=": ", exclude=exclude)
+        return self._compile_f_cached("instruction", schema, mode, tag, format_func, kv_sep=": ", exclude=exclude)
 
     def compile_example(self, schema="json", mode="children", tag="", exclude=None) -> str:
         """compile to raw/json/markdown examples with all/root/children nodes"""
@@ -358,7 +400,7 @@ class ActionNode:
         # 这里不能使用f-string，因为转译为str后再json.dumps会额外加上引号，无法作为有效的example
         # 错误示例："File list": "['main.py', 'const.py', 'game.py']", 注意这里值不是list，而是str
         format_func = lambda i: i.example
-        return self._compile_f(schema, mode, tag, format_func, kv_sep="\n", exclude=exclude)
+        return self._compile_f_cached("example", schema, mode, tag, format_func, kv_sep="\n", exclude=exclude)
 
     def compile(self, context, schema="json", mode="children", template=SIMPLE_TEMPLATE, exclude=[]) -> str:
         """
@@ -404,6 +446,8 @@ class ActionNode:
     @retry(
         wait=wait_random_exponential(min=1, max=20),
         stop=stop_after_attempt(6),
+        # replaying the same responses again wouldn't help
+        retry=retry_if_exception_type() & retry_if_not_exception_type(LLMCacheMissError),
         after=general_after_log(logger),
     )
     async def _aask_v1(
@@ -415,21 +459,39 @@ class ActionNode:
         system_msgs: Optional[list[str]] = None,
         schema="markdown",  # compatible to original format
         timeout=USE_CONFIG_TIMEOUT,
+        fail_fast: bool = False,
     ) -> (str, BaseModel):
-        """Use ActionOutput to wrap the output of aask"""
-        content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
-        logger.debug(f"llm raw output:\n{content}")
-        output_class = self.create_model_class(output_class_name, output_data_mapping)
+        """Use ActionOutput to wrap the output of aask
 
-        if schema == "json":
-            parsed_data = llm_output_postprocess(
-                output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
-            )
-        else:  # using markdown parser
-            parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
-
-        logger.debug(f"parsed_data:\n{parsed_data}")
-        instruct_content = output_class(**parsed_data)
+        If fail_fast, the fields of a streamed json output are validated as soon as each of them completes, and the
+        stream is aborted on the first invalid one instead of waiting for the full output.
+        A retry after a failure doesn't take the response from the LLM response cache, which would return the same
+        response again. In replay mode, which can only return cached responses, the retry raises LLMCacheMissError.
+        """
+        output_class = self.create_model_class(output_class_name, output_data_mapping)
+        try:
+            with bypass_cached_responses() if prompt in self._failed_prompts else contextlib.nullcontext():
+                if fail_fast and schema == "json":
+                    parser = StreamJSONParser(output_class, start_tag=f"[{TAG}]")
+                    with observe_llm_stream(parser.feed):
+                        content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+                else:
+                    content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+            logger.debug(f"llm raw output:\n{content}")
+
+            if schema == "json":
+                parsed_data = llm_output_postprocess(
+                    output=content, schema=get_model_json_schema(output_class), req_key=f"[/{TAG}]"
+                )
+            else:  # using markdown parser
+                parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
+
+            logger.debug(f"parsed_data:\n{parsed_data}")
+            instruct_content = output_class(**parsed_data)
+        except Exception:
+            self._failed_prompts.add(prompt)
+            raise
+        self._failed_prompts.discard(prompt)
         return content, instruct_content
 
     def get(self, key):
@@ -447,14 +509,20 @@ class ActionNode:
         self.set_recursive("context", context)
 
     async def simple_fill(
-        self, schema, mode, images: Optional[Union[str, list[str]]] = None, timeout=USE_CONFIG_TIMEOUT, exclude=None
+        self,
+        schema,
+        mode,
+        images: Optional[Union[str, list[str]]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+        exclude=None,
+        fail_fast: bool = False,
     ):
         prompt = self.compile(context=self.context, schema=schema, mode=mode, exclude=exclude)
         if schema != "raw":
             mapping = self.get_mapping(mode, exclude=exclude)
             class_name = f"{self.key}_AN"
             content, scontent = await self._aask_v1(
-                prompt, class_name, mapping, images=images, schema=schema, timeout=timeout
+                prompt, class_name, mapping, images=images, schema=schema, timeout=timeout, fail_fast=fail_fast
             )
             self.content = content
             self.instruct_content = scontent
@@ -474,6 +542,9 @@ class ActionNode:
         images: Optional[Union[str, list[str]]] = None,
         timeout=USE_CONFIG_TIMEOUT,
         exclude=[],
+        fail_fast: bool = False,
+        max_concurrency: int = 1,
+        child_retries: int = 1,
     ):
         """Fill the node(s) with mode.
 
@@ -493,6 +564,11 @@ class ActionNode:
         :param images: the list of image url or base64 for gpt4-v
         :param timeout: Timeout for llm invocation.
         :param exclude: The keys of ActionNode to exclude.
+        :param fail_fast: Validate the fields of a streamed json output as soon as each of them completes, and abort the
+            stream on the first invalid one.
+        :param max_concurrency: complex only, the number of children filled at a time, a child waits for its
+            previous nodes among the children.
+        :param child_retries: complex only, the times to fill a child before its failure is raised.
         :return: self
         """
         self.set_llm(llm)
@@ -501,19 +577,62 @@ class ActionNode:
             schema = self.schema
 
         if strgy == "simple":
-            return await self.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
+            return await self.simple_fill(
+                schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude, fail_fast=fail_fast
+            )
         elif strgy == "complex":
             # 这里隐式假设了拥有children
-            tmp = {}
-            for _, i in self.children.items():
-                if exclude and i.key in exclude:
-                    continue
-                child = await i.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
-                tmp.update(child.instruct_content.model_dump())
+            tmp = await self._fill_children(
+                max_concurrency=max_concurrency,
+                child_retries=child_retries,
+                schema=schema,
+                mode=mode,
+                images=images,
+                timeout=timeout,
+                exclude=exclude,
+                fail_fast=fail_fast,
+            )
             cls = self._create_children_class()
             self.instruct_content = cls(**tmp)
             return self
 
+    async def _fill_children(self, max_concurrency: int = 1, child_retries: int = 1, exclude=None, **kwargs) -> dict:
+        """Fill each child with simple_fill, at most max_concurrency of them at a time.
+
+        A child only waits for its previous nodes (ActionGraph edges) among the children, and is filled again when
+        it fails, up to child_retries times in total. The outputs are merged in the order of the children.
+        """
+        children = {key: child for key, child in self.children.items() if not (exclude and key in exclude)}
+        graph = {key: [prev.key for prev in child.prevs if prev.key in children] for key, child in children.items()}
+        order = list(TopologicalSorter(graph).static_order())  # raises CycleError on circular dependencies
+        semaphore = asyncio.Semaphore(max_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def _fill(key: str) -> dict:
+            await asyncio.gather(*[tasks[prev] for prev in graph[key]])
+            async with semaphore:
+                async for attempt in AsyncRetrying(
+                    stop=stop_after_attempt(child_retries), after=general_after_log(logger), reraise=True
+                ):
+                    with attempt:
+                        child = await children[key].simple_fill(exclude=exclude, **kwargs)
+            return child.instruct_content.model_dump()
+
+        for key in order:
+            tasks[key] = asyncio.create_task(_fill(key))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        tmp = {}
+        for key in children:
+            tmp.update(tasks[key].result())
+        return tmp
+
     async def human_review(self) -> dict[str, str]:
         review_comments = HumanInteraction().interact_with_instruct_content(
             instruct_content=self.instruct_content, interact_type="review"
@@ -562,7 +681,7 @@ class ActionNode:
         output_class_name = f"{self.key}_AN_REVIEW"
         output_class = self.create_class(class_name=output_class_name, exclude=exclude_keys)
         parsed_data = llm_output_postprocess(
-            output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
+            output=content, schema=get_model_json_schema(output_class), req_key=f"[/{TAG}]"
         )
         instruct_content = output_class(**parsed_data)
         return instruct_content.model_dump()
@@ -3,9 +3,48 @@
 # @Desc   : registry to store Dynamic Model from ActionNode.create_model_class to keep it as same Class
 #           with same class name and mapping
 
-from functools import wraps
+import typing
+from functools import lru_cache, wraps
+
+from pydantic.fields import FieldInfo
 
 action_outcls_registry = dict()
+FIELD_INFO_ATTRIBUTES = tuple(name for name in FieldInfo.__slots__ if not name.startswith("_"))
+
+
+def structural_key(obj) -> typing.Hashable:
+    """
+    Hashable key of obj, equal for the objects with the same structure, such as
+        {"field": (List[str], Field(default=[], description="desc"))}
+        {"field": (list[str], Field(default=[], description="desc"))}
+    """
+    if isinstance(obj, dict):
+        return tuple((k, structural_key(v)) for k, v in sorted(obj.items(), key=lambda i: str(i[0])))
+    if isinstance(obj, (list, tuple, set)):
+        items = [structural_key(i) for i in obj]
+        return (type(obj).__name__, tuple(sorted(items, key=repr) if isinstance(obj, set) else items))
+    if isinstance(obj, FieldInfo):  # every attribute, such as default_factory or the constraints in metadata
+        return "FieldInfo", tuple((name, structural_key(getattr(obj, name))) for name in FIELD_INFO_ATTRIBUTES)
+    origin = typing.get_origin(obj)
+    if origin is not None:  # eliminate typing influence, List[str] is list[str]
+        return origin, structural_key(typing.get_args(obj))
+    return exact_key(obj)
+
+
+def exact_key(obj) -> typing.Hashable:
+    """
+    Hashable key of obj, equal only for the objects rendered the same, keeping the order of dicts and the types of
+    the values, so that 1 and True or List[str] and list[str] have different keys
+    """
+    if isinstance(obj, dict):
+        return "dict", tuple((exact_key(k), exact_key(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj).__name__, tuple(exact_key(i) for i in obj)
+    try:
+        hash(obj)
+        return type(obj), obj
+    except TypeError:
+        return type(obj), repr(obj)
 
 
 def register_action_outcls(func):
@@ -21,16 +60,7 @@ def register_action_outcls(func):
             [<class 'metagpt.actions.action_node.ActionNode'>, 'test', {'field': (str, Ellipsis)}]
         """
         arr = list(args) + list(kwargs.values())
-        """
-        outcls_id example
-            "<class 'metagpt.actions.action_node.ActionNode'>_test_{'field': (str, Ellipsis)}"
-        """
-        for idx, item in enumerate(arr):
-            if isinstance(item, dict):
-                arr[idx] = dict(sorted(item.items()))
-        outcls_id = "_".join([str(i) for i in arr])
-        # eliminate typing influence
-        outcls_id = outcls_id.replace("typing.List", "list").replace("typing.Dict", "dict")
+        outcls_id = structural_key(arr)
 
         if outcls_id in action_outcls_registry:
             return action_outcls_registry[outcls_id]
@@ -40,3 +70,9 @@ def register_action_outcls(func):
         return out_cls
 
     return decorater
+
+
+@lru_cache(maxsize=None)
+def get_model_json_schema(outcls) -> dict:
+    """The model_json_schema of a registered class, generated once. Don't modify the returned schema."""
+    return outcls.model_json_schema()
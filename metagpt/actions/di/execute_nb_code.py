@@ -6,10 +6,13 @@
 """
 from __future__ import annotations
 
+import ast
 import asyncio
 import base64
+import json
+import random
 import re
-from typing import Literal, Tuple
+from typing import List, Literal, Optional, Tuple
 
 import nbformat
 from nbclient import NotebookClient
@@ -25,6 +28,93 @@ from rich.syntax import Syntax
 
 from metagpt.actions import Action
 from metagpt.logs import logger
+from metagpt.utils.kernel_pool import KernelPool, execute_silently, get_kernel_pool
+
+# Defined and called in the kernel by ExecuteNbCode.run_candidates. "start" forks a child of the kernel process for each
+# candidate, which runs it sharing the state of the kernel copy-on-write without changing it and reports through a pipe.
+# "collect" waits for the first successful child if asked, and kills the others. "seed" seeds the random generators, as
+# in the children, before a successful candidate is run again in the kernel.
+CANDIDATES_CODE = """
+def _metagpt_candidates(action, seed, codes=(), timeout=0, keep_len=0, wait=False):
+    import ast, asyncio, io, json, os, random, select, signal, sys, time, traceback
+    from IPython import get_ipython
+
+    def set_seed():
+        random.seed(seed)
+        if "numpy" in sys.modules:
+            sys.modules["numpy"].random.seed(seed)
+
+    shell = get_ipython()
+    if action == "seed":
+        set_seed()
+        return
+    if action == "start":
+        children = {}  # read fd -> (candidate index, pid)
+        for i, code in enumerate(codes):
+            r, w = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(r)
+                signal.alarm(int(timeout) + 1)  # not to outlive its timeout if never collected
+                # the kernel's sockets belong to the parent
+                shell.display_pub.publish = lambda *args, **kwargs: None
+                asyncio.events._set_running_loop(None)
+                sys.stdout = sys.stderr = out = io.StringIO()
+                set_seed()
+                success = True
+                try:
+                    code = compile(shell.transform_cell(code), "<candidate>", "exec", flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+                    result = eval(code, shell.user_ns)
+                    if asyncio.iscoroutine(result):
+                        asyncio.new_event_loop().run_until_complete(result)
+                except BaseException:
+                    success = False
+                    error_type, error, tb = sys.exc_info()
+                    traceback.print_exception(error_type, error, tb.tb_next, file=out)  # without this function
+                output = out.getvalue()
+                with os.fdopen(w, "w") as f:
+                    f.write(json.dumps([success, output[:keep_len] if success else output[-keep_len:]]))
+                os._exit(0)
+            os.close(w)
+            children[r] = (i, pid)
+        shell._metagpt_children = (children, time.monotonic() + timeout)
+        set_seed()
+        return len(children)
+
+    children, deadline = shell._metagpt_children
+    del shell._metagpt_children
+    outputs = ["Not finished, another candidate succeeded first"] * len(children)
+    buffers = {r: b"" for r in children}
+    winner = -1
+    while wait and buffers and winner < 0:
+        ready, _, _ = select.select(list(buffers), [], [], max(deadline - time.monotonic(), 0))
+        if not ready:
+            for r in buffers:
+                outputs[children[r][0]] = "Cell execution timed out"
+            break
+        for r in ready:
+            chunk = os.read(r, 65536)
+            if chunk:
+                buffers[r] += chunk
+                continue
+            try:
+                success, output = json.loads(buffers.pop(r))
+            except ValueError:
+                success = False
+                output = "Cell execution timed out" if time.monotonic() >= deadline else "The candidate exited early"
+            outputs[children[r][0]] = output
+            if success and winner < 0:
+                winner = children[r][0]
+    for r, (i, pid) in children.items():
+        os.close(r)
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+    return json.dumps([winner, outputs])
+"""
+CANDIDATE_TIMEOUT = 120  # seconds to wait for the code candidates run in forks of the kernel
 
 
 class ExecuteNbCode(Action):
@@ -35,11 +125,13 @@ class ExecuteNbCode(Action):
     console: Console
     interaction: str
     timeout: int = 600
+    kernel_pool: Optional[KernelPool] = None  # take kernels from the pool, defaults to the pool of config.kernel_pool
 
     def __init__(
         self,
         nb=nbformat.v4.new_notebook(),
         timeout=600,
+        kernel_pool: Optional[KernelPool] = None,
     ):
         super().__init__(
             nb=nb,
@@ -47,17 +139,32 @@ class ExecuteNbCode(Action):
             timeout=timeout,
             console=Console(),
             interaction=("ipython" if self.is_ipython() else "terminal"),
+            kernel_pool=kernel_pool,
         )
 
+    def warm_up(self):
+        """Start the kernels of the kernel pool, if enabled, to have one ready by the first cell."""
+        self.kernel_pool = self.kernel_pool or get_kernel_pool(self.config.kernel_pool)
+
     async def build(self):
         if self.nb_client.kc is None or not await self.nb_client.kc.is_alive():
-            self.nb_client.create_kernel_manager()
-            self.nb_client.start_new_kernel()
-            self.nb_client.start_new_kernel_client()
+            self.warm_up()
+            if self.kernel_pool is not None:
+                if self.nb_client.km is not None:  # the dead kernel
+                    await self.terminate()
+                self.nb_client.km, self.nb_client.kc = await self.kernel_pool.acquire()
+            else:
+                self.nb_client.create_kernel_manager()
+                self.nb_client.start_new_kernel()
+                self.nb_client.start_new_kernel_client()
 
     async def terminate(self):
         """kill NotebookClient"""
-        if self.nb_client.km is not None and await self.nb_client.km.is_alive():
+        if self.kernel_pool is not None and self.nb_client.km is not None:
+            await self.kernel_pool.release(self.nb_client.km, self.nb_client.kc)
+            self.nb_client.kc = None
+            self.nb_client.km = None
+        elif self.nb_client.km is not None and await self.nb_client.km.is_alive():
             await self.nb_client.km.shutdown_kernel(now=True)
             await self.nb_client.km.cleanup_resources()
 
@@ -79,9 +186,11 @@ class ExecuteNbCode(Action):
         """reset NotebookClient"""
         await self.terminate()
 
-        # sleep 1s to wait for the kernel to be cleaned up completely
-        await asyncio.sleep(1)
-        await self.build()
+        if self.kernel_pool is None:
+            # sleep 1s to wait for the kernel to be cleaned up completely
+            await asyncio.sleep(1)
+            await self.build()
+        # with a kernel pool, the next run takes a warm kernel without waiting for the released one
         self.nb_client = NotebookClient(self.nb, timeout=self.timeout)
 
     def add_code_cell(self, code: str):
@@ -187,6 +296,70 @@ class ExecuteNbCode(Action):
         except Exception:
             return self.parse_outputs(self.nb.cells[-1].outputs)
 
+    async def run_candidates(
+        self, codes: List[str], timeout: int = CANDIDATE_TIMEOUT, keep_len: int = 2000
+    ) -> Tuple[int, str, bool]:
+        """
+        Run the first code candidate in the kernel and the others in parallel, each in a fork of the kernel taken
+        before, without changing the state of the kernel. If the first candidate fails, the first one succeeding in
+        its fork within `timeout` seconds is run again in the kernel, with the random generators seeded as in the
+        fork. The forks need a kernel supporting os.fork, e.g. on Linux, otherwise only the first candidate runs.
+        returns the index of the candidate run last in the kernel, its output, and whether it succeeded in the kernel.
+
+        The candidate run again may not find the state of its fork: it runs after the failed first candidate, whose
+        changes before the error, such as a column dropped in place, are kept in the kernel. Only the memory of the
+        forks is isolated, the files they write, even before being killed, are shared with the kernel and each other.
+        So a candidate succeeding in its fork may still fail in the kernel, which is logged as a warning.
+        """
+        timeout = min(timeout, self.timeout)
+        seed = random.randrange(2**32)
+        await self.build()
+        forked = len(codes) > 1
+        if forked:
+            try:
+                await self._run_candidates_code("start", seed, codes[1:], timeout, keep_len=keep_len)
+            except (RuntimeError, TimeoutError) as e:
+                logger.warning(f"Run the first code candidate only: {e}")
+                forked = False
+
+        output, success = await self.run(codes[0])
+        if not forked:
+            return 0, output, success
+        try:
+            winner, outputs = json.loads(
+                await self._run_candidates_code("collect", seed, timeout=timeout, wait=not success)
+            )
+        except (RuntimeError, TimeoutError) as e:
+            logger.warning(f"Failed to collect the code candidates: {e}")
+            return 0, output, success
+        if success or winner < 0:
+            return 0, output, success
+
+        index = winner + 1
+        logger.warning(f"Code candidate {index} runs again in a kernel the failed first candidate may have changed")
+        await self._run_candidates_code("seed", seed)
+        output, success = await self.run(codes[index])
+        if not success:
+            logger.warning(f"Code candidate {index} succeeded in its fork of the kernel but failed in the kernel")
+        return index, output, success
+
+    async def _run_candidates_code(self, action: str, seed: int, codes: List[str] = (), timeout: int = 0, **kwargs):
+        args = ", ".join(f"{k}={v!r}" for k, v in dict(codes=list(codes), timeout=timeout, **kwargs).items())
+        content = await execute_silently(
+            self.nb_client.kc,
+            f"{CANDIDATES_CODE}\n_metagpt_result = _metagpt_candidates({action!r}, {seed}, {args})",
+            timeout=timeout + 60,
+            user_expressions={
+                "result": "globals().pop('_metagpt_result')",
+                "_": "globals().pop('_metagpt_candidates')",
+            },
+        )
+        result = content.get("user_expressions", {}).get("result", {})
+        if content["status"] != "ok" or result.get("status") != "ok":
+            error = result.get("evalue") or content.get("evalue")
+            raise RuntimeError(f"Failed to {action} the code candidates in the kernel: {error}")
+        return ast.literal_eval(result["data"]["text/plain"])
+
     async def run(self, code: str, language: Literal["python", "markdown"] = "python") -> Tuple[str, bool]:
         """
         return the output of code execution, and a success indicator (bool) of code execution.
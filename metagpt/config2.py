@@ -13,6 +13,8 @@ from pydantic import BaseModel, model_validator
 
 from metagpt.configs.browser_config import BrowserConfig
 from metagpt.configs.embedding_config import EmbeddingConfig
+from metagpt.configs.http_pool_config import HTTPPoolConfig
+from metagpt.configs.kernel_pool_config import KernelPoolConfig
 from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.configs.mermaid_config import MermaidConfig
 from metagpt.configs.redis_config import RedisConfig
@@ -54,10 +56,14 @@ class Config(CLIParams, YamlModel):
     # Global Proxy. Will be used if llm.proxy is not set
     proxy: str = ""
 
+    # Pooled HTTP sessions
+    http_pool: HTTPPoolConfig = HTTPPoolConfig()
+
     # Tool Parameters
     search: SearchConfig = SearchConfig()
     browser: BrowserConfig = BrowserConfig()
     mermaid: MermaidConfig = MermaidConfig()
+    kernel_pool: KernelPoolConfig = KernelPoolConfig()
 
     # Storage Parameters
     s3: Optional[S3Config] = None
@@ -35,6 +35,9 @@ class EmbeddingConfig(YamlModel):
     base_url: "YOU_BASE_URL"
     model: "YOU_MODEL"
     dimensions: "YOUR_MODEL_DIMENSIONS"
+
+    cache: true  # optional for all types, cache embeddings on disk to avoid re-embedding unchanged text
+    cache_path: "YOUR_CACHE_FILE"
     """
 
     api_type: Optional[EmbeddingType] = None
@@ -46,6 +49,10 @@ class EmbeddingConfig(YamlModel):
     embed_batch_size: Optional[int] = None
     dimensions: Optional[int] = None  # output dimension of embedding model
 
+    cache: bool = False  # cache embeddings in SQLite, keyed by model name and text hash
+    cache_path: Optional[str] = None  # default to workspace/embedding_cache.db
+    cache_max_entries: int = 100000  # least recently used embeddings are evicted beyond it
+
     @field_validator("api_type", mode="before")
     @classmethod
     def check_api_type(cls, v):
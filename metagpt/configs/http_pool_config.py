@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : http_pool_config.py
+"""
+from metagpt.utils.yaml_model import YamlModel
+
+
+class HTTPPoolConfig(YamlModel):
+    """Config for the pooled aiohttp sessions of ahttp_client and the general API providers"""
+
+    limit: int = 100  # total number of simultaneous connections, 0 for no limit
+    limit_per_host: int = 0  # simultaneous connections to the same host, such as a LLM provider, 0 for no limit
+    keepalive_timeout: float = 30  # seconds an idle connection is kept alive
@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : kernel_pool_config.py
+"""
+from typing import List
+
+from metagpt.utils.yaml_model import YamlModel
+
+
+class KernelPoolConfig(YamlModel):
+    """Config for the pool of warm Jupyter kernels used by ExecuteNbCode"""
+
+    size: int = 0  # number of kernels kept warm, 0 to start a kernel on demand
+    preload_modules: List[str] = ["numpy", "pandas", "sklearn"]  # imported by the warm kernels
@@ -6,7 +6,7 @@
 @File    : llm_config.py
 """
 from enum import Enum
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import field_validator
 
@@ -90,6 +90,15 @@ class LLMConfig(YamlModel):
     # Cost Control
     calc_usage: bool = True
 
+    # Rate Limit, the budgets of the requests and input tokens per minute shared by the same model, 0 means unlimited
+    rpm: int = 0
+    tpm: int = 0
+
+    # Response Cache, "off", "read_write", "record" or "replay", see `metagpt.utils.llm_response_cache`
+    response_cache: Literal["off", "read_write", "record", "replay"] = "off"
+    response_cache_path: Optional[str] = None  # default to workspace/llm_response_cache.db
+    response_cache_ttl: int = 0  # seconds, 0 means never expire
+
     @field_validator("api_key")
     @classmethod
     def check_llm_key(cls, v):
@@ -5,11 +5,14 @@
 @Author  : alexanderwu
 @File    : context.py
 """
+import asyncio
+import copy
+import json
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from metagpt.config2 import Config
 from metagpt.configs.llm_config import LLMConfig, LLMType
@@ -24,6 +27,13 @@ from metagpt.utils.git_repository import GitRepository
 from metagpt.utils.project_repo import ProjectRepo
 
 
+def _get_running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
 class AttrDict(BaseModel):
     """A dict-like object that allows access to keys as attributes, compatible with Pydantic."""
 
@@ -70,6 +80,10 @@ class Context(BaseModel):
     cost_manager: CostManager = CostManager()
 
     _llm: Optional[BaseLLM] = None
+    # (llm config, id of the event loop) -> (event loop, llm), the loop is kept to detect when it's closed
+    _llm_cache: Dict[Tuple[str, int], Tuple[Optional[asyncio.AbstractEventLoop], BaseLLM]] = PrivateAttr(
+        default_factory=dict
+    )
 
     def new_environ(self):
         """Return a new os.environ object"""
@@ -88,21 +102,46 @@ class Context(BaseModel):
             return self.cost_manager
 
     def llm(self) -> BaseLLM:
-        """Return a LLM instance, fixme: support cache"""
-        # if self._llm is None:
-        self._llm = create_llm_instance(self.config.llm)
-        if self._llm.cost_manager is None:
-            self._llm.cost_manager = self._select_costmanager(self.config.llm)
+        """Return a LLM instance, the client is shared with other instances of the same llm config"""
+        self._llm = self.llm_with_cost_manager_from_llm_config(self.config.llm)
         return self._llm
 
     def llm_with_cost_manager_from_llm_config(self, llm_config: LLMConfig) -> BaseLLM:
-        """Return a LLM instance, fixme: support cache"""
-        # if self._llm is None:
-        llm = create_llm_instance(llm_config)
+        """Return a LLM instance, the client is shared with other instances of the same llm config"""
+        llm = self._get_or_create_llm(llm_config)
         if llm.cost_manager is None:
             llm.cost_manager = self._select_costmanager(llm_config)
         return llm
 
+    def _get_or_create_llm(self, llm_config: LLMConfig) -> BaseLLM:
+        """Return a shallow copy of the cached instance of llm_config in the running event loop.
+
+        The copies share the client and its connection pool, which are kept per event loop as they are bound to the
+        loop using them. The attributes set by callers, such as `system_prompt`, stay per copy, and a cost manager
+        created by the provider is copied too, so that the copies don't add up their costs. Without a running loop,
+        such as for the roles created before `asyncio.run`, a new instance is returned, as the loops using its client
+        are unknown.
+        """
+        loop = _get_running_loop()
+        if loop is None:
+            return create_llm_instance(llm_config)
+        for key in [k for k, (i, _) in self._llm_cache.items() if i.is_closed()]:
+            del self._llm_cache[key]  # the clients of a closed loop can't be used nor closed anymore
+
+        key = (json.dumps(llm_config.model_dump(mode="json"), sort_keys=True), id(loop))
+        if key not in self._llm_cache:
+            self._llm_cache[key] = (loop, create_llm_instance(llm_config))
+        llm = copy.copy(self._llm_cache[key][1])
+        if llm.cost_manager is not None:
+            llm.cost_manager = llm.cost_manager.model_copy(deep=True)
+        return llm
+
+    async def aclose_llms(self):
+        """Close the clients of the cached LLM instances, the instances returned before can't be used afterwards."""
+        llms, self._llm_cache = [llm for loop, llm in self._llm_cache.values() if not loop.is_closed()], {}
+        for llm in llms:
+            await llm.aclose()
+
     def serialize(self) -> Dict[str, Any]:
         """Serialize the object's attributes into a dictionary.
 
@@ -5,12 +5,21 @@
 import asyncio
 from abc import abstractmethod
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional, Set, Union
 
 from gymnasium import spaces
 from gymnasium.core import ActType, ObsType
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    field_validator,
+    model_validator,
+)
 
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.context import Context
 from metagpt.environment.api.env_api import (
     EnvAPIAbstract,
@@ -19,8 +28,8 @@ from metagpt.environment.api.env_api import (
 )
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
 from metagpt.logs import logger
-from metagpt.schema import Message
-from metagpt.utils.common import get_function_schema, is_coroutine_func, is_send_to
+from metagpt.schema import Message, MessageHistory
+from metagpt.utils.common import get_function_schema, is_coroutine_func
 
 if TYPE_CHECKING:
     from metagpt.roles.role import Role  # noqa: F401
@@ -131,9 +140,13 @@ class Environment(ExtEnv):
     desc: str = Field(default="")  # 环境描述
     roles: dict[str, SerializeAsAny["Role"]] = Field(default_factory=dict, validate_default=True)
     member_addrs: Dict["Role", Set] = Field(default_factory=dict, exclude=True)
-    history: str = ""  # For debug
+    addr_index: Dict[str, Set["Role"]] = Field(default_factory=dict, exclude=True)  # address -> subscribed roles
+    history: MessageHistory = Field(default_factory=MessageHistory)  # For debug
     context: Context = Field(default_factory=Context, exclude=True)
 
+    # roles woken by a message they are interested in -> the latest one, None for a role resuming its recovered run
+    _ready_roles: dict = PrivateAttr(default_factory=dict)
+
     def reset(
         self,
         *,
@@ -148,6 +161,13 @@ class Environment(ExtEnv):
     def step(self, action: BaseEnvAction) -> tuple[dict[str, Any], float, bool, bool, dict[str, Any]]:
         pass
 
+    @field_validator("history", mode="before")
+    @classmethod
+    def check_history(cls, history: Any) -> Any:
+        if isinstance(history, str):  # compatible with the plain text history of old serialized envs
+            return MessageHistory()
+        return history
+
     @model_validator(mode="after")
     def init_roles(self):
         self.add_roles(self.roles.values())
@@ -184,13 +204,14 @@ class Environment(ExtEnv):
         logger.debug(f"publish_message: {message.dump()}")
         found = False
         # According to the routing feature plan in Chapter 2.2.3.2 of RFC 113
-        for role, addrs in self.member_addrs.items():
-            if is_send_to(message, addrs):
-                role.put_message(message)
-                found = True
+        for role in self.get_recipients(message):
+            role.put_message(message)
+            if role.is_interested(message):
+                self._ready_roles[role] = message
+            found = True
         if not found:
             logger.warning(f"Message no recipients: {message.dump()}")
-        self.history += f"\n{message}"  # For debug
+        self.history.add(message)  # For debug
 
         return True
 
@@ -207,6 +228,70 @@ class Environment(ExtEnv):
             await asyncio.gather(*futures)
             logger.debug(f"is idle: {self.is_idle}")
 
+    async def run_until_idle(
+        self, max_concurrency: int = 0, max_runs: int = 0, before_run: Optional[Callable[[], None]] = None
+    ) -> int:
+        """Run roles as soon as they receive messages they are interested in, instead of running all roles in rounds.
+
+        A role is woken when a message it is interested in is published to it, and never runs concurrently with
+        itself. The run ends as soon as no role is running or woken. A woken role whose messages were read meanwhile,
+        e.g. by its previous run or by `run`, isn't run.
+
+        Args:
+            max_concurrency: Max number of roles running at the same time, 0 means unlimited.
+            max_runs: Max number of role runs in total, 0 means unlimited.
+            before_run: Called before each role run, e.g. to check the budget. Exceptions raised abort the run.
+
+        Returns:
+            The number of role runs.
+        """
+        for role in self.roles.values():
+            if role.recovered:  # resume the interrupted run of a deserialized role
+                self._ready_roles[role] = None
+        semaphore = asyncio.Semaphore(max_concurrency if max_concurrency > 0 else max(len(self.roles), 1))
+        running: dict[asyncio.Task, "Role"] = {}
+        runs = 0
+        try:
+            while True:
+                busy = set(running.values())
+                for role in list(self._ready_roles):
+                    if max_runs and runs >= max_runs:
+                        break
+                    if role in busy:
+                        continue  # woken again while running, run it again once the current run is done
+                    stale = self._is_stale(role)
+                    del self._ready_roles[role]
+                    if stale:
+                        continue  # its messages were read meanwhile
+                    running[asyncio.create_task(self._run_role(role, semaphore, before_run))] = role
+                    runs += 1
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.pop(task)
+                    task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            for role in [role for role in self._ready_roles if self._is_stale(role)]:
+                del self._ready_roles[role]  # left woken by max_runs or an error, but its messages were read since
+        logger.debug(f"{runs} role runs, is idle: {self.is_idle}")
+        return runs
+
+    def _is_stale(self, role: "Role") -> bool:
+        """Whether the message waking the role was read since, e.g. by its previous run or by `run`"""
+        message = self._ready_roles[role]
+        return message is not None and role.rc.memory.contains(message)
+
+    @staticmethod
+    async def _run_role(role: "Role", semaphore: asyncio.Semaphore, before_run: Optional[Callable[[], None]]):
+        async with semaphore:
+            if before_run:
+                before_run()
+            return await role.run()
+
     def get_roles(self) -> dict[str, "Role"]:
         """获得环境内的所有角色
         Process all Role runs at once
@@ -230,13 +315,36 @@ class Environment(ExtEnv):
                 return False
         return True
 
+    def get_recipients(self, message: Message) -> Iterable["Role"]:
+        """Get the roles subscribed to any address in `message.send_to`, via the address index.
+        A message sent to `MESSAGE_ROUTE_TO_ALL` is delivered to every member, whatever its addresses are.
+        """
+        if MESSAGE_ROUTE_TO_ALL in message.send_to:
+            return list(self.member_addrs.keys())
+        if len(message.send_to) == 1:
+            return list(self.addr_index.get(next(iter(message.send_to)), ()))
+        recipients = set()
+        for addr in message.send_to:
+            recipients.update(self.addr_index.get(addr, ()))
+        return list(recipients)
+
     def get_addresses(self, obj):
         """Get the addresses of the object."""
         return self.member_addrs.get(obj, {})
 
     def set_addresses(self, obj, addresses):
-        """Set the addresses of the object"""
+        """Set the addresses of the object, and keep the address index in sync"""
+        for addr in self.member_addrs.get(obj, ()):
+            subscribers = self.addr_index.get(addr)
+            if subscribers is None:
+                continue
+            subscribers.discard(obj)
+            if not subscribers:
+                del self.addr_index[addr]
+        addresses = set(addresses)
         self.member_addrs[obj] = addresses
+        for addr in addresses:
+            self.addr_index.setdefault(addr, set()).add(obj)
 
     def archive(self, auto_archive=True):
         if auto_archive and self.context.git_repo:
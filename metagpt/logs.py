@@ -7,13 +7,17 @@
 """
 
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from typing import Callable
 
 from loguru import logger as _logger
 
 from metagpt.const import METAGPT_ROOT
 
 _print_level = "INFO"
+_llm_stream_observers: ContextVar[tuple[Callable[[str], None], ...]] = ContextVar("llm_stream_observers", default=())
 
 
 def define_log_level(print_level="INFO", logfile_level="DEBUG", name: str = None):
@@ -35,9 +39,32 @@ logger = define_log_level()
 
 
 def log_llm_stream(msg):
+    for observer in _llm_stream_observers.get():
+        observer(msg)
     _llm_stream_log(msg)
 
 
+@contextmanager
+def observe_llm_stream(observer: Callable[[str], None]):
+    """Call observer with the messages passed to `log_llm_stream` by the current task, they are still logged as usual.
+
+    An exception raised by observer is raised by `log_llm_stream`, which aborts the LLM stream.
+    """
+    token = _llm_stream_observers.set(_llm_stream_observers.get() + (observer,))
+    try:
+        yield
+    finally:
+        _llm_stream_observers.reset(token)
+
+
+@contextmanager
+def capture_llm_stream():
+    """Collect the messages passed to `log_llm_stream` by the current task, they are still logged as usual."""
+    captured = []
+    with observe_llm_stream(captured.append):
+        yield captured
+
+
 def set_llm_stream_logfunc(func):
     global _llm_stream_log
     _llm_stream_log = func
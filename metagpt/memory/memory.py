@@ -6,10 +6,11 @@
 @File    : memory.py
 @Modified By: mashenquan, 2023-11-1. According to RFC 116: Updated the type of index key.
 """
+from bisect import bisect_right
 from collections import defaultdict
-from typing import DefaultDict, Iterable, Set
+from typing import DefaultDict, Iterable, Optional, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny, model_validator
 
 from metagpt.const import IGNORED_MESSAGE_ID
 from metagpt.schema import Message
@@ -22,35 +23,69 @@ class Memory(BaseModel):
     storage: list[SerializeAsAny[Message]] = []
     index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
     ignore_id: bool = False
+    keyword_index: bool = False  # maintain an inverted trigram index for `get_by_content` and `try_remember`
+
+    _seqs: list[int] = PrivateAttr(default_factory=list)  # insertion sequence ids, parallel to `storage`
+    _last_seq: int = PrivateAttr(default=0)
+    _id_index: dict[str, list[Message]] = PrivateAttr(default_factory=dict)
+    _role_index: dict[str, list[Message]] = PrivateAttr(default_factory=dict)
+    _trigram_index: dict[str, dict[int, Message]] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def init_lookup_indexes(self):
+        self._seqs = list(range(1, len(self.storage) + 1))
+        self._last_seq = len(self.storage)
+        self._id_index = {}
+        self._role_index = {}
+        self._trigram_index = {}
+        for message in self.storage:
+            self._add_to_lookup_indexes(message)
+        return self
+
+    def __eq__(self, other) -> bool:
+        """Compare the fields only; the sequence ids and lookup indexes are bookkeeping of this instance and are
+        rebuilt on deserialization"""
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
 
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+        if self.contains(message):
             return
         self.storage.append(message)
+        self._last_seq += 1
+        self._seqs.append(self._last_seq)
         if message.cause_by:
             self.index[message.cause_by].append(message)
+        self._add_to_lookup_indexes(message)
 
     def add_batch(self, messages: Iterable[Message]):
         for message in messages:
             self.add(message)
 
+    def contains(self, message: Message) -> bool:
+        """Return whether an equal message is already in storage, looked up by message id"""
+        return message in self._id_index.get(message.id, [])
+
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        return list(self._role_index.get(role, []))
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
-        return [message for message in self.storage if content in message.content]
+        return self._search_content(content)
 
     def delete_newest(self) -> "Message":
         """delete the newest message from the storage"""
         if len(self.storage) > 0:
             newest_msg = self.storage.pop()
+            self._seqs.pop()
             if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
                 self.index[newest_msg.cause_by].remove(newest_msg)
+            self._remove_from_lookup_indexes(newest_msg)
         else:
             newest_msg = None
         return newest_msg
@@ -59,14 +94,21 @@ class Memory(BaseModel):
         """Delete the specified message from storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        self.storage.remove(message)
+        idx = self.storage.index(message)
+        del self.storage[idx]
+        del self._seqs[idx]
         if message.cause_by and message in self.index[message.cause_by]:
             self.index[message.cause_by].remove(message)
+        self._remove_from_lookup_indexes(message)
 
     def clear(self):
         """Clear storage and index"""
         self.storage = []
         self.index = defaultdict(list)
+        self._seqs = []
+        self._id_index = {}
+        self._role_index = {}
+        self._trigram_index = {}
 
     def count(self) -> int:
         """Return the number of messages in storage"""
@@ -74,14 +116,25 @@ class Memory(BaseModel):
 
     def try_remember(self, keyword: str) -> list[Message]:
         """Try to recall all messages containing a specified keyword"""
-        return [message for message in self.storage if keyword in message.content]
+        return self._search_content(keyword)
 
     def get(self, k=0) -> list[Message]:
         """Return the most recent k memories, return all when k=0"""
         return self.storage[-k:]
 
+    @property
+    def last_seq(self) -> int:
+        """The sequence id of the latest added message. Sequence ids increase monotonically and are never reused."""
+        return self._last_seq
+
+    def get_since(self, seq: int) -> list[Message]:
+        """Return the messages added after the sequence id `seq`, in insertion order"""
+        return self.storage[bisect_right(self._seqs, seq) :]
+
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the the most recent k memories, from all memories when k=0"""
+        if not k:
+            return [i for i in observed if not self.contains(i)]
         already_observed = self.get(k)
         news: list[Message] = []
         for i in observed:
@@ -104,3 +157,51 @@ class Memory(BaseModel):
                 continue
             rsp += self.index[action]
         return rsp
+
+    def _add_to_lookup_indexes(self, message: Message):
+        self._id_index.setdefault(message.id, []).append(message)
+        self._role_index.setdefault(message.role, []).append(message)
+        if self.keyword_index:
+            for gram in self._trigrams(message.content):
+                self._trigram_index.setdefault(gram, {})[id(message)] = message
+
+    def _remove_from_lookup_indexes(self, message: Message):
+        ids = self._id_index.get(message.id, [])
+        message = next((i for i in ids if i == message), message)  # the stored object equal to `message`
+        for lookup, key in ((self._id_index, message.id), (self._role_index, message.role)):
+            bucket = lookup.get(key, [])
+            if message in bucket:
+                bucket.remove(message)
+            if not bucket:
+                lookup.pop(key, None)
+        if not self.keyword_index:
+            return
+        for gram in self._trigrams(message.content):
+            postings = self._trigram_index.get(gram, {})
+            postings.pop(id(message), None)
+            if not postings:
+                self._trigram_index.pop(gram, None)
+
+    def _search_content(self, content: str) -> list[Message]:
+        postings = self._find_trigram_postings(content)
+        if postings is None:
+            return [message for message in self.storage if content in message.content]
+        return [message for message in postings.values() if content in message.content]
+
+    def _find_trigram_postings(self, content: str) -> Optional[dict[int, Message]]:
+        """Return the smallest trigram postings of `content`, or None if the trigram index can not be used."""
+        grams = self._trigrams(content)
+        if not self.keyword_index or not grams:
+            return None
+        smallest = {}
+        for gram in grams:
+            postings = self._trigram_index.get(gram)
+            if not postings:
+                return {}
+            if not smallest or len(postings) < len(smallest):
+                smallest = postings
+        return smallest
+
+    @staticmethod
+    def _trigrams(text: str) -> set[str]:
+        return {text[i : i + 3] for i in range(len(text) - 2)}
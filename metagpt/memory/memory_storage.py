@@ -3,8 +3,10 @@
 """
 @Desc   : the implement of memory storage
 """
+import asyncio
 import shutil
 from pathlib import Path
+from typing import Optional
 
 from llama_index.core.embeddings import BaseEmbedding
 
@@ -19,9 +21,21 @@ from metagpt.utils.embedding import get_embedding
 class MemoryStorage(object):
     """
     The memory storage with Faiss as ANN search engine
+
+    Added messages are buffered and embedded in batches: the buffer is flushed once it holds `batch_size` messages,
+    `flush_interval` seconds after the first buffered message when an event loop is running, and before every search
+    or persist. Set `persist_every` to persist the index after that many messages are flushed, 0 leaves persisting to
+    explicit `persist` calls.
     """
 
-    def __init__(self, mem_ttl: int = MEM_TTL, embedding: BaseEmbedding = None):
+    def __init__(
+        self,
+        mem_ttl: int = MEM_TTL,
+        embedding: BaseEmbedding = None,
+        batch_size: int = 16,
+        flush_interval: float = 1.0,
+        persist_every: int = 0,
+    ):
         self.role_id: str = None
         self.role_mem_path: str = None
         self.mem_ttl: int = mem_ttl  # later use
@@ -31,6 +45,13 @@ class MemoryStorage(object):
 
         self.faiss_engine = None
 
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.persist_every = persist_every
+        self._pending: list[Message] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._unpersisted_count = 0
+
     @property
     def is_initialized(self) -> bool:
         return self._initialized
@@ -54,12 +75,54 @@ class MemoryStorage(object):
         self._initialized = True
 
     def add(self, message: Message) -> bool:
-        """add message into memory storage"""
-        self.faiss_engine.add_objs([message])
-        logger.info(f"Role {self.role_id}'s memory_storage add a message")
+        """add message into memory storage, the message is embedded on the next flush"""
+        self._pending.append(message)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        else:
+            self._schedule_flush()
+        return True
+
+    def flush(self) -> int:
+        """Embed and insert all buffered messages in one batch, return the number of messages flushed"""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return 0
+
+        messages, self._pending = self._pending, []
+        try:
+            self.faiss_engine.add_objs(messages)
+        except Exception:
+            self._pending = messages + self._pending  # kept for the next flush
+            raise
+        logger.info(f"Role {self.role_id}'s memory_storage add {len(messages)} messages")
+
+        self._unpersisted_count += len(messages)
+        if self.persist_every and self._unpersisted_count >= self.persist_every:
+            self._persist_index()
+        return len(messages)
+
+    def _schedule_flush(self):
+        if self._flush_handle or self.flush_interval <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no running loop, the buffer is flushed by size, search or persist
+        self._flush_handle = loop.call_later(self.flush_interval, self._flush_later)
+
+    def _flush_later(self):
+        self._flush_handle = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Role {self.role_id}'s memory_storage failed to flush {len(self._pending)} messages: {e}")
 
     async def search_similar(self, message: Message, k=4) -> list[Message]:
         """search for similar messages"""
+        self.flush()
         # filter the result which score is smaller than the threshold
         filtered_resp = []
         resp = await self.faiss_engine.aretrieve(message.content)
@@ -69,9 +132,18 @@ class MemoryStorage(object):
         return filtered_resp
 
     def clean(self):
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending = []
         shutil.rmtree(self.cache_dir, ignore_errors=True)
         self._initialized = False
 
     def persist(self):
         if self.faiss_engine:
-            self.faiss_engine.retriever._index.storage_context.persist(self.cache_dir)
+            self.flush()
+            self._persist_index()
+
+    def _persist_index(self):
+        self.faiss_engine.retriever._index.storage_context.persist(self.cache_dir)
+        self._unpersisted_count = 0
@@ -8,6 +8,7 @@
 """
 from __future__ import annotations
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
 from typing import Optional, Union
@@ -28,6 +29,9 @@ from metagpt.logs import logger
 from metagpt.schema import Message
 from metagpt.utils.common import log_and_reraise
 from metagpt.utils.cost_manager import CostManager, Costs
+from metagpt.utils.llm_response_cache import LLMResponseCache, get_response_cache
+from metagpt.utils.rate_limiter import RateLimiter, get_rate_limiter, get_retry_after
+from metagpt.utils.token_counter import count_input_tokens
 
 
 class BaseLLM(ABC):
@@ -42,11 +46,22 @@ class BaseLLM(ABC):
     cost_manager: Optional[CostManager] = None
     model: Optional[str] = None  # deprecated
     pricing_plan: Optional[str] = None
+    # set to plug in a cache, otherwise the one of `config.response_cache` is used
+    response_cache: Optional[LLMResponseCache] = None
+    # set to plug in a limiter, otherwise the one shared by `config.rpm` and `config.tpm` is used
+    rate_limiter: Optional[RateLimiter] = None
+    rate_limit_retries: int = 3
 
     @abstractmethod
     def __init__(self, config: LLMConfig):
         pass
 
+    async def aclose(self):
+        """Close the client and release its connections, if the client can be closed."""
+        close = getattr(self.aclient, "close", None)
+        if close is not None:
+            await close()
+
     def _user_msg(self, msg: str, images: Optional[Union[str, list[str]]] = None) -> dict[str, Union[str, dict]]:
         if images:
             # as gpt-4v, chat with image
@@ -149,7 +164,7 @@ class BaseLLM(ABC):
         if stream is None:
             stream = self.config.stream
         logger.debug(message)
-        rsp = await self.acompletion_text(message, stream=stream, timeout=self.get_timeout(timeout))
+        rsp = await self._acompletion_text_with_cache(message, stream=stream, timeout=self.get_timeout(timeout))
         return rsp
 
     def _extract_assistant_rsp(self, context):
@@ -161,10 +176,78 @@ class BaseLLM(ABC):
         for msg in msgs:
             umsg = self._user_msg(msg)
             context.append(umsg)
-            rsp_text = await self.acompletion_text(context, timeout=self.get_timeout(timeout))
+            rsp_text = await self._acompletion_text_with_cache(context, timeout=self.get_timeout(timeout))
             context.append(self._assistant_msg(rsp_text))
         return self._extract_assistant_rsp(context)
 
+    async def aask_many(
+        self,
+        msgs: list[Union[str, list[dict[str, str]]]],
+        system_msgs: Optional[list[str]] = None,
+        max_concurrency: int = 8,
+        timeout=USE_CONFIG_TIMEOUT,
+        return_exceptions: bool = True,
+    ) -> list[Union[str, Exception]]:
+        """Concurrent questioning of independent prompts, at most `max_concurrency` of them at a time.
+
+        The answers are in the order of `msgs`. If `return_exceptions`, the exception of a failed prompt is returned
+        in its place, otherwise the first exception is raised and the other prompts are cancelled. The costs are
+        counted as in `aask`.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _aask(msg):
+            async with semaphore:
+                return await self.aask(msg, system_msgs=system_msgs, timeout=timeout, stream=False)
+
+        tasks = [asyncio.ensure_future(_aask(msg)) for msg in msgs]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            for task in tasks:
+                task.cancel()  # no-op for the done ones
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _acompletion_text_with_cache(
+        self, messages: list[dict], stream: bool = False, timeout: int = USE_CONFIG_TIMEOUT
+    ) -> str:
+        """acompletion_text, answered by the response cache if there is one"""
+        cache = self.response_cache or get_response_cache(self.config)
+        if not cache:
+            return await self._acompletion_text_with_limit(messages, stream=stream, timeout=timeout)
+        key = cache.make_key(messages, self.config, model=self.pricing_plan or self.model)
+        return await cache.aget_or_call(
+            key,
+            lambda: self._acompletion_text_with_limit(list(messages), stream=stream, timeout=timeout),
+            stream=stream,
+        )
+
+    async def _acompletion_text_with_limit(
+        self, messages: list[dict], stream: bool = False, timeout: int = USE_CONFIG_TIMEOUT
+    ) -> str:
+        """acompletion_text, admitted by the rate limiter if there is one.
+
+        A request still rejected by the provider pauses the limiter for its Retry-After and queues again.
+        """
+        limiter = self.rate_limiter or get_rate_limiter(self.config)
+        if not limiter:
+            return await self.acompletion_text(messages, stream=stream, timeout=timeout)
+        tokens = self._count_input_tokens(messages) if limiter.tpm else 0
+        attempts = max(1, self.rate_limit_retries)
+        for i in range(attempts):
+            try:
+                async with limiter.limit(tokens):
+                    return await self.acompletion_text(messages, stream=stream, timeout=timeout)
+            except Exception as e:
+                if get_retry_after(e) is None or i == attempts - 1:
+                    raise
+
+    def _count_input_tokens(self, messages: list[dict]) -> int:
+        try:
+            return count_input_tokens(messages, self.pricing_plan or self.model or "open-llm-model")
+        except NotImplementedError:
+            return count_input_tokens(messages, "open-llm-model")  # an estimation for the other models
+
     async def aask_code(self, messages: Union[str, Message, list[dict]], timeout=USE_CONFIG_TIMEOUT, **kwargs) -> dict:
         raise NotImplementedError
 
@@ -37,6 +37,8 @@ import logging
 import openai
 from openai import version
 
+from metagpt.utils.ahttp_client import SESSION_POOL
+
 logger = logging.getLogger("openai")
 
 TIMEOUT_SECS = 600
@@ -133,7 +135,7 @@ class OpenAIResponse:
     def retry_after(self) -> Optional[int]:
         try:
             return int(self._headers.get("retry-after"))
-        except TypeError:
+        except (TypeError, ValueError):
             return None
 
     @property
@@ -618,5 +620,5 @@ class APIRequestor:
 
 @asynccontextmanager
 async def aiohttp_session() -> AsyncIterator[aiohttp.ClientSession]:
-    async with aiohttp.ClientSession() as session:
-        yield session
+    """Yield the pooled session of the running loop, it is kept open for the following requests."""
+    yield await SESSION_POOL.get()
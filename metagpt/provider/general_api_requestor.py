@@ -9,7 +9,8 @@ import aiohttp
 import requests
 
 from metagpt.logs import logger
-from metagpt.provider.general_api_base import APIRequestor
+from metagpt.provider.general_api_base import APIRequestor, OpenAIResponse
+from metagpt.utils.rate_limiter import RateLimitedError
 
 
 def parse_stream_helper(line: bytes) -> Union[bytes, None]:
@@ -53,6 +54,9 @@ class GeneralAPIRequestor(APIRequestor):
     def _interpret_response_line(self, rbody: bytes, rcode: int, rheaders, stream: bool) -> bytes:
         # just do nothing to meet the APIRequestor process and return the raw data
         # due to the openai sdk will convert the data into OpenAIResponse which we don't need in general cases.
+        if rcode == 429:
+            retry_after = OpenAIResponse(rbody, rheaders).retry_after
+            raise RateLimitedError(f"Rate limit exceeded: {rbody!r}", retry_after=retry_after)
 
         return rbody
 
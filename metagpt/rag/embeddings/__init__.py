@@ -0,0 +1,5 @@
+"""Embeddings init."""
+
+from metagpt.rag.embeddings.cached_embedding import CachedEmbedding, EmbeddingCache
+
+__all__ = ["CachedEmbedding", "EmbeddingCache"]
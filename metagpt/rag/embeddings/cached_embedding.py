@@ -0,0 +1,256 @@
+"""Cached embedding, wraps any llama-index embedding with an on-disk LRU cache."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Union
+
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+
+# Settings that only change how an embedding model is called, not the vectors it returns
+IGNORED_EMBEDDING_SETTINGS = frozenset(
+    {
+        "class_name",
+        "model_name",
+        "api_key",
+        "embed_batch_size",
+        "max_retries",
+        "timeout",
+        "default_headers",
+        "reuse_client",
+        "callback_manager",
+        "num_workers",
+    }
+)
+
+
+class EmbeddingCache:
+    """LRU cache of embeddings, stored in SQLite and keyed by (namespace, sha256 of text).
+
+    Recently used entries are also kept in memory. When the database holds more than `max_entries` embeddings, the
+    least recently used ones are evicted.
+    """
+
+    def __init__(self, path: Union[str, Path], max_entries: int = 100000, memory_entries: int = 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[tuple[str, str], Embedding] = OrderedDict()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(namespace TEXT, key TEXT, vector BLOB, last_used REAL, PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, namespace: str, texts: list[str]) -> list[Optional[Embedding]]:
+        """Return the cached embedding of each text, None if missing."""
+        keys = [self.hash_text(text) for text in texts]
+        found: dict[str, Embedding] = {}
+        with self._lock:
+            for key in keys:
+                embedding = self._memory.get((namespace, key))
+                if embedding is not None:
+                    self._memory.move_to_end((namespace, key))
+                    found[key] = embedding
+
+            rest = list({key for key in keys if key not in found})
+            now = time.time()
+            for i in range(0, len(rest), 500):
+                chunk = rest[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [namespace, *chunk],
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = self._decode(vector)
+                    self._remember(namespace, key, found[key])
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE namespace = ? AND key = ?",
+                    [(now, namespace, key) for key, _ in rows],
+                )
+            self._conn.commit()
+
+            embeddings = [found.get(key) for key in keys]
+            self.hits += sum(e is not None for e in embeddings)
+            self.misses += sum(e is None for e in embeddings)
+
+        return embeddings
+
+    def put_many(self, namespace: str, texts: list[str], embeddings: list[Embedding]):
+        keys = [self.hash_text(text) for text in texts]
+        now = time.time()
+        with self._lock:
+            for key, embedding in zip(keys, embeddings):
+                self._remember(namespace, key, embedding)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (namespace, key, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(namespace, key, self._encode(embedding), now) for key, embedding in zip(keys, embeddings)],
+            )
+            self._conn.commit()
+
+            self._size += len(keys)
+            if self._size > self.max_entries:
+                self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": self._size}
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _remember(self, namespace: str, key: str, embedding: Embedding):
+        self._memory[(namespace, key)] = embedding
+        self._memory.move_to_end((namespace, key))
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Delete the least recently used rows, `_size` is an upper bound because replaced rows are counted too."""
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = self._size - self.max_entries
+        if overflow <= 0:
+            return
+
+        rows = self._conn.execute(
+            "SELECT namespace, key FROM embeddings ORDER BY last_used LIMIT ?", (overflow,)
+        ).fetchall()
+        self._conn.executemany("DELETE FROM embeddings WHERE namespace = ? AND key = ?", rows)
+        self._conn.commit()
+        for row in rows:
+            self._memory.pop(tuple(row), None)
+        self._size -= len(rows)
+
+    @staticmethod
+    def _encode(embedding: Embedding) -> bytes:
+        return array("d", embedding).tobytes()
+
+    @staticmethod
+    def _decode(vector: bytes) -> Embedding:
+        embedding = array("d")
+        embedding.frombytes(vector)
+        return embedding.tolist()
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Wrap an embedding model, only the texts missing from the cache are sent to it.
+
+    The cache is namespaced by the class, model name and output-changing settings (e.g. `dimensions`, the endpoint
+    or deployment) of the wrapped model, and by query / text embedding, so that different models never share
+    vectors. Settings in `IGNORED_EMBEDDING_SETTINGS` are left out.
+    """
+
+    embed_model: BaseEmbedding = Field(description="The wrapped embedding model.")
+
+    _cache: EmbeddingCache = PrivateAttr()
+    _namespace: str = PrivateAttr()
+
+    def __init__(self, embed_model: BaseEmbedding, cache: EmbeddingCache, **kwargs):
+        kwargs.setdefault("model_name", embed_model.model_name)
+        kwargs.setdefault("embed_batch_size", embed_model.embed_batch_size)
+        kwargs.setdefault("callback_manager", embed_model.callback_manager)
+        super().__init__(embed_model=embed_model, **kwargs)
+        self._cache = cache
+        self._namespace = self._make_namespace(embed_model)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        return self._cache
+
+    @property
+    def namespace(self) -> str:
+        return self._namespace
+
+    @staticmethod
+    def _make_namespace(embed_model: BaseEmbedding) -> str:
+        settings = {k: v for k, v in embed_model.to_dict().items() if k not in IGNORED_EMBEDDING_SETTINGS}
+        digest = hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return f"{embed_model.class_name()}:{embed_model.model_name}:{digest[:16]}"
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._get_cached("query", [query], lambda texts: [self.embed_model._get_query_embedding(texts[0])])[0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        async def embed(texts: list[str]) -> list[Embedding]:
+            return [await self.embed_model._aget_query_embedding(texts[0])]
+
+        return (await self._aget_cached("query", [query], embed))[0]
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return self._get_cached("text", texts, self.embed_model._get_text_embeddings)
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return await self._aget_cached("text", texts, self.embed_model._aget_text_embeddings)
+
+    def _get_cached(
+        self, kind: str, texts: list[str], embed: Callable[[list[str]], list[Embedding]]
+    ) -> list[Embedding]:
+        embeddings, missing = self._lookup(kind, texts)
+        if missing:
+            self._fill(kind, embeddings, texts, missing, embed(missing))
+        return embeddings
+
+    async def _aget_cached(
+        self, kind: str, texts: list[str], embed: Callable[[list[str]], Awaitable[list[Embedding]]]
+    ) -> list[Embedding]:
+        embeddings, missing = self._lookup(kind, texts)
+        if missing:
+            self._fill(kind, embeddings, texts, missing, await embed(missing))
+        return embeddings
+
+    def _lookup(self, kind: str, texts: list[str]) -> tuple[list[Optional[Embedding]], list[str]]:
+        """Return the cached embeddings and the distinct texts missing from the cache."""
+        embeddings = self._cache.get_many(f"{self.namespace}:{kind}", texts)
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+        return embeddings, missing
+
+    def _fill(
+        self,
+        kind: str,
+        embeddings: list[Optional[Embedding]],
+        texts: list[str],
+        missing: list[str],
+        new_embeddings: list[Embedding],
+    ):
+        self._cache.put_many(f"{self.namespace}:{kind}", missing, new_embeddings)
+        new = dict(zip(missing, new_embeddings))
+        for i, text in enumerate(texts):
+            if embeddings[i] is None:
+                embeddings[i] = new[text]
@@ -163,7 +163,13 @@ class SimpleEngine(RetrieverQueryEngine):
     ) -> "SimpleEngine":
         """Load from previously maintained index by self.persist(), index_config contains persis_path."""
         index = get_index(index_config, embed_model=cls._resolve_embed_model(embed_model, [index_config]))
-        return cls._from_index(index, llm=llm, retriever_configs=retriever_configs, ranker_configs=ranker_configs)
+        return cls._from_index(
+            index,
+            llm=llm,
+            retriever_configs=retriever_configs,
+            ranker_configs=ranker_configs,
+            persist_path=index_config.persist_path,
+        )
 
     async def asearch(self, content: str, **kwargs) -> str:
         """Inplement tools.SearchInterface"""
@@ -237,10 +243,12 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        persist_path: Union[str, os.PathLike] = None,
     ) -> "SimpleEngine":
         llm = llm or get_rag_llm()
 
-        retriever = get_retriever(configs=retriever_configs, index=index)  # Default index.as_retriever
+        # Default index.as_retriever, persist_path lets retrievers reload their own persisted data, e.g. bm25 postings.
+        retriever = get_retriever(configs=retriever_configs, index=index, persist_path=persist_path)
         rankers = get_rankers(configs=ranker_configs, llm=llm)  # Default []
 
         return cls(
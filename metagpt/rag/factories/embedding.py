@@ -12,6 +12,8 @@ from llama_index.embeddings.openai import OpenAIEmbedding
 from metagpt.config2 import config
 from metagpt.configs.embedding_config import EmbeddingType
 from metagpt.configs.llm_config import LLMType
+from metagpt.const import DEFAULT_WORKSPACE_ROOT
+from metagpt.rag.embeddings.cached_embedding import CachedEmbedding, EmbeddingCache
 from metagpt.rag.factories.base import GenericFactory
 
 
@@ -29,10 +31,16 @@ class RAGEmbeddingFactory(GenericFactory):
             LLMType.AZURE: self._create_azure,
         }
         super().__init__(creators)
+        self._caches: dict[str, EmbeddingCache] = {}
 
     def get_rag_embedding(self, key: EmbeddingType = None) -> BaseEmbedding:
-        """Key is EmbeddingType."""
-        return super().get_instance(key or self._resolve_embedding_type())
+        """Key is EmbeddingType.
+
+        If `embedding.cache` is enabled, the embedding is wrapped by CachedEmbedding.
+        """
+        embed_model = super().get_instance(key or self._resolve_embedding_type())
+
+        return self._try_wrap_cache(embed_model)
 
     def _resolve_embedding_type(self) -> EmbeddingType | LLMType:
         """Resolves the embedding type.
@@ -96,6 +104,17 @@ class RAGEmbeddingFactory(GenericFactory):
         if config.embedding.embed_batch_size:
             params["embed_batch_size"] = config.embedding.embed_batch_size
 
+    def _try_wrap_cache(self, embed_model: BaseEmbedding) -> BaseEmbedding:
+        """Wrap the embedding with CachedEmbedding only when cache is enabled, embeddings share the cache of a path."""
+        if not config.embedding.cache:
+            return embed_model
+
+        cache_path = str(config.embedding.cache_path or DEFAULT_WORKSPACE_ROOT / "embedding_cache.db")
+        if cache_path not in self._caches:
+            self._caches[cache_path] = EmbeddingCache(cache_path, max_entries=config.embedding.cache_max_entries)
+
+        return CachedEmbedding(embed_model, cache=self._caches[cache_path])
+
     def _raise_for_key(self, key: Any):
         raise ValueError(f"The embedding type is currently not supported: `{type(key)}`, {key}")
 
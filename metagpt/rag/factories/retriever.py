@@ -2,6 +2,7 @@
 
 
 from functools import wraps
+from typing import Optional
 
 import chromadb
 import faiss
@@ -15,7 +16,7 @@ from llama_index.vector_stores.faiss import FaissVectorStore
 
 from metagpt.rag.factories.base import ConfigBasedFactory
 from metagpt.rag.retrievers.base import RAGRetriever
-from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
+from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever, IncrementalBM25
 from metagpt.rag.retrievers.chroma_retriever import ChromaRetriever
 from metagpt.rag.retrievers.es_retriever import ElasticsearchRetriever
 from metagpt.rag.retrievers.faiss_retriever import FAISSRetriever
@@ -27,6 +28,7 @@ from metagpt.rag.schema import (
     ElasticsearchKeywordRetrieverConfig,
     ElasticsearchRetrieverConfig,
     FAISSRetrieverConfig,
+    HybridRetrieverConfig,
 )
 
 
@@ -62,14 +64,19 @@ class RetrieverFactory(ConfigBasedFactory):
     def get_retriever(self, configs: list[BaseRetrieverConfig] = None, **kwargs) -> RAGRetriever:
         """Creates and returns a retriever instance based on the provided configurations.
 
-        If multiple retrievers, using SimpleHybridRetriever.
+        If multiple retrievers, using SimpleHybridRetriever, which is configured by HybridRetrieverConfig in configs.
         """
+        hybrid_config = next((c for c in configs or [] if isinstance(c, HybridRetrieverConfig)), None)
+        configs = [c for c in configs or [] if not isinstance(c, HybridRetrieverConfig)]
         if not configs:
             return self._create_default(**kwargs)
 
         retrievers = super().get_instances(configs, **kwargs)
+        if len(retrievers) == 1:
+            return retrievers[0]
 
-        return SimpleHybridRetriever(*retrievers) if len(retrievers) > 1 else retrievers[0]
+        hybrid_config = hybrid_config or HybridRetrieverConfig()
+        return SimpleHybridRetriever(*retrievers, **hybrid_config.model_dump())
 
     def _create_default(self, **kwargs) -> RAGRetriever:
         index = self._extract_index(None, **kwargs) or self._build_default_index(**kwargs)
@@ -84,8 +91,9 @@ class RetrieverFactory(ConfigBasedFactory):
     def _create_bm25_retriever(self, config: BM25RetrieverConfig, **kwargs) -> DynamicBM25Retriever:
         index = self._extract_index(config, **kwargs)
         nodes = list(index.docstore.docs.values()) if index else self._extract_nodes(config, **kwargs)
+        bm25 = self._load_bm25(config, **kwargs)
 
-        return DynamicBM25Retriever(nodes=nodes, **config.model_dump())
+        return DynamicBM25Retriever(nodes=nodes, bm25=bm25, **config.model_dump())
 
     def _create_chroma_retriever(self, config: ChromaRetrieverConfig, **kwargs) -> ChromaRetriever:
         config.index = self._build_chroma_index(config, **kwargs)
@@ -106,6 +114,12 @@ class RetrieverFactory(ConfigBasedFactory):
     def _extract_embed_model(self, config: BaseRetrieverConfig = None, **kwargs) -> BaseEmbedding:
         return self._val_from_config_or_kwargs("embed_model", config, **kwargs)
 
+    def _load_bm25(self, config: BaseRetrieverConfig = None, **kwargs) -> Optional[IncrementalBM25]:
+        """Load the bm25 postings persisted along with the index, so that the nodes needn't be tokenized again."""
+        persist_path = self._val_from_config_or_kwargs("persist_path", config, **kwargs)
+
+        return IncrementalBM25.from_persist_dir(persist_path) if persist_path else None
+
     def _build_default_index(self, **kwargs) -> VectorStoreIndex:
         index = VectorStoreIndex(
             nodes=self._extract_nodes(**kwargs),
@@ -1,16 +1,153 @@
 """BM25 retriever."""
-from typing import Callable, Optional
+import heapq
+import itertools
+import json
+import math
+from pathlib import Path
+from typing import Callable, Optional, Union
 
 from llama_index.core import VectorStoreIndex
+from llama_index.core.base.base_retriever import BaseRetriever
 from llama_index.core.callbacks.base import CallbackManager
 from llama_index.core.constants import DEFAULT_SIMILARITY_TOP_K
-from llama_index.core.schema import BaseNode, IndexNode
+from llama_index.core.schema import BaseNode, IndexNode, NodeWithScore, QueryBundle
 from llama_index.retrievers.bm25 import BM25Retriever
-from rank_bm25 import BM25Okapi
+from llama_index.retrievers.bm25.base import tokenize_remove_stopwords
+
+from metagpt.logs import logger
+
+
+class IncrementalBM25:
+    """BM25Okapi over sparse postings, updated in place when documents are added or deleted.
+
+    Scores match `rank_bm25.BM25Okapi` built over the same corpus, but adding or deleting a document only touches the
+    terms of that document instead of rebuilding the whole model, and a query only visits the postings of its terms.
+    """
+
+    PERSIST_FNAME = "bm25_postings.json"
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.postings: dict[str, dict[str, int]] = {}  # term -> {doc_id: term frequency}
+        self.doc_lens: dict[str, int] = {}  # doc_id -> number of tokens, in insertion order
+        self.total_len = 0
+        self._doc_terms: dict[str, list[str]] = {}  # doc_id -> distinct terms, used by delete
+        self._average_idf: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_lens)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lens
+
+    @property
+    def avgdl(self) -> float:
+        return self.total_len / len(self.doc_lens) if self.doc_lens else 0.0
+
+    def add(self, doc_id: str, tokens: list[str]):
+        """Add a tokenized document, replacing any document with the same id."""
+        if doc_id in self.doc_lens:
+            self.delete(doc_id)
+
+        freqs: dict[str, int] = {}
+        for token in tokens:
+            freqs[token] = freqs.get(token, 0) + 1
+        for term, freq in freqs.items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+
+        self._doc_terms[doc_id] = list(freqs)
+        self.doc_lens[doc_id] = len(tokens)
+        self.total_len += len(tokens)
+        self._average_idf = None
+
+    def delete(self, doc_id: str):
+        """Delete a document, no-op if it does not exist."""
+        if doc_id not in self.doc_lens:
+            return
+
+        for term in self._doc_terms.pop(doc_id):
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+
+        self.total_len -= self.doc_lens.pop(doc_id)
+        self._average_idf = None
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        if not df:
+            return 0.0
+
+        idf = self._raw_idf(df)
+        return idf if idf >= 0 else self.epsilon * self.average_idf
+
+    @property
+    def average_idf(self) -> float:
+        """Mean of the raw idf over all terms, the floor of negative idf is `epsilon * average_idf`."""
+        if self._average_idf is None:
+            idfs = [self._raw_idf(len(posting)) for posting in self.postings.values()]
+            self._average_idf = sum(idfs) / len(idfs) if idfs else 0.0
+        return self._average_idf
+
+    def get_scores(self, query: list[str]) -> dict[str, float]:
+        """Return scores of documents sharing at least one term with query, all other documents score 0."""
+        scores: dict[str, float] = {}
+        if not self.doc_lens:
+            return scores
+
+        k1, b, avgdl = self.k1, self.b, self.avgdl
+        for term in query:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+
+            idf = self.idf(term)
+            for doc_id, freq in posting.items():
+                norm = k1 * (1 - b + b * self.doc_lens[doc_id] / avgdl) if avgdl else k1 * (1 - b)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (freq * (k1 + 1) / (freq + norm))
+
+        return scores
+
+    def persist(self, persist_dir: Union[str, Path]):
+        persist_path = Path(persist_dir) / self.PERSIST_FNAME
+        persist_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "k1": self.k1,
+            "b": self.b,
+            "epsilon": self.epsilon,
+            "doc_lens": self.doc_lens,
+            "postings": self.postings,
+        }
+        persist_path.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: Union[str, Path]) -> Optional["IncrementalBM25"]:
+        """Load postings saved by `persist`, return None if not found."""
+        persist_path = Path(persist_dir) / cls.PERSIST_FNAME
+        if not persist_path.exists():
+            return None
+
+        data = json.loads(persist_path.read_text(encoding="utf-8"))
+        bm25 = cls(k1=data["k1"], b=data["b"], epsilon=data["epsilon"])
+        bm25.postings = data["postings"]
+        bm25.doc_lens = data["doc_lens"]
+        bm25.total_len = sum(bm25.doc_lens.values())
+        bm25._doc_terms = {doc_id: [] for doc_id in bm25.doc_lens}
+        for term, posting in bm25.postings.items():
+            for doc_id in posting:
+                bm25._doc_terms[doc_id].append(term)
+
+        return bm25
+
+    def _raw_idf(self, df: int) -> float:
+        return math.log(len(self.doc_lens) - df + 0.5) - math.log(df + 0.5)
 
 
 class DynamicBM25Retriever(BM25Retriever):
-    """BM25 retriever."""
+    """BM25 retriever, support adding and deleting nodes incrementally."""
 
     def __init__(
         self,
@@ -22,28 +159,89 @@ class DynamicBM25Retriever(BM25Retriever):
         object_map: Optional[dict] = None,
         verbose: bool = False,
         index: VectorStoreIndex = None,
+        bm25: Optional[IncrementalBM25] = None,
     ) -> None:
-        super().__init__(
-            nodes=nodes,
-            tokenizer=tokenizer,
-            similarity_top_k=similarity_top_k,
+        """If `bm25` is given, e.g. loaded by `IncrementalBM25.from_persist_dir`, only nodes missing from it are tokenized."""
+        self._tokenizer = tokenizer or tokenize_remove_stopwords
+        self._similarity_top_k = similarity_top_k
+        self._nodes: dict[str, BaseNode] = {}
+        self._positions: dict[str, int] = {}  # node_id -> insertion counter, breaks ties like a stable sort
+        self._counter = itertools.count()
+        self.bm25 = bm25 or IncrementalBM25()
+        self._index = index
+
+        node_ids = {node.node_id for node in nodes}
+        for doc_id in [doc_id for doc_id in self.bm25.doc_lens if doc_id not in node_ids]:
+            self.bm25.delete(doc_id)
+        self._add_to_bm25([node for node in nodes if node.node_id not in self.bm25])
+        self._add_to_nodes(nodes)
+
+        # Skip BM25Retriever.__init__, which tokenizes the whole corpus into a BM25Okapi.
+        BaseRetriever.__init__(
+            self,
             callback_manager=callback_manager,
             object_map=object_map,
             objects=objects,
             verbose=verbose,
         )
-        self._index = index
 
     def add_nodes(self, nodes: list[BaseNode], **kwargs) -> None:
-        """Support add nodes."""
-        self._nodes.extend(nodes)
-        self._corpus = [self._tokenizer(node.get_content()) for node in self._nodes]
-        self.bm25 = BM25Okapi(self._corpus)
+        """Support add nodes, only the new nodes are tokenized."""
+        self._add_to_bm25(nodes)
+        self._add_to_nodes(nodes)
 
         if self._index:
             self._index.insert_nodes(nodes, **kwargs)
 
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """Support delete nodes by node_id."""
+        for node_id in node_ids:
+            self.bm25.delete(node_id)
+            self._nodes.pop(node_id, None)
+            self._positions.pop(node_id, None)
+
+        if self._index:
+            self._index.delete_nodes(node_ids, **kwargs)
+
     def persist(self, persist_dir: str, **kwargs) -> None:
-        """Support persist."""
+        """Support persist, the bm25 postings are saved next to the index."""
         if self._index:
             self._index.storage_context.persist(persist_dir)
+        self.bm25.persist(persist_dir)
+
+    def _add_to_bm25(self, nodes: list[BaseNode]):
+        for node in nodes:
+            self.bm25.add(node.node_id, self._tokenizer(node.get_content()))
+
+    def _add_to_nodes(self, nodes: list[BaseNode]):
+        for node in nodes:
+            if node.node_id not in self._positions:
+                self._positions[node.node_id] = next(self._counter)
+            self._nodes[node.node_id] = node
+
+    def _get_scored_nodes(self, query: str) -> list[NodeWithScore]:
+        scores = self.bm25.get_scores(self._tokenizer(query))
+
+        return [NodeWithScore(node=node, score=scores.get(node_id, 0.0)) for node_id, node in self._nodes.items()]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        """Only rank the nodes matching the query, nodes without any query term are padded in insertion order."""
+        if query_bundle.custom_embedding_strs or query_bundle.embedding:
+            logger.warning("BM25Retriever does not support embeddings, skipping...")
+
+        top_k = self._similarity_top_k
+        scores = self.bm25.get_scores(self._tokenizer(query_bundle.query_str))
+
+        # Same order as a stable sort of all nodes by score: ties keep insertion order.
+        candidates = list(scores.items())
+        padding = 0
+        for node_id in self._nodes:
+            if padding >= top_k:
+                break
+            if node_id not in scores:
+                candidates.append((node_id, 0.0))
+                padding += 1
+
+        top = heapq.nlargest(top_k, candidates, key=lambda c: (c[1], -self._positions[c[0]]))
+
+        return [NodeWithScore(node=self._nodes[node_id], score=score) for node_id, score in top]
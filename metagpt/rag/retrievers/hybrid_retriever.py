@@ -1,41 +1,58 @@
 """Hybrid retriever."""
 
+import asyncio
 import copy
+from typing import Literal, Optional
 
-from llama_index.core.schema import BaseNode, QueryType
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryType
 
+from metagpt.logs import logger
 from metagpt.rag.retrievers.base import RAGRetriever
 
 
 class SimpleHybridRetriever(RAGRetriever):
     """A composite retriever that aggregates search results from multiple retrievers."""
 
-    def __init__(self, *retrievers):
+    def __init__(
+        self,
+        *retrievers,
+        fusion_mode: Literal["simple", "rrf", "relative_score"] = "simple",
+        weights: Optional[list[float]] = None,
+        rrf_k: int = 60,
+        timeout: Optional[float] = None,
+        similarity_top_k: Optional[int] = None,
+    ):
+        """See `HybridRetrieverConfig` for the fusion arguments."""
+        if weights is not None and len(weights) != len(retrievers):
+            raise ValueError(f"Got {len(weights)} weights for {len(retrievers)} retrievers.")
+
         self.retrievers: list[RAGRetriever] = retrievers
+        self.fusion_mode = fusion_mode
+        self.weights = weights or [1.0] * len(retrievers)
+        self.rrf_k = rrf_k
+        self.timeout = timeout
+        self.similarity_top_k = similarity_top_k
         super().__init__()
 
     async def _aretrieve(self, query: QueryType, **kwargs):
         """Asynchronously retrieves and aggregates search results from all configured retrievers.
 
-        This method queries each retriever in the `retrievers` list with the given query and
-        additional keyword arguments. It then combines the results, ensuring that each node is
-        unique, based on the node's ID.
+        The retrievers are queried concurrently, each one bounded by `timeout`; a retriever that times out
+        contributes no nodes. The retrievers without an asynchronous `_aretrieve`, such as the BM25 one, are queried
+        in threads, a thread that times out is left to finish in the background. The results are then fused according
+        to `fusion_mode`.
         """
-        all_nodes = []
-        for retriever in self.retrievers:
-            # Prevent retriever changing query
-            query_copy = copy.deepcopy(query)
-            nodes = await retriever.aretrieve(query_copy, **kwargs)
-            all_nodes.extend(nodes)
-
-        # combine all nodes
-        result = []
-        node_ids = set()
-        for n in all_nodes:
-            if n.node.node_id not in node_ids:
-                result.append(n)
-                node_ids.add(n.node.node_id)
-        return result
+        results = await asyncio.gather(*[self._retrieve_one(r, query, **kwargs) for r in self.retrievers])
+
+        if self.fusion_mode == "rrf":
+            nodes = self._fuse_rrf(results)
+        elif self.fusion_mode == "relative_score":
+            nodes = self._fuse_relative_score(results)
+        else:
+            nodes = self._fuse_simple(results)
+
+        return nodes[: self.similarity_top_k] if self.similarity_top_k else nodes
 
     def add_nodes(self, nodes: list[BaseNode]) -> None:
         """Support add nodes."""
@@ -46,3 +63,63 @@ class SimpleHybridRetriever(RAGRetriever):
         """Support persist."""
         for r in self.retrievers:
             r.persist(persist_dir, **kwargs)
+
+    async def _retrieve_one(self, retriever: RAGRetriever, query: QueryType, **kwargs) -> list[NodeWithScore]:
+        # Prevent retriever changing query, e.g. setting the embedding of QueryBundle, a shallow copy is enough.
+        query_copy = copy.copy(query)
+        if getattr(type(retriever), "_aretrieve", None) is BaseRetriever._aretrieve:  # calls the sync _retrieve
+            retrieval = asyncio.to_thread(retriever.retrieve, query_copy, **kwargs)
+        else:
+            retrieval = retriever.aretrieve(query_copy, **kwargs)
+        try:
+            return await asyncio.wait_for(retrieval, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{type(retriever).__name__} timed out after {self.timeout}s, skip its results.")
+            return []
+
+    @staticmethod
+    def _fuse_simple(results: list[list[NodeWithScore]]) -> list[NodeWithScore]:
+        """Combine all nodes, keeping the first seen of each node id."""
+        fused: dict[str, NodeWithScore] = {}
+        for nodes in results:
+            for n in nodes:
+                fused.setdefault(n.node.node_id, n)
+
+        return list(fused.values())
+
+    def _fuse_rrf(self, results: list[list[NodeWithScore]]) -> list[NodeWithScore]:
+        """Reciprocal rank fusion, score = sum(weight / (rrf_k + rank)), rank starts from 1."""
+        scores = []
+        for nodes, weight in zip(results, self.weights):
+            node_scores = {}
+            for rank, n in enumerate(nodes, start=1):
+                node_scores.setdefault(n.node.node_id, weight / (self.rrf_k + rank))
+            scores.append(node_scores)
+
+        return self._merge_scores(results, scores)
+
+    def _fuse_relative_score(self, results: list[list[NodeWithScore]]) -> list[NodeWithScore]:
+        """Min-max normalize the scores of each retriever into [0, 1], then sum them with weights."""
+        scores = []
+        for nodes, weight in zip(results, self.weights):
+            raw = [n.score or 0.0 for n in nodes]
+            low, high = min(raw, default=0.0), max(raw, default=0.0)
+            span = high - low
+            scores.append({n.node.node_id: weight * ((s - low) / span if span else 1.0) for n, s in zip(nodes, raw)})
+
+        return self._merge_scores(results, scores)
+
+    @staticmethod
+    def _merge_scores(results: list[list[NodeWithScore]], scores: list[dict[str, float]]) -> list[NodeWithScore]:
+        """Sum the per retriever scores of each node, sorted by the fused score in descending order."""
+        fused_scores: dict[str, float] = {}
+        fused_nodes: dict[str, NodeWithScore] = {}
+        for nodes, node_scores in zip(results, scores):
+            for n in nodes:
+                fused_nodes.setdefault(n.node.node_id, n)
+            for node_id, score in node_scores.items():
+                fused_scores[node_id] = fused_scores.get(node_id, 0.0) + score
+
+        ranked = sorted(fused_scores, key=fused_scores.get, reverse=True)
+
+        return [NodeWithScore(node=fused_nodes[node_id].node, score=fused_scores[node_id]) for node_id in ranked]
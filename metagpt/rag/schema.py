@@ -101,6 +101,28 @@ class ElasticsearchKeywordRetrieverConfig(ElasticsearchRetrieverConfig):
     )
 
 
+class HybridRetrieverConfig(BaseRetrieverConfig):
+    """Config for SimpleHybridRetriever, used when there are multiple retriever configs.
+
+    It doesn't create a retriever by itself, put it in the same list as the other retriever configs.
+    """
+
+    _no_embedding: bool = PrivateAttr(default=True)
+    similarity_top_k: Optional[int] = Field(default=None, description="Number of fused results, None keeps all.")
+    fusion_mode: Literal["simple", "rrf", "relative_score"] = Field(
+        default="simple",
+        description="simple: dedupe by node id keeping the first seen; rrf: reciprocal rank fusion; "
+        "relative_score: sum of min-max normalized scores.",
+    )
+    weights: Optional[list[float]] = Field(
+        default=None, description="Weight of each retriever in fusion, in the order of the configs. Default all 1."
+    )
+    rrf_k: int = Field(default=60, description="The constant k of reciprocal rank fusion, 1 / (k + rank).")
+    timeout: Optional[float] = Field(
+        default=None, description="Seconds to wait for each retriever, the results of a timed out one are skipped."
+    )
+
+
 class BaseRankerConfig(BaseModel):
     """Common config for rankers.
 
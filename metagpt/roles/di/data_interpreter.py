@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from typing import Literal
 
@@ -43,6 +44,10 @@ class DataInterpreter(Role):
     tool_recommender: ToolRecommender = None
     react_mode: Literal["plan_and_act", "react"] = "plan_and_act"
     max_react_loop: int = 10  # used for react mode
+    # code candidates written per trial, the first is run in the kernel and the others in forks of it, needing a
+    # kernel supporting fork. If the first fails, a successful one is run again in the kernel, after the changes made by
+    # the first before its error, and the files written by the candidates are shared: see ExecuteNbCode.run_candidates
+    code_candidates: int = 1
 
     @model_validator(mode="after")
     def set_plan_and_tool(self) -> "Interpreter":
@@ -60,6 +65,12 @@ class DataInterpreter(Role):
     def working_memory(self):
         return self.rc.working_memory
 
+    async def react(self) -> Message:
+        # start the kernels of the pool, if enabled, while planning and writing the first code
+        self.execute_code.set_context(self.context, override=False)
+        self.execute_code.warm_up()
+        return await super().react()
+
     async def _think(self) -> bool:
         """Useful in 'react' mode. Use LLM to decide whether and what to do next."""
         user_requirement = self.get_memories()[0].content
@@ -121,13 +132,18 @@ class DataInterpreter(Role):
         await self._check_data()
 
         while not success and counter < max_retry:
-            ### write code ###
-            code, cause_by = await self._write_code(counter, plan_status, tool_info)
-
-            self.working_memory.add(Message(content=code, role="assistant", cause_by=cause_by))
-
-            ### execute code ###
-            result, success = await self.execute_code.run(code)
+            if self.code_candidates > 1:
+                ### write and execute code candidates in parallel ###
+                code, cause_by, result, success = await self._write_and_exec_candidates(counter, plan_status, tool_info)
+                self.working_memory.add(Message(content=code, role="assistant", cause_by=cause_by))
+            else:
+                ### write code ###
+                code, cause_by = await self._write_code(counter, plan_status, tool_info)
+
+                self.working_memory.add(Message(content=code, role="assistant", cause_by=cause_by))
+
+                ### execute code ###
+                result, success = await self.execute_code.run(code)
             print(result)
 
             self.working_memory.add(Message(content=result, role="user", cause_by=ExecuteNbCode))
@@ -165,6 +181,19 @@ class DataInterpreter(Role):
 
         return code, todo
 
+    async def _write_and_exec_candidates(self, counter: int, plan_status: str = "", tool_info: str = ""):
+        """Write code candidates concurrently and run them with ExecuteNbCode.run_candidates: the first one in the
+        kernel while the others are tried in forks of the kernel, one of which is run in the kernel if the first fails.
+        """
+        rsps = await asyncio.gather(
+            *[self._write_code(counter, plan_status, tool_info) for _ in range(self.code_candidates)]
+        )
+        cause_by = rsps[0][1]
+        codes = list(dict.fromkeys(code for code, _ in rsps))  # the same code is tried once
+        index, result, success = await self.execute_code.run_candidates(codes)
+        logger.info(f"{len(codes)} code candidates tried, candidate {index} run in the kernel, success: {success}")
+        return codes[index], cause_by, result, success
+
     async def _check_data(self):
         if (
             not self.use_plan
@@ -310,6 +310,12 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
     def is_watch(self, caused_by: str):
         return caused_by in self.rc.watch
 
+    def is_interested(self, message: Message) -> bool:
+        """Return whether the role reacts to the message: it is caused by a watched Action or sent to the role by name.
+        The environment also uses it to decide whether a published message should wake the role up.
+        """
+        return message.cause_by in self.rc.watch or self.name in message.send_to
+
     def set_addresses(self, addresses: Set[str]):
         """Used to receive Messages with certain tags from the environment. Message will be put into personal message
         buffer to be further processed in _observe. By default, a Role subscribes Messages with a tag of its own name
@@ -425,13 +431,14 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
             news = [self.latest_observed_msg] if self.latest_observed_msg else []
         if not news:
             news = self.rc.msg_buffer.pop_all()
-        # Store the read messages in your own memory to prevent duplicate processing.
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        # Store the read messages in your own memory to prevent duplicate processing. Messages already in memory are
+        # skipped by `add`, so the ones added after the watermark are exactly the unseen ones.
+        watermark = self.rc.memory.last_seq
         self.rc.memory.add_batch(news)
+        if not ignore_memory:
+            news = self.rc.memory.get_since(watermark)
         # Filter out messages of interest.
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in news if self.is_interested(n)]
         self.latest_observed_msg = self.rc.news[-1] if self.rc.news else None  # record the latest observed msg
 
         # Design Rules:
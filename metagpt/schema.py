@@ -21,9 +21,10 @@ import os.path
 import uuid
 from abc import ABC
 from asyncio import Queue, QueueEmpty, wait_for
+from collections import deque
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar, Union
+from typing import Any, Deque, Dict, Iterable, List, Optional, Type, TypeVar, Union
 
 from pydantic import (
     BaseModel,
@@ -604,6 +605,61 @@ class MessageQueue(BaseModel):
         return queue
 
 
+class MessageHistory(BaseModel):
+    """Bounded, append-only log of published messages, kept for debugging.
+
+    Once `capacity` messages are kept, the oldest one is evicted on each append. Evicted messages are appended to
+    `spill_path` as JSON lines if it is set. Set `enabled` to False to skip recording entirely in production runs.
+    """
+
+    enabled: bool = True
+    capacity: int = 0  # max number of messages kept in memory, 0 means unbounded
+    spill_path: Optional[Path] = None
+    messages: Deque[Message] = Field(default_factory=deque)
+
+    @model_validator(mode="after")
+    def check_capacity(self) -> "MessageHistory":
+        if self.messages.maxlen != (self.capacity or None):
+            self.messages = deque(self.messages, maxlen=self.capacity or None)
+        return self
+
+    @field_serializer("messages", mode="wrap")
+    def ser_messages(self, messages: Deque[Message], handler) -> list:
+        return list(handler(messages))
+
+    @field_serializer("spill_path")
+    def ser_spill_path(self, spill_path: Optional[Path]) -> Optional[str]:
+        return str(spill_path) if spill_path else None
+
+    def add(self, message: Message):
+        """Append a message, evicting the oldest one if the history is full."""
+        if not self.enabled:
+            return
+        if self.capacity and len(self.messages) == self.capacity:
+            self._spill(self.messages[0])
+        self.messages.append(message)
+
+    def get(self, k=0) -> list[Message]:
+        """Return the most recent k messages in memory, return all when k=0"""
+        return list(self.messages)[-k:]
+
+    def clear(self):
+        self.messages.clear()
+
+    def _spill(self, message: Message):
+        if not self.spill_path:
+            return
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spill_path, "a", encoding="utf-8") as writer:
+            writer.write(message.dump() + "\n")
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __str__(self):
+        return "".join(f"\n{i}" for i in self.messages)
+
+
 # 定义一个泛型类型变量
 T = TypeVar("T", bound="BaseModel")
 
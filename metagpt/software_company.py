@@ -37,6 +37,7 @@ def generate_repo(
         QaEngineer,
     )
     from metagpt.team import Team
+    from metagpt.utils.ahttp_client import SESSION_POOL
 
     config.update_via_cli(project_path, project_name, inc, reqa_file, max_auto_summarize_code)
     ctx = Context(config=config)
@@ -66,7 +67,15 @@ def generate_repo(
 
     company.invest(investment)
     company.run_project(idea)
-    asyncio.run(company.run(n_round=n_round))
+
+    async def run_company():
+        try:
+            await company.run(n_round=n_round)
+        finally:
+            await company.close()
+            await SESSION_POOL.close()
+
+    asyncio.run(run_company())
 
     return ctx.repo
 
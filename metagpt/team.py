@@ -27,6 +27,7 @@ from metagpt.utils.common import (
     serialize_decorator,
     write_json_file,
 )
+from metagpt.utils.kernel_pool import close_kernel_pools
 
 
 class Team(BaseModel):
@@ -92,6 +93,12 @@ class Team(BaseModel):
         self.cost_manager.max_budget = investment
         logger.info(f"Investment: ${investment}.")
 
+    async def close(self):
+        """Release the resources shared by the roles, such as the LLM clients and the warm kernels of the kernel pools.
+        Call it once the team is done, the roles can't call their LLM afterwards."""
+        await self.env.context.aclose_llms()
+        await close_kernel_pools()
+
     def _check_balance(self):
         if self.cost_manager.total_cost >= self.cost_manager.max_budget:
             raise NoMoneyException(self.cost_manager.total_cost, f"Insufficient funds: {self.cost_manager.max_budget}")
@@ -120,11 +127,24 @@ class Team(BaseModel):
         return self.run_project(idea=idea, send_to=send_to)
 
     @serialize_decorator
-    async def run(self, n_round=3, idea="", send_to="", auto_archive=True):
-        """Run company until target round or no money"""
+    async def run(self, n_round=3, idea="", send_to="", auto_archive=True, event_driven=False, max_concurrency=0):
+        """Run company until target round or no money
+
+        With `event_driven`, roles run as soon as they receive messages they are interested in, at most
+        `max_concurrency` of them at once (0 means unlimited), and the run ends once no role has anything to do.
+        `n_round * len(roles)` caps the total number of role runs in that mode.
+        """
         if idea:
             self.run_project(idea=idea, send_to=send_to)
 
+        if event_driven:
+            await self.env.run_until_idle(
+                max_concurrency=max_concurrency,
+                max_runs=n_round * len(self.env.roles),
+                before_run=self._check_balance,
+            )
+            n_round = 0
+
         while n_round > 0:
             n_round -= 1
             self._check_balance()
@@ -132,4 +152,4 @@ class Team(BaseModel):
 
             logger.debug(f"max {n_round=} left.")
         self.env.archive(auto_archive)
-        return self.env.history
+        return str(self.env.history)
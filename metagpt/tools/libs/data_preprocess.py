@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from typing import Literal
+from typing import Literal, Optional
 
 import numpy as np
 import pandas as pd
@@ -56,6 +56,20 @@ class MLProcess:
         self.fit(df)
         return self.transform(df)
 
+    def _get_input_cols(self) -> Optional[list]:
+        """
+        Columns read by transform, which returns them processed or dropped along with the new columns, so that
+        MLPipeline can transform these columns only. None if transform needs the whole DataFrame.
+        """
+        return None
+
+    def _supports_partial_fit(self) -> bool:
+        return False
+
+    def _partial_fit(self, df: pd.DataFrame):
+        """Fit incrementally on a chunk of the data, used by MLPipeline to fit the data larger than memory."""
+        raise NotImplementedError
+
 
 class DataPreprocessTool(MLProcess):
     """
@@ -84,6 +98,19 @@ class DataPreprocessTool(MLProcess):
         new_df[self.features] = self.model.transform(new_df[self.features])
         return new_df
 
+    def _get_input_cols(self) -> Optional[list]:
+        return self.features
+
+    def _supports_partial_fit(self) -> bool:
+        return hasattr(self.model, "partial_fit")
+
+    def _partial_fit(self, df: pd.DataFrame):
+        if not self._supports_partial_fit():
+            raise NotImplementedError(f"{type(self).__name__} can't be fitted incrementally")
+        if len(self.features) == 0:
+            return
+        self.model.partial_fit(df[self.features])
+
 
 @register_tool(tags=TAGS)
 class FillMissingValue(DataPreprocessTool):
@@ -162,6 +189,22 @@ class OrdinalEncode(DataPreprocessTool):
         self.features = features
         self.model = OrdinalEncoder()
 
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        if len(self.features) == 0:
+            return df
+        new_df = df.copy()
+        for col, categories in zip(self.features, self.model.categories_):
+            categories = pd.Index(categories)
+            missing = df[col].isna().to_numpy()
+            codes = _get_codes(df[col], categories[~categories.isna()])
+            unknown = (codes < 0) & ~missing
+            if unknown.any():
+                raise ValueError(
+                    f"Found unknown categories {list(df[col][unknown].unique())} in column {col} during transform"
+                )
+            new_df[col] = np.where(missing, np.nan, codes)
+        return new_df
+
 
 @register_tool(tags=TAGS)
 class OneHotEncode(DataPreprocessTool):
@@ -202,22 +245,49 @@ class LabelEncode(DataPreprocessTool):
         if len(self.features) == 0:
             return
         for col in self.features:
-            le = LabelEncoder().fit(df[col].astype(str).unique().tolist() + ["unknown"])
+            classes = pd.Series(df[col].unique()).astype(str).unique().tolist()
+            le = LabelEncoder().fit(classes + ["unknown"])
             self.le_encoders.append(le)
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         if len(self.features) == 0:
             return df
         new_df = df.copy()
-        for i in range(len(self.features)):
-            data_list = df[self.features[i]].astype(str).tolist()
-            for unique_item in np.unique(df[self.features[i]].astype(str)):
-                if unique_item not in self.le_encoders[i].classes_:
-                    data_list = ["unknown" if x == unique_item else x for x in data_list]
-            new_df[self.features[i]] = self.le_encoders[i].transform(data_list)
+        for col, le in zip(self.features, self.le_encoders):
+            classes = pd.Index(le.classes_)
+            codes = _get_codes(df[col], classes, key=lambda values: values.astype(str))
+            missing = df[col].isna().to_numpy()
+            if missing.any():  # None, nan and NaT are encoded by their different strings
+                codes[missing] = classes.get_indexer(df[col][missing].astype(str))
+            # set the unseen categories to "unknown"
+            codes[codes < 0] = classes.get_loc("unknown")
+            new_df[col] = codes
         return new_df
 
 
+def _get_codes(values: pd.Series, categories: pd.Index, key=None) -> np.ndarray:
+    """
+    Look up the positions of the values in the categories with a hash table, each distinct value only once.
+
+    Args:
+        values (pd.Series): The values to be looked up.
+        categories (pd.Index): The unique categories.
+        key (callable, optional): Applied to the distinct values as a pd.Series before the lookup. Defaults to None.
+
+    Returns:
+        np.ndarray: The positions, -1 for the missing values and the ones not in the categories.
+    """
+    value_codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques)
+    if key is not None:
+        uniques = key(uniques)
+    table = categories.get_indexer(uniques)
+    codes = np.full(len(values), -1, dtype=np.intp)
+    found = value_codes >= 0
+    codes[found] = table[value_codes[found]]
+    return codes
+
+
 def get_column_info(df: pd.DataFrame) -> dict:
     """
     Analyzes a DataFrame and categorizes its columns based on data types.
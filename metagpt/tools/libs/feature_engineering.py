@@ -7,11 +7,11 @@
 from __future__ import annotations
 
 import itertools
+from typing import Optional
 
 # import lightgbm as lgb
 import numpy as np
 import pandas as pd
-from joblib import Parallel, delayed
 from pandas.core.dtypes.common import is_object_dtype
 from sklearn.feature_selection import VarianceThreshold
 from sklearn.model_selection import KFold
@@ -65,6 +65,9 @@ class PolynomialExpansion(MLProcess):
         new_df = pd.concat([new_df, ts_data], axis=1)
         return new_df
 
+    def _get_input_cols(self) -> Optional[list]:
+        return self.cols
+
 
 @register_tool(tags=TAGS)
 class CatCount(MLProcess):
@@ -90,6 +93,9 @@ class CatCount(MLProcess):
         new_df[f"{self.col}_cnt"] = new_df[self.col].map(self.encoder_dict)
         return new_df
 
+    def _get_input_cols(self) -> Optional[list]:
+        return [self.col]
+
 
 @register_tool(tags=TAGS)
 class TargetMeanEncoder(MLProcess):
@@ -117,6 +123,9 @@ class TargetMeanEncoder(MLProcess):
         new_df[f"{self.col}_target_mean"] = new_df[self.col].map(self.encoder_dict)
         return new_df
 
+    def _get_input_cols(self) -> Optional[list]:
+        return [self.col]
+
 
 @register_tool(tags=TAGS)
 class KFoldTargetMeanEncoder(MLProcess):
@@ -157,6 +166,9 @@ class KFoldTargetMeanEncoder(MLProcess):
         new_df[f"{self.col}_kf_target_mean"] = new_df[self.col].map(self.encoder_dict)
         return new_df
 
+    def _get_input_cols(self) -> Optional[list]:
+        return [self.col]
+
 
 @register_tool(tags=TAGS)
 class CatCross(MLProcess):
@@ -175,44 +187,33 @@ class CatCross(MLProcess):
         self.cols = cols
         self.max_cat_num = max_cat_num
         self.combs = []
-        self.combs_map = {}
-
-    @staticmethod
-    def _cross_two(comb, df):
-        """
-        Cross two columns and convert them to numerical features.
-
-        Args:
-            comb (tuple): The pair of columns to be crossed.
-            df (pd.DataFrame): The input DataFrame.
-
-        Returns:
-            tuple: The new column name and the crossed feature map.
-        """
-        new_col = f"{comb[0]}_{comb[1]}"
-        new_col_combs = list(itertools.product(df[comb[0]].unique(), df[comb[1]].unique()))
-        ll = list(range(len(new_col_combs)))
-        comb_map = dict(zip(new_col_combs, ll))
-        return new_col, comb_map
+        self.categories = {}  # col -> unique values in the order of appearance
 
     def fit(self, df: pd.DataFrame):
-        for col in self.cols:
-            if df[col].nunique() > self.max_cat_num:
-                self.cols.remove(col)
-        self.combs = list(itertools.combinations(self.cols, 2))
-        res = Parallel(n_jobs=4, require="sharedmem")(delayed(self._cross_two)(comb, df) for comb in self.combs)
-        self.combs_map = dict(res)
+        cols = [col for col in self.cols if df[col].nunique() <= self.max_cat_num]
+        self.combs = list(itertools.combinations(cols, 2))
+        self.categories = {col: pd.Index(pd.unique(df[col])) for col in cols}
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
-        new_df = df.copy()
-        for comb in self.combs:
-            new_col = f"{comb[0]}_{comb[1]}"
-            _map = self.combs_map[new_col]
-            new_df[new_col] = pd.Series(zip(new_df[comb[0]], new_df[comb[1]])).map(_map)
+        codes = {col: categories.get_indexer(df[col]) for col, categories in self.categories.items()}
+        crossed = {}
+        for col_a, col_b in self.combs:
+            # pairs are numbered as in the product of the unique values without building it
+            n_b = len(self.categories[col_b])
+            code_a, code_b = codes[col_a], codes[col_b]
+            new_col = code_a * n_b + code_b
             # set the unknown value to a new number
-            new_df[new_col].fillna(max(_map.values()) + 1, inplace=True)
-            new_df[new_col] = new_df[new_col].astype(int)
-        return new_df
+            new_col[(code_a < 0) | (code_b < 0)] = len(self.categories[col_a]) * n_b
+            crossed[f"{col_a}_{col_b}"] = new_col
+        if not crossed:
+            return df
+        existing = [col for col in crossed if col in df.columns]
+        if existing:
+            df = df.drop(columns=existing)
+        return pd.concat([df, pd.DataFrame(crossed, index=df.index)], axis=1, copy=False)
+
+    def _get_input_cols(self) -> Optional[list]:
+        return list(self.categories)
 
 
 @register_tool(tags=TAGS)
@@ -274,6 +275,9 @@ class SplitBins(MLProcess):
         new_df[self.cols] = self.encoder.transform(new_df[self.cols].fillna(0))
         return new_df
 
+    def _get_input_cols(self) -> Optional[list]:
+        return self.cols
+
 
 # @register_tool(tags=TAGS)
 class ExtractTimeComps(MLProcess):
@@ -314,6 +318,9 @@ class ExtractTimeComps(MLProcess):
         new_df = pd.concat([df, time_comps_df], axis=1)
         return new_df
 
+    def _get_input_cols(self) -> Optional[list]:
+        return [self.time_col]
+
 
 @register_tool(tags=TAGS)
 class GeneralSelection(MLProcess):
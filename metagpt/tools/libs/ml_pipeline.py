@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18
+# @File    : ml_pipeline.py
+# @Desc    : Pipeline chaining MLProcess tools without intermediate copies, in memory or over chunks
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Union
+
+import pandas as pd
+
+from metagpt.tools.libs.data_preprocess import MLProcess
+
+
+class MLPipeline(MLProcess):
+    """
+    Chain MLProcess tools, fitting and transforming them in order.
+
+    Every tool copies the whole DataFrame in its transform, so a chain of n tools makes n full copies. The pipeline
+    keeps the columns in a dict instead and passes the tools declaring their input columns only these columns, so
+    consecutive column-local tools are fused and the data is copied once, when the result is assembled. Tools
+    needing the whole DataFrame, such as GroupStat or the feature selections, get a DataFrame sharing the columns.
+
+    For the data larger than memory, fit with `fit_chunks` and transform with `transform_chunks` or
+    `transform_file`.
+    """
+
+    def __init__(self, steps: list[MLProcess]):
+        """
+        Initialize self.
+
+        Args:
+            steps (list[MLProcess]): The tools to be applied in order.
+        """
+        self.steps = steps
+
+    def fit(self, df: pd.DataFrame):
+        self._run(df, self.steps, fit=True)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame(self._run(df, self.steps))
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame(self._run(df, self.steps, fit=True))
+
+    def fit_chunks(self, make_chunks: Callable[[], Iterable[pd.DataFrame]], sample_rows: int = 100_000):
+        """
+        Fit on the data larger than memory. The tools supporting partial fit, such as StandardScale, are fitted on
+        all the chunks with one pass over them each, the others on the first `sample_rows` rows.
+
+        Args:
+            make_chunks (Callable[[], Iterable[pd.DataFrame]]): Returns a new iterator of the chunks for each pass,
+                such as `lambda: read_chunks(path)`.
+            sample_rows (int, optional): Number of rows to fit the other tools. Defaults to 100_000.
+        """
+        sample = []
+        for chunk in make_chunks():
+            sample.append(chunk.iloc[: sample_rows - sum(len(i) for i in sample)])
+            if sum(len(i) for i in sample) >= sample_rows:
+                break
+        sample = pd.concat(sample)
+
+        for i, step in enumerate(self.steps):
+            if step._supports_partial_fit():
+                for chunk in make_chunks():
+                    step._partial_fit(pd.DataFrame(self._run(chunk, self.steps[:i]), copy=False))
+            else:
+                step.fit(sample)
+            sample = pd.DataFrame(self._run(sample, [step]), copy=False)
+
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Transform the chunks one by one, only one chunk is in memory at a time.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The chunks of the data, such as `read_chunks(path)`.
+
+        Returns:
+            Iterator[pd.DataFrame]: The transformed chunks.
+        """
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def transform_file(self, input_path: Union[str, Path], output_path: Union[str, Path], chunksize: int = 100_000):
+        """
+        Transform a csv or parquet file chunk by chunk into another one.
+
+        Args:
+            input_path (Union[str, Path]): The csv or parquet file to be transformed.
+            output_path (Union[str, Path]): The csv or parquet file to write, by its suffix.
+            chunksize (int, optional): Number of rows per chunk. Defaults to 100_000.
+        """
+        chunks = self.transform_chunks(read_chunks(input_path, chunksize=chunksize))
+        if Path(output_path).suffix != ".parquet":
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            return
+
+        pa, pq = _import_pyarrow()
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    @staticmethod
+    def _run(df: pd.DataFrame, steps: list[MLProcess], fit: bool = False) -> Dict[str, pd.Series]:
+        columns = {col: df[col] for col in df.columns}
+        for step in steps:
+            if fit:
+                step.fit(pd.DataFrame(columns, copy=False))
+            cols = step._get_input_cols()
+            if cols is None:
+                new_df = step.transform(pd.DataFrame(columns, copy=False))
+                columns = {col: new_df[col] for col in new_df.columns}
+                continue
+
+            inputs = {col: columns[col] for col in cols}
+            index = next(iter(columns.values())).index if columns else None
+            new_df = step.transform(pd.DataFrame(inputs, copy=False) if inputs else pd.DataFrame(index=index))
+            for col in cols:
+                if col not in new_df.columns:
+                    columns.pop(col)
+            columns.update({col: new_df[col] for col in new_df.columns})
+        return columns
+
+
+def read_chunks(path: Union[str, Path], chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Read a csv or parquet file chunk by chunk.
+
+    Args:
+        path (Union[str, Path]): The csv or parquet file, by its suffix.
+        chunksize (int, optional): Number of rows per chunk. Defaults to 100_000.
+
+    Returns:
+        Iterator[pd.DataFrame]: The chunks.
+    """
+    if Path(path).suffix != ".parquet":
+        with pd.read_csv(path, chunksize=chunksize) as reader:
+            yield from reader
+        return
+
+    _, pq = _import_pyarrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(
+            "To read or write parquet files by chunks, you should have the `pyarrow` Python package installed. "
+            "You can install it by running the command: `pip install pyarrow`"
+        )
+    return pa, pq
@@ -2,11 +2,77 @@
 # -*- coding: utf-8 -*-
 # @Desc   : pure async http_client
 
-from typing import Any, Mapping, Optional, Union
+import asyncio
+from typing import Any, Dict, Mapping, Optional, Union
 
 import aiohttp
 from aiohttp.client import DEFAULT_TIMEOUT
 
+from metagpt.logs import logger
+
+
+class ClientSessionPool:
+    """Process-wide aiohttp sessions, so that requests to the same host reuse kept-alive connections.
+
+    A session is bound to the event loop it was created in, so there is one session per running loop. Sessions of
+    loops that have been closed are closed by the next `get`. Call `close` before the loop ends for a graceful
+    shutdown. The limits of the connections are those of `config.http_pool` unless given.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    async def get(self) -> aiohttp.ClientSession:
+        """Return the session of the running loop, create it if not exists or closed."""
+        loop = asyncio.get_running_loop()
+        for other in [other for other in self._sessions if other.is_closed()]:
+            await self._close_session(self._sessions.pop(other))
+
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(connector=self._new_connector())
+            self._sessions[loop] = session
+        return session
+
+    async def close(self):
+        """Close the session of the running loop, a new one is created by the next `get`."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await self._close_session(session)
+
+    def _new_connector(self) -> aiohttp.TCPConnector:
+        from metagpt.config2 import (
+            config,  # not at the top, the configs import the metagpt.utils package
+        )
+
+        return aiohttp.TCPConnector(
+            limit=config.http_pool.limit if self.limit is None else self.limit,
+            limit_per_host=config.http_pool.limit_per_host if self.limit_per_host is None else self.limit_per_host,
+            keepalive_timeout=(
+                config.http_pool.keepalive_timeout if self.keepalive_timeout is None else self.keepalive_timeout
+            ),
+        )
+
+    @staticmethod
+    async def _close_session(session: aiohttp.ClientSession):
+        if session.closed:
+            return
+        try:
+            await session.close()
+        except Exception as e:
+            logger.warning(f"Failed to close the aiohttp session: {e}")
+
+
+SESSION_POOL = ClientSessionPool()
+
 
 async def apost(
     url: str,
@@ -18,13 +84,13 @@ async def apost(
     encoding: str = "utf-8",
     timeout: int = DEFAULT_TIMEOUT.total,
 ) -> Union[str, dict]:
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
-            if as_json:
-                data = await resp.json()
-            else:
-                data = await resp.read()
-                data = data.decode(encoding)
+    session = await SESSION_POOL.get()
+    async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
+        if as_json:
+            data = await resp.json()
+        else:
+            data = await resp.read()
+            data = data.decode(encoding)
     return data
 
 
@@ -43,7 +109,7 @@ async def apost_stream(
         async for line in result:
             deal_with(line)
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
-            async for line in resp.content:
-                yield line.decode(encoding)
+    session = await SESSION_POOL.get()
+    async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
+        async for line in resp.content:
+            yield line.decode(encoding)
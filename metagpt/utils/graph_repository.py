@@ -101,6 +101,18 @@ class GraphRepository(ABC):
         """
         pass
 
+    async def insert_many(self, rows: List[SPO]):
+        """Insert multiple triples into the graph repository.
+
+        Args:
+            rows (List[SPO]): The triples to insert.
+
+        Example:
+            await my_repository.insert_many([SPO(subject="Node1", predicate="connects_to", object_="Node2")])
+        """
+        for r in rows:
+            await self.insert(subject=r.subject, predicate=r.predicate, object_=r.object_)
+
     @abstractmethod
     async def select(self, subject: str = None, predicate: str = None, object_: str = None) -> List[SPO]:
         """Retrieve triples from the graph repository based on specified criteria.
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : kernel_pool.py
+@Desc    : A pool of warm Jupyter kernels, so that a notebook starts without waiting for the kernel and its imports.
+"""
+from __future__ import annotations
+
+import asyncio
+import queue
+import time
+import weakref
+from typing import Dict, List, Optional, Set, Tuple
+
+import nbformat
+from jupyter_client import AsyncKernelClient, AsyncKernelManager
+from nbclient import NotebookClient
+
+from metagpt.configs.kernel_pool_config import KernelPoolConfig
+from metagpt.logs import logger
+
+KERNEL_COMMAND_TIMEOUT = 60  # seconds to preload or check a kernel
+SHELL_POLL_INTERVAL = 0.05  # seconds
+
+
+class PooledKernel:
+    """A kernel manager and its started client"""
+
+    def __init__(self, km: AsyncKernelManager, kc: AsyncKernelClient):
+        self.km = km
+        self.kc = kc
+
+
+class KernelPool:
+    """Keep `size` kernels started, with `preload_modules` imported, for `acquire` to return at once.
+
+    Acquiring a kernel starts another one in the background. A released kernel is shut down rather than reused, as
+    resetting its namespace would keep the state of its process, such as the working directory, the environment
+    variables or the pandas options, for the next notebook. Once closed, the pool doesn't start kernels in the
+    background anymore.
+    """
+
+    def __init__(self, size: int = 1, preload_modules: List[str] = None):
+        self.size = size
+        self.preload_modules = preload_modules or []
+        self._idle: List[PooledKernel] = []
+        self._starting: Set[asyncio.Task] = set()
+        self._in_use: Dict[int, PooledKernel] = {}  # id(km) -> kernel
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config: KernelPoolConfig) -> KernelPool:
+        return cls(
+            size=config.size,
+            preload_modules=config.preload_modules,
+        )
+
+    async def fill(self):
+        """Start kernels until the pool is full, and wait for them to be ready"""
+        self._warm(self.size - len(self._idle) - len(self._starting))
+        if self._starting:
+            await asyncio.wait(set(self._starting))
+
+    async def acquire(self) -> Tuple[AsyncKernelManager, AsyncKernelClient]:
+        """Take a healthy kernel from the pool, waiting for a starting one or starting one if none is idle"""
+        while True:
+            if not self._idle and self._starting:
+                await asyncio.wait(set(self._starting), return_when=asyncio.FIRST_COMPLETED)
+                continue
+            if not self._idle:
+                kernel = await self._start()
+                break
+            kernel = self._idle.pop(0)
+            if await self._is_healthy(kernel):
+                break
+            await self._shutdown(kernel)
+
+        self._in_use[id(kernel.km)] = kernel
+        self._warm(self.size - len(self._idle) - len(self._starting))
+        return kernel.km, kernel.kc
+
+    async def release(self, km: AsyncKernelManager, kc: AsyncKernelClient):
+        """Give back a kernel, which is shut down, and start kernels until the pool is full again"""
+        kernel = self._in_use.pop(id(km), None) or PooledKernel(km, kc)
+        await self._shutdown(kernel)
+        self._warm(self.size - len(self._idle) - len(self._starting))
+
+    async def close(self, in_use: bool = False):
+        """Shut down the idle and starting kernels, the acquired ones are shut down once released, or now if in_use,
+        such as when their event loop ends"""
+        self._closed = True
+        # the starting kernels are shut down once started, cancelling their start may break the channels of the client
+        await asyncio.gather(*self._starting, return_exceptions=True)
+        kernels, self._idle = self._idle, []
+        if in_use:
+            kernels, self._in_use = kernels + list(self._in_use.values()), {}
+        await asyncio.gather(*[self._shutdown(kernel) for kernel in kernels])
+
+    def _warm(self, n: int):
+        if self._closed:
+            return
+        for _ in range(n):
+            task = asyncio.create_task(self._warm_one())
+            self._starting.add(task)
+            task.add_done_callback(self._starting.discard)
+
+    async def _warm_one(self):
+        try:
+            kernel = await self._start()
+        except Exception as e:
+            logger.warning(f"Failed to start a kernel for the pool: {e}")
+            return
+        if not self._closed and len(self._idle) < self.size:
+            self._idle.append(kernel)
+        else:  # the pool was closed meanwhile
+            await self._shutdown(kernel)
+
+    async def _start(self) -> PooledKernel:
+        client = NotebookClient(nbformat.v4.new_notebook())
+        client.create_kernel_manager()
+        try:
+            await client.async_start_new_kernel()
+            await client.async_start_new_kernel_client()
+            kernel = PooledKernel(client.km, client.kc)
+            if self.preload_modules:
+                code = "\n".join(f"try:\n    import {m}\nexcept ImportError:\n    pass" for m in self.preload_modules)
+                await self._run(kernel, code)
+        except BaseException:  # including the cancellation of the pending tasks when the loop ends
+            await self._shutdown(PooledKernel(client.km, client.kc))
+            raise
+        return kernel
+
+    async def _run(self, kernel: PooledKernel, code: str) -> bool:
+        try:
+            reply = await execute_silently(kernel.kc, code, timeout=KERNEL_COMMAND_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to run {code!r} in the kernel: {e}")
+            return False
+        return reply["status"] == "ok"
+
+    async def _is_healthy(self, kernel: PooledKernel) -> bool:
+        if not await kernel.km.is_alive() or not await kernel.kc.is_alive():
+            return False
+        try:
+            await kernel.kc.kernel_info(reply=True, timeout=KERNEL_COMMAND_TIMEOUT)
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    async def _shutdown(kernel: PooledKernel):
+        if kernel.kc is not None:
+            kernel.kc.stop_channels()
+        if not kernel.km.has_kernel:
+            return
+        try:
+            await kernel.km.shutdown_kernel(now=True)
+        except Exception as e:
+            logger.warning(f"Failed to shut down the kernel: {e}")
+
+
+async def execute_silently(kc: AsyncKernelClient, code: str, timeout: float, **kwargs) -> dict:
+    """Execute code in the kernel without outputs nor history, returning the content of the execute reply.
+
+    Unlike `execute_interactive`, only the reply on the shell channel is waited for, not the iopub messages.
+    """
+    msg_id = kc.execute(code, silent=True, store_history=False, **kwargs)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            # poll in short intervals, the socket may not wake a wait in another event loop than its client's
+            reply = await kc.get_shell_msg(timeout=SHELL_POLL_INTERVAL)
+        except queue.Empty:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timeout waiting for the reply of {code!r}")
+            continue
+        if reply["parent_header"].get("msg_id") == msg_id:
+            return reply["content"]
+
+
+# kernel clients work in the event loop they are started in, so pools are kept by loop
+_kernel_pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_kernel_pool_guards: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # loop -> task closing its pools
+
+
+def get_kernel_pool(config: KernelPoolConfig) -> Optional[KernelPool]:
+    """The kernel pool of the config in the running event loop, None if the pool is disabled.
+
+    The pools are closed by `close_kernel_pools`, or when `asyncio.run` cancels the pending tasks of the loop.
+    """
+    if config.size <= 0:
+        return None
+    loop = asyncio.get_running_loop()
+    if loop not in _kernel_pools:
+        _kernel_pools[loop] = {}
+        _kernel_pool_guards[loop] = loop.create_task(_close_kernel_pools_when_cancelled())
+    pools = _kernel_pools[loop]
+    key = config.model_dump_json()
+    if key not in pools:
+        pools[key] = KernelPool.from_config(config)
+        pools[key]._warm(config.size)
+    return pools[key]
+
+
+async def close_kernel_pools(in_use: bool = False):
+    """Close the kernel pools of the running event loop, a later `get_kernel_pool` creates a new pool"""
+    loop = asyncio.get_running_loop()
+    guard = _kernel_pool_guards.pop(loop, None)
+    if guard is not None and guard is not asyncio.current_task():
+        guard.cancel()
+    pools = _kernel_pools.pop(loop, {})
+    await asyncio.gather(*[pool.close(in_use=in_use) for pool in pools.values()])
+
+
+async def _close_kernel_pools_when_cancelled():
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.create_future()
+    finally:
+        if _kernel_pool_guards.get(loop) is asyncio.current_task():  # not replaced by the guard of new pools
+            await close_kernel_pools(in_use=True)  # the kernels can't be used once the loop ends
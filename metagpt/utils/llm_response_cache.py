@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : llm_response_cache.py
+@Desc    : Deterministic cache of LLM responses, keyed by a canonical hash of the messages and the sampling config.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Literal, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.const import DEFAULT_WORKSPACE_ROOT
+from metagpt.logs import capture_llm_stream, log_llm_stream, logger
+
+CacheMode = Literal["off", "read_write", "record", "replay"]
+
+# LLMConfig fields that change the response, the credentials and network settings are left out.
+KEY_FIELDS = [
+    "api_type",
+    "base_url",
+    "api_version",
+    "model",
+    "max_token",
+    "temperature",
+    "top_p",
+    "top_k",
+    "repetition_penalty",
+    "stop",
+    "presence_penalty",
+    "frequency_penalty",
+    "best_of",
+    "n",
+    "logprobs",
+    "top_logprobs",
+]
+
+
+class LLMCacheMissError(Exception):
+    """Raised in replay mode when the response is not cached, or is bypassed by `bypass_cached_responses`."""
+
+
+_bypass_cached_responses: ContextVar[bool] = ContextVar("bypass_cached_responses", default=False)
+
+
+@contextmanager
+def bypass_cached_responses():
+    """Call the LLM instead of returning the cached responses within the context, caching the new ones, e.g. to retry
+    a cached response that turned out to be invalid."""
+    token = _bypass_cached_responses.set(True)
+    try:
+        yield
+    finally:
+        _bypass_cached_responses.reset(token)
+
+
+class CachedResponse(BaseModel):
+    text: str
+    chunks: Optional[list[str]] = None  # the log_llm_stream output of a streamed response
+    created_at: float
+
+
+class LLMResponseCache:
+    """LRU in memory and SQLite on disk cache of LLM responses.
+
+    Modes:
+        read_write: return the cached response if any, otherwise call the LLM and cache its response.
+        record: always call the LLM and cache its response, overwriting the cached one.
+        replay: only return cached responses, raise LLMCacheMissError otherwise, e.g. for offline benchmarks.
+
+    Entries older than `ttl` seconds are ignored, 0 means they never expire. Streamed responses are cached with
+    their `log_llm_stream` chunks, which are logged again when replayed as a stream.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mode: CacheMode = "read_write",
+        ttl: float = 0,
+        memory_entries: int = 256,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, text TEXT, chunks TEXT, created_at REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(messages: list[dict], config: LLMConfig, model: str = None) -> str:
+        """Canonical hash of the messages and the fields of config that change the response."""
+        payload = config.model_dump(mode="json", include=set(KEY_FIELDS))
+        payload["model"] = model or payload["model"]
+        payload["messages"] = messages
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            rsp = self._memory.get(key)
+            if rsp is None:
+                row = self._conn.execute(
+                    "SELECT text, chunks, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    rsp = CachedResponse(text=row[0], chunks=json.loads(row[1]) if row[1] else None, created_at=row[2])
+            if rsp is not None and self.ttl and time.time() - rsp.created_at > self.ttl:
+                self._memory.pop(key, None)
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                rsp = None
+
+            if rsp is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, rsp)
+            return rsp
+
+    def put(self, key: str, text: str, chunks: Optional[list[str]] = None):
+        rsp = CachedResponse(text=text, chunks=chunks, created_at=time.time())
+        with self._lock:
+            self._remember(key, rsp)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, text, chunks, created_at) VALUES (?, ?, ?, ?)",
+                (key, text, json.dumps(chunks, ensure_ascii=False) if chunks is not None else None, rsp.created_at),
+            )
+            self._conn.commit()
+
+    async def aget_or_call(self, key: str, call: Callable[[], Awaitable[str]], stream: bool = False) -> str:
+        """Return the cached response of key, or call the LLM according to the mode."""
+        bypass = _bypass_cached_responses.get()
+        if self.mode != "record" and not bypass:
+            rsp = self.get(key)
+            if rsp is not None:
+                if stream:
+                    self._replay_stream(rsp)
+                return rsp.text
+        if self.mode == "replay":
+            if bypass:
+                raise LLMCacheMissError(f"LLM response of {key} is bypassed, can't call the LLM in replay mode.")
+            raise LLMCacheMissError(f"LLM response of {key} is not cached, can't replay it.")
+
+        with capture_llm_stream() as chunks:
+            text = await call()
+        self.put(key, text, chunks=chunks if stream else None)
+        return text
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _remember(self, key: str, rsp: CachedResponse):
+        self._memory[key] = rsp
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _replay_stream(rsp: CachedResponse):
+        if rsp.chunks is None:  # cached from a non-streamed call
+            log_llm_stream(rsp.text)
+            log_llm_stream("\n")
+            return
+        for chunk in rsp.chunks:
+            log_llm_stream(chunk)
+
+
+_caches: Dict[Tuple[str, str, float], LLMResponseCache] = {}
+
+
+def get_response_cache(config: LLMConfig) -> Optional[LLMResponseCache]:
+    """Return the response cache of config, shared by the LLM instances using the same cache settings."""
+    if config.response_cache == "off":
+        return None
+
+    path = str(config.response_cache_path or DEFAULT_WORKSPACE_ROOT / "llm_response_cache.db")
+    key = (path, config.response_cache, config.response_cache_ttl)
+    if key not in _caches:
+        logger.info(f"LLM response cache: {config.response_cache} {path}")
+        _caches[key] = LLMResponseCache(path, mode=config.response_cache, ttl=config.response_cache_ttl)
+    return _caches[key]
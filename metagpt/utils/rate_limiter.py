@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : rate_limiter.py
+@Desc    : Client side admission control of LLM requests, by requests per minute and tokens per minute budgets.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+import openai
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.logs import logger
+
+DEFAULT_RETRY_AFTER = 1.0  # seconds to pause when a rejection has no Retry-After
+
+
+class RateLimitedError(Exception):
+    """Raised when the provider rejects a request for exceeding its rate limits."""
+
+    def __init__(self, message: str = "Rate limit exceeded", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token buckets of requests and tokens per minute, shared by the LLMs calling the same provider.
+
+    Callers are admitted in the order they arrive, so a large request is not starved by small ones. A bucket starts
+    full and refills continuously, 0 means the budget is unlimited.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated_at = time.monotonic()
+        self._resume_at = 0.0
+        self._locks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = weakref.WeakKeyDictionary()
+
+    async def acquire(self, tokens: int = 0):
+        """Wait until a request of `tokens` input tokens fits in the budgets, then take it from the budgets."""
+        tokens = min(tokens, self.tpm)  # a request larger than the budget is admitted when the bucket is full
+        async with self._lock():
+            while (wait := self._wait_time(tokens)) > 0:
+                await asyncio.sleep(wait)
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0):
+        """Admit a request, and pause everyone if the provider still rejects it with a Retry-After."""
+        await self.acquire(tokens)
+        try:
+            yield
+        except Exception as e:
+            retry_after = get_retry_after(e)
+            if retry_after is not None:
+                self.pause(retry_after)
+            raise
+
+    def pause(self, seconds: float):
+        """Admit nothing in the next `seconds` seconds."""
+        logger.warning(f"Rate limited, pause the LLM requests for {seconds}s")
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if loop not in self._locks:
+            self._locks[loop] = asyncio.Lock()
+        return self._locks[loop]
+
+    def _wait_time(self, tokens: int) -> float:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+        wait = self._resume_at - now
+        if self.rpm and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+        if self.tpm and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+        return wait
+
+
+def get_retry_after(e: Exception) -> Optional[float]:
+    """Return the seconds to wait if `e` is a rate limit rejection, otherwise None."""
+    if isinstance(e, RateLimitedError):
+        return e.retry_after or DEFAULT_RETRY_AFTER
+    if isinstance(e, openai.RateLimitError):
+        headers = e.response.headers
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000
+            return float(headers["retry-after"])
+        except (KeyError, ValueError):
+            return DEFAULT_RETRY_AFTER
+    return None
+
+
+_limiters: Dict[Tuple, RateLimiter] = {}
+
+
+def get_rate_limiter(config: LLMConfig) -> Optional[RateLimiter]:
+    """Return the rate limiter of config, shared by the LLMs calling the same model of the same provider."""
+    if not config.rpm and not config.tpm:
+        return None
+
+    key = (config.api_type, config.base_url, config.model, config.rpm, config.tpm)
+    if key not in _limiters:
+        _limiters[key] = RateLimiter(rpm=config.rpm, tpm=config.tpm)
+    return _limiters[key]
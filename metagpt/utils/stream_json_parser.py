@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : stream_json_parser.py
+@Desc    : Incremental parser of the JSON object in a streamed LLM output, validating each field once it completes.
+"""
+import json
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+class StreamJSONParser:
+    """Parse the top level fields of the JSON object after `start_tag` as the LLM output streams in.
+
+    Feed it with `feed`, e.g. as a `metagpt.logs.observe_llm_stream` observer. Each field is validated against the
+    field of `output_class` as soon as its value completes, and a ValueError is raised on the first invalid one.
+    Fields that aren't valid JSON yet are skipped and left to the postprocess of the full output, which may repair
+    them.
+    """
+
+    def __init__(self, output_class: Type[BaseModel], start_tag: str = "[CONTENT]"):
+        self.output_class = output_class
+        self.start_tag = start_tag
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+
+        self._started = False
+        self._text = ""  # the text from the start of the current `"key": value` member once the object starts
+        self._pos = 0  # the next char of `_text` to scan
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._adapters: Dict[str, TypeAdapter] = {}
+
+    def feed(self, chunk: str):
+        """Scan a chunk of the LLM output, validating the fields completed by it."""
+        if self.done:
+            return
+        self._text += chunk
+        if not self._started and not self._find_object():
+            return
+
+        text = self._text
+        start = 0
+        for pos in range(self._pos, len(text)):
+            char = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_member(text[start:pos])
+                    self.done = True
+                    break
+            elif char == "," and self._depth == 1:
+                self._complete_member(text[start:pos])
+                start = pos + 1
+        self._text = text[start:]
+        self._pos = len(self._text)
+
+    def _find_object(self) -> bool:
+        tag = self._text.find(self.start_tag)
+        if tag < 0:
+            return False
+        start = self._text.find("{", tag + len(self.start_tag))
+        if start < 0:
+            return False
+        self._text = self._text[start + 1 :]
+        self._pos = 0
+        self._depth = 1
+        self._started = True
+        return True
+
+    def _complete_member(self, member: str):
+        if not member.strip():
+            return
+        try:
+            data = json.loads(f"{{{member}}}")
+        except json.JSONDecodeError:
+            return
+        for key, value in data.items():
+            self._validate(key, value)
+            self.fields[key] = value
+
+    def _validate(self, key: str, value: Any):
+        field = self.output_class.model_fields.get(key)
+        if field is None:  # unrecognized fields are only warned by the output class
+            return
+        if key not in self._adapters:
+            self._adapters[key] = TypeAdapter(field.annotation)
+        try:
+            self._adapters[key].validate_python(value)
+        except ValidationError as e:
+            raise ValueError(f"Invalid field {key} in the LLM output: {e}") from e
@@ -10,6 +10,11 @@ ref3: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/t
 ref4: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 ref5: https://ai.google.dev/models/gemini
 """
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Tuple
+
 import tiktoken
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletionChunk
@@ -322,58 +327,101 @@ SPARK_TOKENS = {
 }
 
 
-def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
-    """Return the number of tokens used by a list of messages."""
+# tokens_per_message and tokens_per_name of the chat models, see ref2
+MESSAGE_TOKENS = {
+    **dict.fromkeys(
+        [
+            "gpt-3.5-turbo-0613",
+            "gpt-3.5-turbo-16k-0613",
+            "gpt-35-turbo",
+            "gpt-35-turbo-16k",
+            "gpt-3.5-turbo-16k",
+            "gpt-3.5-turbo-1106",
+            "gpt-3.5-turbo-0125",
+            "gpt-4-0314",
+            "gpt-4-32k-0314",
+            "gpt-4-0613",
+            "gpt-4-32k-0613",
+            "gpt-4-turbo",
+            "gpt-4-turbo-preview",
+            "gpt-4-0125-preview",
+            "gpt-4-vision-preview",
+            "gpt-4-1106-vision-preview",
+            "gpt-4o-2024-05-13",
+            "gpt-4o",
+        ],
+        (3, 1),  # every reply is primed with <|start|>assistant<|message|>
+    ),
+    "gpt-3.5-turbo-0301": (4, -1),  # every message follows <|start|>{role/name}\n{content}<|end|>\n, name omits role
+    # For self-hosted open_llm api, they include lots of different models. The message tokens calculation is
+    # inaccurate. It's a reference result, ignoring conversation message template prefix.
+    "open-llm-model": (0, 0),
+}
+
+# models that may update over time, counted as their snapshot
+MESSAGE_TOKENS_ALIASES = {
+    "gpt-3.5-turbo": "gpt-3.5-turbo-0125",
+    "gpt-4": "gpt-4-0613",
+}
+
+TOKEN_COUNT_CACHE_SIZE = 4096
+_token_counts: OrderedDict[Tuple[str, bytes], int] = OrderedDict()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding of model, created once per model."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
         logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    if model in {
-        "gpt-3.5-turbo-0613",
-        "gpt-3.5-turbo-16k-0613",
-        "gpt-35-turbo",
-        "gpt-35-turbo-16k",
-        "gpt-3.5-turbo-16k",
-        "gpt-3.5-turbo-1106",
-        "gpt-3.5-turbo-0125",
-        "gpt-4-0314",
-        "gpt-4-32k-0314",
-        "gpt-4-0613",
-        "gpt-4-32k-0613",
-        "gpt-4-turbo",
-        "gpt-4-turbo-preview",
-        "gpt-4-0125-preview",
-        "gpt-4-turbo",
-        "gpt-4-vision-preview",
-        "gpt-4-1106-vision-preview",
-        "gpt-4o-2024-05-13",
-        "gpt-4o",
-    }:
-        tokens_per_message = 3  # # every reply is primed with <|start|>assistant<|message|>
-        tokens_per_name = 1
-    elif model == "gpt-3.5-turbo-0301":
-        tokens_per_message = 4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-        tokens_per_name = -1  # if there's a name, the role is omitted
-    elif "gpt-3.5-turbo" == model:
-        logger.info("Warning: gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0125.")
-        return count_input_tokens(messages, model="gpt-3.5-turbo-0125")
-    elif "gpt-4" == model:
-        logger.info("Warning: gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
-        return count_input_tokens(messages, model="gpt-4-0613")
-    elif "open-llm-model" == model:
-        """
-        For self-hosted open_llm api, they include lots of different models. The message tokens calculation is
-        inaccurate. It's a reference result.
-        """
-        tokens_per_message = 0  # ignore conversation message template prefix
-        tokens_per_name = 0
-    else:
-        raise NotImplementedError(
-            f"num_tokens_from_messages() is not implemented for model {model}. "
-            f"See https://cookbook.openai.com/examples/how_to_count_tokens_with_tiktoken "
-            f"for information on how messages are converted to tokens."
-        )
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=None)
+def _get_message_tokens(model: str) -> Tuple[str, int, int]:
+    """Return the snapshot model, tokens_per_message and tokens_per_name of model."""
+    if model in MESSAGE_TOKENS_ALIASES:
+        snapshot = MESSAGE_TOKENS_ALIASES[model]
+        logger.info(f"Warning: {model} may update over time. Returning num tokens assuming {snapshot}.")
+        return (snapshot, *MESSAGE_TOKENS[snapshot])
+    if model in MESSAGE_TOKENS:
+        return (model, *MESSAGE_TOKENS[model])
+    raise NotImplementedError(
+        f"num_tokens_from_messages() is not implemented for model {model}. "
+        f"See https://cookbook.openai.com/examples/how_to_count_tokens_with_tiktoken "
+        f"for information on how messages are converted to tokens."
+    )
+
+
+def count_text_tokens(texts: list[str], encoding: tiktoken.Encoding) -> list[int]:
+    """Return the number of tokens of each text.
+
+    The counts are cached by the hash of the text, and the texts not in the cache are encoded in a batch.
+    """
+    keys = [(encoding.name, hashlib.sha1(text.encode("utf-8", "surrogatepass")).digest()) for text in texts]
+    counts = [_token_counts.get(key) for key in keys]
+    missing = {key: text for key, text, count in zip(keys, texts, counts) if count is None}
+    if missing:
+        if len(missing) == 1:
+            encoded = [encoding.encode(text) for text in missing.values()]
+        else:
+            encoded = encoding.encode_batch(list(missing.values()))
+        missing_counts = {key: len(tokens) for key, tokens in zip(missing, encoded)}
+        counts = [missing_counts[key] if count is None else count for key, count in zip(keys, counts)]
+    for key, count in zip(keys, counts):
+        _token_counts[key] = count
+        _token_counts.move_to_end(key)
+    while len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+        _token_counts.popitem(last=False)
+    return counts
+
+
+def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
+    """Return the number of tokens used by a list of messages."""
+    encoding = get_encoding(model)
+    model, tokens_per_message, tokens_per_name = _get_message_tokens(model)
+    texts = []
     num_tokens = 0
     for message in messages:
         num_tokens += tokens_per_message
@@ -384,9 +432,10 @@ def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
                 for item in value:
                     if isinstance(item, dict) and item.get("type") in ["text"]:
                         content = item.get("text", "")
-            num_tokens += len(encoding.encode(content))
+            texts.append(content)
             if key == "name":
                 num_tokens += tokens_per_name
+    num_tokens += sum(count_text_tokens(texts, encoding))
     num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
     return num_tokens
 
@@ -402,12 +451,7 @@ def count_output_tokens(string: str, model: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(string))
+    return count_text_tokens([string], get_encoding(model))[0]
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
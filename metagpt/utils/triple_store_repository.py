@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : triple_store_repository.py
+@Desc    : Graph repository based on an indexed triple store.
+    This script defines a graph repository class that keeps every triple in SPO, POS and OSP hash indexes, so that
+    `select` and `delete` only visit the matching triples, and a subject/object pair may hold multiple predicates.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import networkx
+
+from metagpt.utils.common import aread, awrite
+from metagpt.utils.graph_repository import SPO, GraphRepository
+
+# first key -> second key -> third keys, the innermost dict is used as an insertion ordered set.
+_Index = Dict[str, Dict[str, Dict[str, None]]]
+
+
+class TripleStoreRepository(GraphRepository):
+    """Graph repository based on an indexed triple store."""
+
+    def __init__(self, name: str | Path, **kwargs):
+        super().__init__(name=str(name), **kwargs)
+        self._spo: _Index = {}
+        self._pos: _Index = {}
+        self._osp: _Index = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    async def insert(self, subject: str, predicate: str, object_: str):
+        """Insert a new triple into the triple store, no-op if the triple exists.
+
+        Args:
+            subject (str): The subject of the triple.
+            predicate (str): The predicate describing the relationship.
+            object_ (str): The object of the triple.
+
+        Example:
+            await my_triple_store.insert(subject="Node1", predicate="connects_to", object_="Node2")
+            # Adds a triple: Node1 connects_to Node2
+        """
+        self._add(subject, predicate, object_)
+
+    async def insert_many(self, rows: List[SPO]):
+        """Insert multiple triples into the triple store.
+
+        Args:
+            rows (List[SPO]): The triples to insert.
+        """
+        for r in rows:
+            self._add(r.subject, r.predicate, r.object_)
+
+    async def select(self, subject: str = None, predicate: str = None, object_: str = None) -> List[SPO]:
+        """Retrieve triples from the triple store based on specified criteria.
+
+        The most selective index for the given criteria is used, so only the matching triples are visited.
+
+        Args:
+            subject (str, optional): The subject of the triple to filter by.
+            predicate (str, optional): The predicate describing the relationship to filter by.
+            object_ (str, optional): The object of the triple to filter by.
+
+        Returns:
+            List[SPO]: A list of SPO objects representing the selected triples.
+
+        Example:
+            selected_triples = await my_triple_store.select(subject="Node1", predicate="connects_to")
+            # Retrieves triples where Node1 is the subject and the predicate is 'connects_to'.
+        """
+        return [SPO(subject=s, predicate=p, object_=o) for s, p, o in self._match(subject, predicate, object_)]
+
+    async def delete(self, subject: str = None, predicate: str = None, object_: str = None) -> int:
+        """Delete triples from the triple store based on specified criteria.
+
+        Args:
+            subject (str, optional): The subject of the triple to filter by.
+            predicate (str, optional): The predicate describing the relationship to filter by.
+            object_ (str, optional): The object of the triple to filter by.
+
+        Returns:
+            int: The number of triples deleted from the repository.
+
+        Example:
+            deleted_count = await my_triple_store.delete(subject="Node1", predicate="connects_to")
+            # Deletes triples where Node1 is the subject and the predicate is 'connects_to'.
+        """
+        rows = list(self._match(subject, predicate, object_))
+        for s, p, o in rows:
+            self._remove(self._spo, s, p, o)
+            self._remove(self._pos, p, o, s)
+            self._remove(self._osp, o, s, p)
+        self._count -= len(rows)
+        return len(rows)
+
+    def json(self) -> str:
+        """Convert the triple store to a compact JSON-formatted string.
+
+        Each distinct string is stored once in `terms`, and each triple is a list of 3 indexes into `terms`.
+        """
+        terms: Dict[str, int] = {}
+        triples = [
+            [terms.setdefault(s, len(terms)), terms.setdefault(p, len(terms)), terms.setdefault(o, len(terms))]
+            for s, p, o in self._match()
+        ]
+        return json.dumps({"terms": list(terms), "triples": triples}, ensure_ascii=False, separators=(",", ":"))
+
+    async def save(self, path: str | Path = None):
+        """Save the triple store to a JSON file.
+
+        Args:
+            path (Union[str, Path], optional): The directory path where the JSON file will be saved.
+                If not provided, the default path is taken from the 'root' key in the keyword arguments.
+        """
+        data = self.json()
+        path = Path(path or self._kwargs.get("root"))
+        if not path.exists():
+            path.mkdir(parents=True, exist_ok=True)
+        pathname = path / self.name
+        await awrite(filename=pathname.with_suffix(".json"), data=data, encoding="utf-8")
+
+    async def load(self, pathname: str | Path):
+        """Load a triple store from a JSON file."""
+        data = await aread(filename=pathname, encoding="utf-8")
+        self.load_json(data)
+
+    def load_json(self, val: str):
+        """Load a JSON-encoded string saved by `json`, replacing the current triples.
+
+        The node-link format saved by `DiGraphRepository` is accepted too, so existing repositories can be opened.
+
+        Args:
+            val (str): A JSON-encoded string representing the triples.
+
+        Returns:
+            self: Returns the instance of the class with the loaded triples.
+        """
+        self._spo, self._pos, self._osp, self._count = {}, {}, {}, 0
+        if not val:
+            return self
+        m = json.loads(val)
+        if "triples" in m:
+            terms = m["terms"]
+            for s, p, o in m["triples"]:
+                self._add(terms[s], terms[p], terms[o])
+        else:
+            graph = networkx.node_link_graph(m)
+            for s, o, p in graph.edges(data="predicate"):
+                self._add(s, p, o)
+        return self
+
+    @staticmethod
+    async def load_from(pathname: str | Path) -> GraphRepository:
+        """Create and load a triple store from a JSON file.
+
+        Args:
+            pathname (Union[str, Path]): The path to the JSON file to be loaded.
+
+        Returns:
+            GraphRepository: A new instance of the graph repository loaded from the specified JSON file.
+        """
+        pathname = Path(pathname)
+        graph = TripleStoreRepository(name=pathname.stem, root=pathname.parent)
+        if pathname.exists():
+            await graph.load(pathname=pathname)
+        return graph
+
+    @property
+    def root(self) -> str:
+        """Return the root directory path for the graph repository files."""
+        return self._kwargs.get("root")
+
+    @property
+    def pathname(self) -> Path:
+        """Return the path and filename to the graph repository file."""
+        p = Path(self.root) / self.name
+        return p.with_suffix(".json")
+
+    def _add(self, subject: str, predicate: str, object_: str):
+        objects = self._spo.setdefault(subject, {}).setdefault(predicate, {})
+        if object_ in objects:
+            return
+        objects[object_] = None
+        self._pos.setdefault(predicate, {}).setdefault(object_, {})[subject] = None
+        self._osp.setdefault(object_, {}).setdefault(subject, {})[predicate] = None
+        self._count += 1
+
+    @staticmethod
+    def _remove(index: _Index, first: str, second: str, third: str):
+        seconds = index[first]
+        thirds = seconds[second]
+        del thirds[third]
+        if not thirds:
+            del seconds[second]
+            if not seconds:
+                del index[first]
+
+    def _match(self, subject: str = None, predicate: str = None, object_: str = None) -> Iterator[Tuple[str, str, str]]:
+        """Yield the (subject, predicate, object) triples matching the criteria, empty criteria match anything."""
+        if subject and predicate:
+            objects = self._spo.get(subject, {}).get(predicate, {})
+            if object_:
+                yield from [(subject, predicate, object_)] if object_ in objects else []
+            else:
+                yield from ((subject, predicate, o) for o in objects)
+        elif subject and object_:
+            yield from ((subject, p, object_) for p in self._osp.get(object_, {}).get(subject, {}))
+        elif predicate:
+            pos = self._pos.get(predicate, {})
+            for o in [object_] if object_ else pos:
+                yield from ((s, predicate, o) for s in pos.get(o, {}))
+        elif object_:
+            for s, predicates in self._osp.get(object_, {}).items():
+                yield from ((s, p, object_) for p in predicates)
+        else:
+            for s in [subject] if subject else self._spo:
+                for p, objects in self._spo.get(s, {}).items():
+                    yield from ((s, p, o) for o in objects)
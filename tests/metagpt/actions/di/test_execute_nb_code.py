@@ -1,6 +1,10 @@
+import time
+
 import pytest
 
 from metagpt.actions.di.execute_nb_code import ExecuteNbCode
+from metagpt.logs import logger
+from metagpt.utils.kernel_pool import KernelPool
 
 
 @pytest.mark.asyncio
@@ -126,3 +130,88 @@ async def test_parse_outputs():
     assert "KeyError: 'DUMMPY_ID'" in output
     assert "columns num:2" in output
     await executor.terminate()
+
+
+@pytest.mark.asyncio
+async def test_kernel_pool():
+    start = time.perf_counter()
+    executor = ExecuteNbCode()
+    await executor.run("x = 1")
+    cold_seconds = time.perf_counter() - start
+    await executor.terminate()
+
+    pool = KernelPool(size=1, preload_modules=["wave"])
+    await pool.fill()
+    try:
+        warm_km = pool._idle[0].km
+        start = time.perf_counter()
+        executor = ExecuteNbCode(kernel_pool=pool)
+        await executor.run("x = 1")
+        warm_seconds = time.perf_counter() - start
+        logger.info(f"first cell: {warm_seconds:.3f}s with a warm kernel, {cold_seconds:.3f}s without")
+        assert executor.nb_client.km is warm_km  # the kernel started before
+        output, is_success = await executor.run("import sys; print('wave' in sys.modules)")
+        assert output == "True\n"  # preloaded
+
+        await executor.reset()
+        assert executor.nb_client.km is None
+        output, is_success = await executor.run("print(x)")
+        assert not is_success  # a new kernel
+        output, is_success = await executor.run("import json; print(json.dumps(1))")
+        assert is_success
+        await executor.terminate()
+        assert executor.nb_client.km is None
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_run_candidates():
+    executor = ExecuteNbCode(timeout=3)
+    await executor.run("x = 1")
+    cells = len(executor.nb.cells)
+
+    start = time.perf_counter()
+    index, output, success = await executor.run_candidates(
+        ["x = 2\n1/0", "import time\ntime.sleep(10)", "import asyncio\nawait asyncio.sleep(0.2)\nx = x + 2\nprint(x)"]
+    )
+    assert time.perf_counter() - start < 5  # the sleeping candidate is killed, not waited for
+    assert (index, output, success) == (2, "4\n", True)  # run again in the kernel, after the first one
+    assert len(executor.nb.cells) == cells + 2
+
+    index, output, success = await executor.run_candidates(["y = 1", "import time\ntime.sleep(10)"])
+    assert (index, success) == (0, True)  # the first candidate isn't run again
+    assert len(executor.nb.cells) == cells + 3
+
+    start = time.perf_counter()
+    index, output, success = await executor.run_candidates(["1/0", "import time\ntime.sleep(10)"], timeout=1)
+    assert time.perf_counter() - start < 5  # bounded by the timeout of the candidates, not the sleep
+    assert index == 0 and not success and "ZeroDivisionError" in output
+
+    output, is_success = await executor.run("print(x)")
+    assert output == "4\n"  # changed by the candidates run in the kernel only
+    await executor.terminate()
+
+
+@pytest.mark.asyncio
+async def test_run_candidates_run_again(tmp_path):
+    executor = ExecuteNbCode(timeout=10)
+    values, marker = tmp_path / "values.txt", tmp_path / "marker"
+
+    # the random generators are seeded the same way in the fork and in the kernel
+    code = f"import random\nwith open({str(values)!r}, 'a') as f:\n    f.write(f'{{random.random()}}\\n')"
+    index, _, success = await executor.run_candidates(["1/0", code])
+    assert (index, success) == (1, True)
+    first, second = values.read_text().splitlines()
+    assert first == second
+
+    # succeeding in the fork but not in the kernel, as the fork wrote a file
+    code = f"import os\nassert not os.path.exists({str(marker)!r})\nopen({str(marker)!r}, 'w').close()"
+    index, output, success = await executor.run_candidates(["1/0", code])
+    assert index == 1 and not success and "AssertionError" in output
+
+    # succeeding in the fork but not in the kernel, as the first candidate changed the list before failing
+    await executor.run("x = []")
+    index, output, success = await executor.run_candidates(["x.append(1)\n1/0", "assert x == []\nx.append(2)"])
+    assert index == 1 and not success and "AssertionError" in output
+    await executor.terminate()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : test_action_graph.py
+@Desc    : Unit tests for action_graph.py
+"""
+import asyncio
+import time
+
+import pytest
+from tenacity import RetryError, stop_after_attempt
+
+from metagpt.actions.action_graph import ActionGraph
+from metagpt.actions.action_node import ActionNode
+
+
+class GraphLLM:
+    """A LLM answering the node in the prompt after a delay."""
+
+    def __init__(self, delays: dict[str, float], failures: set[str] = None):
+        self.delays = delays
+        self.failures = failures or set()
+        self.prompts = {}
+        self.spans = {}
+
+    async def aask(self, prompt, *args, **kwargs) -> str:
+        key = next(key for key in self.delays if f"instruction of {key}" in prompt)
+        self.prompts[key] = prompt
+        start = time.perf_counter()
+        await asyncio.sleep(self.delays[key])
+        if key in self.failures:
+            raise ValueError(key)
+        self.spans[key] = (start, time.perf_counter())
+        return f'[CONTENT]\n{{"{key}": "{key} answer"}}\n[/CONTENT]'
+
+
+def diamond() -> ActionGraph:
+    a, b, c, d = [ActionNode(key=k, expected_type=str, instruction=f"instruction of {k}", example="") for k in "abcd"]
+    graph = ActionGraph()
+    for node in [d, c, b, a]:
+        graph.add_node(node)
+    graph.add_edge(a, b)
+    graph.add_edge(a, c)
+    graph.add_edge(b, d)
+    graph.add_edge(c, d)
+    return graph
+
+
+@pytest.fixture(autouse=True)
+def no_retry(mocker):
+    mocker.patch.object(ActionNode._aask_v1.retry, "stop", stop_after_attempt(1))
+
+
+def test_levels():
+    graph = diamond()
+
+    assert graph.levels() == [["a"], ["b", "c"], ["d"]]
+    graph.topological_sort()
+    assert graph.execution_order == ["a", "b", "c", "d"]
+
+    graph.add_edge(graph.nodes["d"], graph.nodes["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        graph.levels()
+
+
+@pytest.mark.asyncio
+async def test_run():
+    graph = diamond()
+    delays = {"a": 0.1, "b": 0.1, "c": 0.3, "d": 0.1}
+    llm = GraphLLM(delays)
+    await graph.run(context="2048 game", llm=llm)
+
+    assert llm.spans["b"][0] < llm.spans["c"][1] and llm.spans["c"][0] < llm.spans["b"][1]  # run concurrently
+    assert llm.spans["d"][0] >= max(llm.spans["b"][1], llm.spans["c"][1])
+    assert '## b\n{"b": "b answer"}' in llm.prompts["d"]
+    assert '## c\n{"c": "c answer"}' in llm.prompts["d"]
+    assert '{"a": "a answer"}' not in llm.prompts["d"]  # only the outputs of the previous nodes
+    assert graph.outputs["d"] == '{"d": "d answer"}'
+    assert not graph.dirty
+
+    assert all(graph.durations[k] >= delay * 0.9 for k, delay in delays.items())
+    path, seconds = graph.critical_path()
+    assert path == ["a", "c", "d"]
+    assert seconds == pytest.approx(sum(graph.durations[k] for k in path))
+
+    graph.mark_dirty("c")
+    llm = GraphLLM({"a": 0.1, "b": 0.1, "c": 0.1, "d": 0.1})
+    await graph.run(context="2048 game", llm=llm)
+    assert set(llm.prompts) == {"c", "d"}  # only the dirty subgraph runs again
+    assert '## b\n{"b": "b answer"}' in llm.prompts["d"]
+
+
+@pytest.mark.asyncio
+async def test_run_failure_and_cancel():
+    graph = diamond()
+    llm = GraphLLM({"a": 0.1, "b": 0.3, "c": 0.1, "d": 0.1}, failures={"c"})
+
+    with pytest.raises(RetryError):  # raised by _aask_v1 after its retries
+        await graph.run(context="2048 game", llm=llm)
+    assert graph.dirty == {"b", "c", "d"}  # b is cancelled once c fails
+    assert "b" not in llm.spans
+
+    llm = GraphLLM({"a": 0.1, "b": 0.1, "c": 1, "d": 0.1})
+    task = asyncio.create_task(graph.run(context="2048 game", llm=llm))
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert graph.dirty == {"c", "d"}
+
+    llm = GraphLLM({"a": 0.1, "b": 0.1, "c": 0.1, "d": 0.1})
+    await graph.run(context="2048 game", llm=llm)
+    assert set(llm.prompts) == {"c", "d"}
+    assert not graph.dirty
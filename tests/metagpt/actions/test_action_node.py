@@ -5,20 +5,26 @@
 @Author  : alexanderwu
 @File    : test_action_node.py
 """
+import asyncio
+import time
 from pathlib import Path
 from typing import List, Tuple
 
 import pytest
 from pydantic import BaseModel, Field, ValidationError
+from tenacity import RetryError, stop_after_attempt, wait_none
 
 from metagpt.actions import Action
+from metagpt.actions.action_graph import ActionGraph
 from metagpt.actions.action_node import ActionNode, ReviewMode, ReviseMode
 from metagpt.environment import Environment
 from metagpt.llm import LLM
+from metagpt.logs import log_llm_stream
 from metagpt.roles import Role
 from metagpt.schema import Message
 from metagpt.team import Team
 from metagpt.utils.common import encode_image
+from metagpt.utils.llm_response_cache import LLMCacheMissError, LLMResponseCache
 
 
 @pytest.mark.asyncio
@@ -302,6 +308,133 @@ def test_action_node_from_pydantic_and_print_everything():
     assert "tasks" in code, "tasks should be in code"
 
 
+def test_action_node_compile_cache_renders_each_node():
+    typing_node = ActionNode(key="a", expected_type=List[str], instruction="a", example=["x"])
+    builtin_node = ActionNode(key="a", expected_type=list[str], instruction="a", example=["x"])
+    assert "typing.List[str]" in typing_node.compile_instruction()
+    assert "typing.List[str]" not in builtin_node.compile_instruction()
+    assert "list[str]" in builtin_node.compile_instruction()
+
+    bool_node = ActionNode(key="b", expected_type=int, instruction="b", example=True)
+    int_node = ActionNode(key="b", expected_type=int, instruction="b", example=1)
+    assert '"b": true' in bool_node.compile_example()
+    assert '"b": 1' in int_node.compile_example()
+
+    ab_node = ActionNode(key="c", expected_type=dict, instruction="c", example={"x": 1, "y": 2})
+    ba_node = ActionNode(key="c", expected_type=dict, instruction="c", example={"y": 2, "x": 1})
+    assert ab_node.compile_example() != ba_node.compile_example()
+
+
+class StreamLLM:
+    """A LLM streaming each of its outputs in chunks."""
+
+    def __init__(self, outputs: list[str]):
+        self.outputs = outputs
+        self.streamed = []
+
+    async def aask(self, *args, **kwargs) -> str:
+        output = self.outputs[len(self.streamed)]
+        self.streamed.append("")
+        for i in range(0, len(output), 5):
+            log_llm_stream(output[i : i + 5])
+            self.streamed[-1] += output[i : i + 5]
+        return output
+
+
+@pytest.mark.asyncio
+async def test_action_node_fill_fail_fast(mocker):
+    mocker.patch.object(ActionNode._aask_v1.retry, "wait", wait_none())
+    node_a = ActionNode(key="reasoning", expected_type=str, instruction="reasoning step by step", example="")
+    node_b = ActionNode(key="answers", expected_type=List[int], instruction="the final answers", example=[])
+    root = ActionNode.from_children(key="detail answer", nodes=[node_a, node_b])
+    invalid = '[CONTENT]\n{"answers": "579", "reasoning": "' + "long reasoning " * 100 + '"}\n[/CONTENT]'
+    valid = '[CONTENT]\n{"reasoning": "123+456", "answers": [579]}\n[/CONTENT]'
+    llm = StreamLLM([invalid, valid])
+
+    await root.fill(context="what's the answer to 123+456?", llm=llm, schema="json", fail_fast=True)
+
+    assert root.instruct_content.model_dump() == {"reasoning": "123+456", "answers": [579]}
+    assert len(llm.streamed[0]) < 50  # aborted once "answers" completes
+    assert llm.streamed[1] == valid
+
+
+class CachedStreamLLM(StreamLLM):
+    """A StreamLLM behind a response cache keyed by the prompt."""
+
+    def __init__(self, outputs: list[str], cache: LLMResponseCache):
+        super().__init__(outputs)
+        self.cache = cache
+
+    async def aask(self, prompt, *args, **kwargs) -> str:
+        return await self.cache.aget_or_call(prompt, lambda: super(CachedStreamLLM, self).aask(prompt), stream=True)
+
+
+@pytest.mark.asyncio
+async def test_action_node_fill_fail_fast_cached(mocker, tmp_path):
+    mocker.patch.object(ActionNode._aask_v1.retry, "wait", wait_none())
+    node = ActionNode(key="answers", expected_type=List[int], instruction="the final answers", example=[])
+    root = ActionNode.from_children(key="detail answer", nodes=[node])
+    invalid = '[CONTENT]\n{"answers": "579"}\n[/CONTENT]'
+    valid = '[CONTENT]\n{"answers": [579]}\n[/CONTENT]'
+    cache = LLMResponseCache(tmp_path / "cache.db")
+    await root.fill(context="123+456", llm=CachedStreamLLM([invalid, valid], cache), schema="json", fail_fast=True)
+
+    # the invalid response cached by another run isn't replayed by the retries
+    cache.put(next(iter(cache._memory)), invalid)
+    llm = CachedStreamLLM([valid], cache)
+    await root.fill(context="123+456", llm=llm, schema="json", fail_fast=True)
+    assert root.instruct_content.model_dump() == {"answers": [579]}
+    assert llm.streamed == [valid]
+
+    replayer = LLMResponseCache(tmp_path / "cache.db", mode="replay")
+    replayer.put(next(iter(cache._memory)), invalid)
+    llm = CachedStreamLLM([valid], replayer)
+    with pytest.raises(LLMCacheMissError):  # raised without retrying
+        await root.fill(context="123+456", llm=llm, schema="json", fail_fast=True)
+    assert not llm.streamed
+
+
+class ChildrenLLM:
+    """A LLM answering the child node in the prompt after a delay, recording when each answer starts and ends."""
+
+    def __init__(self, delays: dict[str, float], failures: dict[str, int] = None):
+        self.delays = delays
+        self.failures = failures or {}
+        self.spans = {}
+
+    async def aask(self, prompt, *args, **kwargs) -> str:
+        key = next(key for key in self.delays if f'"{key}"' in prompt)
+        start = time.perf_counter()
+        await asyncio.sleep(self.delays[key])
+        if self.failures.get(key, 0) > 0:
+            self.failures[key] -= 1
+            raise ConnectionError(key)
+        self.spans[key] = (start, time.perf_counter())
+        return f'[CONTENT]\n{{"{key}": "{key} answer"}}\n[/CONTENT]'
+
+
+@pytest.mark.asyncio
+async def test_action_node_fill_children_concurrently(mocker):
+    mocker.patch.object(ActionNode._aask_v1.retry, "stop", stop_after_attempt(1))
+    nodes = [ActionNode(key=key, expected_type=str, instruction=key, example="") for key in ["a", "b", "c", "d"]]
+    root = ActionNode.from_children(key="root", nodes=nodes)
+    graph = ActionGraph()
+    graph.add_edge(nodes[0], nodes[2])  # c depends on a
+    llm = ChildrenLLM({"a": 0.5, "b": 0.1, "c": 0.1, "d": 0.1}, failures={"b": 1})
+
+    await root.fill(context="", llm=llm, schema="json", strgy="complex", max_concurrency=3, child_retries=2)
+
+    assert root.instruct_content.model_dump() == {key: f"{key} answer" for key in "abcd"}
+    assert llm.spans["c"][0] >= llm.spans["a"][1]  # after its dependency
+    assert llm.spans["d"][0] < llm.spans["a"][1]  # while "a" is running
+    assert llm.spans["b"][0] < llm.spans["a"][1]  # retried while "a" is running
+
+    llm = ChildrenLLM({"a": 0.1, "b": 0.1, "c": 0.1, "d": 0.1}, failures={"a": 1})
+    with pytest.raises(RetryError):  # raised by _aask_v1 after its retries
+        await root.fill(context="", llm=llm, schema="json", strgy="complex", max_concurrency=3)
+    assert "c" not in llm.spans
+
+
 if __name__ == "__main__":
     test_create_model_class()
     test_create_model_class_with_mapping()
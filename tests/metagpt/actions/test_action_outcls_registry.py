@@ -4,6 +4,9 @@
 
 from typing import List
 
+import pytest
+from pydantic import Field, ValidationError
+
 from metagpt.actions.action_node import ActionNode
 
 
@@ -44,3 +47,23 @@ def test_action_outcls_registry():
     outcls6 = ActionNode.create_model_class(class_name, out_mapping)
     outinst6 = outcls6(**out_data2)
     assert outinst5 == outinst6
+
+
+def test_action_outcls_registry_field_info():
+    optional_cls = ActionNode.create_model_class("test_field_info", {"b": (list, Field(default_factory=list))})
+    required_cls = ActionNode.create_model_class("test_field_info", {"b": (list, Field(...))})
+    assert optional_cls is not required_cls
+    assert not optional_cls.model_fields["b"].is_required()
+    assert required_cls.model_fields["b"].is_required()
+
+    short_cls = ActionNode.create_model_class("test_field_info", {"b": (str, Field(default="a", max_length=2))})
+    long_cls = ActionNode.create_model_class("test_field_info", {"b": (str, Field(default="a"))})
+    assert short_cls is not long_cls
+    assert long_cls(b="abc").b == "abc"
+    with pytest.raises(ValidationError):
+        short_cls(b="abc")
+
+    int_cls = ActionNode.create_model_class("test_field_info", {"b": (int, Field(default=1))})
+    bool_cls = ActionNode.create_model_class("test_field_info", {"b": (int, Field(default=True))})
+    assert int_cls is not bool_cls
+    assert bool_cls.model_fields["b"].default is True
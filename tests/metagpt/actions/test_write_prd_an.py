@@ -5,13 +5,18 @@
 @Author  : mannaandpoem
 @File    : test_write_prd_an.py
 """
+import time
+
 import pytest
 from openai._models import BaseModel
 
+from metagpt.actions import action_node
 from metagpt.actions.action_node import ActionNode
+from metagpt.actions.action_outcls_registry import get_model_json_schema
 from metagpt.actions.write_prd import NEW_REQ_TEMPLATE
-from metagpt.actions.write_prd_an import REFINED_PRD_NODE
+from metagpt.actions.write_prd_an import REFINED_PRD_NODE, WRITE_PRD_NODE
 from metagpt.llm import LLM
+from metagpt.logs import logger
 from tests.data.incremental_dev_project.mock import (
     NEW_REQUIREMENT_SAMPLE,
     PRD_SAMPLE,
@@ -46,3 +51,38 @@ async def test_write_prd_an(mocker):
     assert "Refined User Stories" in node.instruct_content.model_dump()
     assert "Refined Requirement Analysis" in node.instruct_content.model_dump()
     assert "Refined Requirement Pool" in node.instruct_content.model_dump()
+
+
+class ExampleLLM:
+    """A LLM answering the examples of the node tree."""
+
+    def __init__(self, node: ActionNode):
+        self.output = f"[CONTENT]\n{node.compile_example(schema='json')}\n[/CONTENT]"
+
+    async def aask(self, *args, **kwargs) -> str:
+        return self.output
+
+
+@pytest.mark.asyncio
+async def test_write_prd_node_cache_benchmark():
+    llm = ExampleLLM(WRITE_PRD_NODE)
+    times = 20
+
+    def clear_caches():
+        action_node._compiled_prompts.clear()
+        get_model_json_schema.cache_clear()
+
+    start = time.perf_counter()
+    for _ in range(times):
+        clear_caches()
+        cold_node = await WRITE_PRD_NODE.fill(context="2048 game", llm=llm)
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(times):
+        warm_node = await WRITE_PRD_NODE.fill(context="2048 game", llm=llm)
+    warm_time = time.perf_counter() - start
+
+    logger.info(f"WritePRD fill x{times}: without caches {cold_time:.4f}s, with caches {warm_time:.4f}s")
+    assert warm_node.instruct_content == cold_node.instruct_content
+    assert action_node._compiled_prompts and get_model_json_schema.cache_info().hits >= times
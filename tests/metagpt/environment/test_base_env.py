@@ -2,10 +2,12 @@
 # -*- coding: utf-8 -*-
 # @Desc   : the unittest of ExtEnv&Env
 
+import time
 from typing import Any, Optional
 
 import pytest
 
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.environment.api.env_api import EnvAPIAbstract
 from metagpt.environment.base_env import (
     Environment,
@@ -15,6 +17,10 @@ from metagpt.environment.base_env import (
     mark_as_writeable,
 )
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
+from metagpt.logs import logger
+from metagpt.roles import Role
+from metagpt.schema import Message
+from metagpt.utils.common import any_to_str, is_send_to
 
 
 class ForTestEnv(Environment):
@@ -69,3 +75,42 @@ async def test_ext_env():
 
     assert await env.read_from_api("read_api_no_param") == 15
     assert await env.read_from_api(EnvAPIAbstract(api_name="read_api", kwargs={"a": 5, "b": 5})) == 10
+
+
+def _scan_recipients(env: Environment, message: Message) -> set:
+    return {role for role, addrs in env.member_addrs.items() if is_send_to(message, addrs)}
+
+
+def test_env_address_index():
+    env = Environment()
+    roles = [Role(name=f"r{i}", profile=f"p{i}") for i in range(4)]
+    env.add_roles(roles)
+    roles[0].set_addresses({"topic", "r0"})
+    roles[1].set_addresses({"topic"})
+
+    for send_to in [{"topic"}, {"r0", "r2"}, {MESSAGE_ROUTE_TO_ALL}, {"nobody"}, {any_to_str(Role)}]:
+        msg = Message(content="x", send_to=send_to)
+        assert set(env.get_recipients(msg)) == _scan_recipients(env, msg)
+
+    roles[0].set_addresses({"r0"})
+    assert env.addr_index["topic"] == {roles[1]}
+    roles[1].set_addresses(set())
+    assert "topic" not in env.addr_index
+    assert set(env.get_recipients(Message(content="x", send_to={MESSAGE_ROUTE_TO_ALL}))) == set(roles)
+
+
+def test_env_routing_benchmark():
+    env = Environment()
+    env.add_roles([Role(name=f"agent{i}", profile=f"agent{i}") for i in range(500)])
+    messages = [Message(content="x", send_to={f"agent{i}"}) for i in range(0, 500, 5)]
+
+    start = time.perf_counter()
+    scanned = [_scan_recipients(env, msg) for msg in messages]
+    scan_cost = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [set(env.get_recipients(msg)) for msg in messages]
+    index_cost = time.perf_counter() - start
+
+    logger.info(f"routing 500 roles x {len(messages)} msgs: scan={scan_cost:.4f}s, index={index_cost:.4f}s")
+    assert scanned == indexed
+    assert all(len(recipients) == 1 for recipients in indexed)
@@ -2,7 +2,10 @@
 # -*- coding: utf-8 -*-
 # @Desc   : the unittest of Memory
 
+import time
+
 from metagpt.actions import UserRequirement
+from metagpt.logs import logger
 from metagpt.memory.memory import Memory
 from metagpt.schema import Message
 
@@ -55,3 +58,91 @@ def test_memory():
     memory.clear()
     assert memory.count() == 0
     assert len(memory.index) == 0
+
+
+def test_memory_sequence():
+    memory = Memory()
+    message1 = Message(content="test message1")
+    memory.add(message1)
+    watermark = memory.last_seq
+    memory.add_batch([message1, Message(content="test message2"), Message(content="test message3")])
+    assert [i.content for i in memory.get_since(watermark)] == ["test message2", "test message3"]
+
+    memory.delete(message1)
+    assert memory.get_since(0) == memory.get()
+    assert memory.get_since(memory.last_seq) == []
+
+    memory.delete_newest()
+    memory.add(Message(content="test message4"))
+    assert memory.last_seq == 4
+    assert [i.content for i in memory.get_since(watermark)] == ["test message2", "test message4"]
+
+    new_memory = Memory(**memory.model_dump())
+    assert new_memory.last_seq != memory.last_seq
+    assert new_memory == memory
+
+
+def test_memory_keyword_index():
+    memory = Memory(keyword_index=True)
+    message1 = Message(content="write a snake game", role="user1")
+    message2 = Message(content="write a 2048 game", role="user2")
+    memory.add_batch([message1, message2, message1])
+    assert memory.count() == 2
+
+    assert memory.try_remember("write a") == [message1, message2]
+    assert memory.get_by_content("snake") == [message1]
+    assert memory.get_by_content("ga") == [message1, message2]  # shorter than a trigram, falls back to scan
+    assert memory.try_remember("tetris") == []
+
+    memory.delete(Message(**message1.model_dump()))
+    assert memory.try_remember("game") == [message2]
+    assert memory.get_by_role("user1") == []
+    assert not memory.contains(message1)
+
+    new_memory = Memory(**memory.model_dump())
+    assert new_memory.contains(message2)
+    assert new_memory.get_by_content("2048") == [message2]
+
+
+class _ScanMemory(Memory):
+    """The linear-scan lookups Memory used before the hash indexes, kept as the benchmark baseline."""
+
+    def add(self, message: Message):
+        if message in self.storage:
+            return
+        self.storage.append(message)
+
+    def get_by_role(self, role: str) -> list[Message]:
+        return [message for message in self.storage if message.role == role]
+
+    def try_remember(self, keyword: str) -> list[Message]:
+        return [message for message in self.storage if keyword in message.content]
+
+    def find_news(self, observed: list[Message], k=0) -> list[Message]:
+        already_observed = self.get(k)
+        return [i for i in observed if i not in already_observed]
+
+
+def test_memory_benchmark():
+    messages = [Message(content=f"message {i} about topic{i % 97}", role=f"role{i % 10}") for i in range(1000)]
+    observed = messages[-50:] + [Message(content="fresh news")]
+
+    costs = {}
+    results = {}
+    for memory in [_ScanMemory(), Memory(keyword_index=True)]:
+        name = type(memory).__name__
+        start = time.perf_counter()
+        memory.add_batch(messages)
+        costs[f"{name}.add"] = time.perf_counter() - start
+        start = time.perf_counter()
+        results[name] = (
+            memory.find_news(observed),
+            memory.get_by_role("role3"),
+            memory.try_remember("topic42"),
+        )
+        costs[f"{name}.lookup"] = time.perf_counter() - start
+
+    logger.info(f"memory benchmark over {len(messages)} messages: {costs}")
+    assert results["Memory"] == results["_ScanMemory"]
+    news, by_role, remembered = results["Memory"]
+    assert news == [observed[-1]] and len(by_role) == 100 and len(remembered) == 10
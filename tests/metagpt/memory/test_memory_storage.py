@@ -4,15 +4,19 @@
 @Desc   : the unittests of metagpt/memory/memory_storage.py
 """
 
+import asyncio
 import shutil
+import time
 from pathlib import Path
 from typing import List
 
 import pytest
+from llama_index.core.embeddings import MockEmbedding
 
 from metagpt.actions import UserRequirement, WritePRD
 from metagpt.actions.action_node import ActionNode
 from metagpt.const import DATA_PATH
+from metagpt.logs import logger
 from metagpt.memory.memory_storage import MemoryStorage
 from metagpt.schema import Message
 from tests.metagpt.memory.mock_text_embed import (
@@ -99,3 +103,84 @@ async def test_actionout_message(mocker):
 
     memory_storage.clean()
     assert memory_storage.is_initialized is False
+
+
+class CountingEmbedding(MockEmbedding):
+    """Local fake embedding model with a fixed per-call latency."""
+
+    calls: int = 0
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(0.002)
+        return [self._get_vector() for _ in texts]
+
+
+@pytest.mark.asyncio
+async def test_batched_add():
+    role_id = "UTUser3(Batch)"
+    shutil.rmtree(Path(DATA_PATH / f"role_mem/{role_id}/"), ignore_errors=True)
+    messages = [Message(content=f"message {i}", cause_by=UserRequirement) for i in range(128)]
+
+    throughput = {}
+    for batch_size in [1, 32]:
+        embedding = CountingEmbedding(embed_dim=1536, embed_batch_size=32)
+        memory_storage = MemoryStorage(embedding=embedding, batch_size=batch_size, persist_every=64)
+        memory_storage.recover_memory(role_id)
+
+        start = time.perf_counter()
+        for message in messages[:-1]:
+            memory_storage.add(message)
+        memory_storage.add(messages[-1])
+        memory_storage.flush()
+        throughput[batch_size] = len(messages) / (time.perf_counter() - start)
+
+        assert embedding.calls == len(messages) // batch_size
+        assert memory_storage.faiss_engine.retriever._index.vector_store.client.ntotal == len(messages)
+        assert Path(memory_storage.cache_dir / "default__vector_store.json").exists()
+        memory_storage.clean()
+
+    logger.info(f"memory_storage add throughput (messages/s) by batch size: {throughput}")
+    assert throughput[32] > throughput[1]
+
+
+@pytest.mark.asyncio
+async def test_flush_on_search():
+    role_id = "UTUser4(Flush)"
+    shutil.rmtree(Path(DATA_PATH / f"role_mem/{role_id}/"), ignore_errors=True)
+    embedding = CountingEmbedding(embed_dim=1536)
+    memory_storage = MemoryStorage(embedding=embedding, batch_size=8, flush_interval=0)
+    memory_storage.recover_memory(role_id)
+
+    memory_storage.add(Message(content="buffered", cause_by=UserRequirement))
+    assert embedding.calls == 0
+    await memory_storage.search_similar(Message(content="query"))
+    assert embedding.calls == 1
+    memory_storage.clean()
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_keeps_messages(mocker):
+    role_id = "UTUser5(FlushFailure)"
+    shutil.rmtree(Path(DATA_PATH / f"role_mem/{role_id}/"), ignore_errors=True)
+    memory_storage = MemoryStorage(embedding=CountingEmbedding(embed_dim=1536), batch_size=8, flush_interval=0.01)
+    memory_storage.recover_memory(role_id)
+    add_objs = mocker.patch.object(memory_storage.faiss_engine, "add_objs", side_effect=ConnectionError("embedding"))
+
+    memory_storage.add(Message(content="first", cause_by=UserRequirement))
+    await asyncio.sleep(0.05)  # the timed flush fails and logs
+    assert add_objs.call_count == 1
+    assert len(memory_storage._pending) == 1
+
+    memory_storage.add(Message(content="second", cause_by=UserRequirement))
+    with pytest.raises(ConnectionError):
+        memory_storage.flush()
+    assert [i.content for i in memory_storage._pending] == ["first", "second"]
+
+    add_objs.side_effect = None
+    assert memory_storage.flush() == 2
+    assert not memory_storage._pending
+    memory_storage.clean()
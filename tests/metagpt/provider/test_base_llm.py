@@ -5,12 +5,17 @@
 @Author  : alexanderwu
 @File    : test_base_llm.py
 """
+import asyncio
+import time
 
 import pytest
 
 from metagpt.configs.llm_config import LLMConfig
 from metagpt.provider.base_llm import BaseLLM
 from metagpt.schema import Message
+from metagpt.utils.cost_manager import CostManager
+from metagpt.utils.llm_response_cache import LLMResponseCache
+from metagpt.utils.rate_limiter import RateLimitedError, RateLimiter
 from tests.metagpt.provider.mock_llm_config import mock_llm_config
 from tests.metagpt.provider.req_resp_const import (
     default_resp_cont,
@@ -104,3 +109,96 @@ async def test_async_base_llm():
 
     # resp = await base_llm.aask_code([prompt])
     # assert resp == default_resp_cont
+
+
+@pytest.mark.asyncio
+async def test_aask_with_response_cache(tmp_path, mocker):
+    base_llm = MockBaseLLM()
+    base_llm.response_cache = LLMResponseCache(tmp_path / "cache.db")
+    spy = mocker.spy(base_llm, "acompletion_text")
+
+    assert await base_llm.aask(prompt, stream=False) == default_resp_cont
+    assert await base_llm.aask(prompt, stream=False) == default_resp_cont
+    assert await base_llm.aask_batch([prompt]) == default_resp_cont
+    assert spy.call_count == 2  # aask_batch has no system message, so it's another key
+
+    await base_llm.aask(prompt + "!", stream=False)
+    assert spy.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_aask_with_rate_limiter(mocker):
+    base_llm = MockBaseLLM()
+    base_llm.rate_limiter = RateLimiter(rpm=1000, tpm=100000)
+    acquire = mocker.spy(base_llm.rate_limiter, "acquire")
+    mocker.patch("metagpt.provider.base_llm.count_input_tokens", return_value=42)
+    mocker.patch.object(
+        base_llm, "acompletion_text", side_effect=[RateLimitedError(retry_after=0.2), default_resp_cont]
+    )
+
+    start = time.perf_counter()
+    assert await base_llm.aask(prompt, stream=False) == default_resp_cont
+
+    assert time.perf_counter() - start >= 0.19  # paused by the Retry-After, then queued again
+    assert acquire.call_count == 2
+    assert acquire.call_args.args[0] == 42
+
+    mocker.patch.object(base_llm, "acompletion_text", side_effect=ValueError)
+    with pytest.raises(ValueError):
+        await base_llm.aask(prompt, stream=False)
+    assert acquire.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_aask_with_rate_limiter_without_retries(mocker):
+    base_llm = MockBaseLLM()
+    base_llm.rate_limiter = RateLimiter(rpm=1000)
+    base_llm.rate_limit_retries = 0
+    assert await base_llm.aask(prompt, stream=False) == default_resp_cont  # always one attempt
+
+    mocker.patch.object(base_llm, "acompletion_text", side_effect=RateLimitedError(retry_after=0.01))
+    with pytest.raises(RateLimitedError):
+        await base_llm.aask(prompt, stream=False)
+    assert base_llm.acompletion_text.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_aask_many():
+    base_llm = MockBaseLLM()
+    base_llm.cost_manager = CostManager()
+    running, max_running = 0, 0
+
+    async def acompletion_text(messages, stream=False, timeout=3):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        content = messages[-1]["content"]
+        await asyncio.sleep(0.1 if content == "0" else 0.01)  # the first answer comes last
+        running -= 1
+        if content == "3":
+            raise ValueError(content)
+        base_llm._update_costs({"prompt_tokens": 10, "completion_tokens": 1}, model="gpt-4-turbo")
+        return f"answer {content}"
+
+    base_llm.acompletion_text = acompletion_text
+
+    start = time.perf_counter()
+    rsps = await base_llm.aask_many([str(i) for i in range(10)], max_concurrency=4)
+    elapsed = time.perf_counter() - start
+
+    assert rsps[:3] == ["answer 0", "answer 1", "answer 2"]
+    assert isinstance(rsps[3], ValueError)
+    assert rsps[4:] == [f"answer {i}" for i in range(4, 10)]
+    assert max_running == 4
+    assert elapsed < 0.2
+    assert base_llm.cost_manager.total_prompt_tokens == 90
+
+    with pytest.raises(ValueError):
+        await base_llm.aask_many(["3"], return_exceptions=False)
+
+    running, max_running = 0, 0
+    with pytest.raises(ValueError):
+        await base_llm.aask_many(["0", "1", "3"], return_exceptions=False)
+    assert running == 1  # "0" was cancelled when "3" failed, before decreasing running
+    await asyncio.sleep(0.15)
+    assert base_llm.cost_manager.total_prompt_tokens == 100  # only "1" was answered
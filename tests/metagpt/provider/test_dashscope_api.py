@@ -71,3 +71,9 @@ async def test_dashscope_acompletion(mocker):
     assert resp.choices[0]["message"]["content"] == resp_cont
 
     await llm_general_chat_funcs_test(dashscope_llm, prompt, messages, resp_cont)
+
+
+@pytest.mark.asyncio
+async def test_dashscope_aclose():
+    dashscope_llm = DashScopeLLM(mock_llm_config_dashscope)
+    await dashscope_llm.aclose()  # AGeneration has no close
@@ -0,0 +1,100 @@
+import pytest
+from llama_index.core.bridge.pydantic import Field
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.embeddings.openai import OpenAIEmbedding
+
+from metagpt.rag.embeddings import CachedEmbedding, EmbeddingCache
+
+
+class CountingEmbedding(MockEmbedding):
+    text_calls: int = Field(default=0, exclude=True)  # excluded from the settings the cache is namespaced by
+    query_calls: int = Field(default=0, exclude=True)
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        self.text_calls += len(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._get_text_embeddings(texts)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        self.query_calls += 1
+        return [float(len(query)), 0.0]
+
+
+class TestCachedEmbedding:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "cache.db", max_entries=100, memory_entries=2)
+        yield cache
+        cache.close()
+
+    @pytest.fixture
+    def embed_model(self):
+        return CountingEmbedding(embed_dim=2, model_name="counting")
+
+    def test_text_embeddings_are_cached(self, cache, embed_model):
+        cached = CachedEmbedding(embed_model, cache=cache)
+
+        first = cached.get_text_embedding_batch(["a", "bb", "a"])
+        second = cached.get_text_embedding_batch(["bb", "ccc"])
+
+        assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+        assert second == [[2.0, 1.0], [3.0, 1.0]]
+        assert embed_model.text_calls == 3  # "a", "bb", "ccc"
+        assert cache.stats() == {"hits": 1, "misses": 4, "size": 3}
+
+    @pytest.mark.asyncio
+    async def test_async_and_query_embeddings(self, cache, embed_model):
+        cached = CachedEmbedding(embed_model, cache=cache)
+
+        assert await cached.aget_text_embedding("abc") == [3.0, 1.0]
+        assert await cached.aget_text_embedding("abc") == [3.0, 1.0]
+        assert cached.get_query_embedding("abc") == [3.0, 0.0]  # query and text are cached separately
+        assert cached.get_query_embedding("abc") == [3.0, 0.0]
+
+        assert embed_model.text_calls == 1
+        assert embed_model.query_calls == 1
+
+    def test_cache_is_persisted_and_namespaced(self, tmp_path, embed_model):
+        path = tmp_path / "cache.db"
+        CachedEmbedding(embed_model, cache=EmbeddingCache(path)).get_text_embedding("hello")
+
+        reopened = CachedEmbedding(embed_model, cache=EmbeddingCache(path))
+        reopened.get_text_embedding("hello")
+        assert embed_model.text_calls == 1
+        assert reopened.cache.hits == 1
+
+        other_model = CountingEmbedding(embed_dim=2, model_name="other")
+        CachedEmbedding(other_model, cache=EmbeddingCache(path)).get_text_embedding("hello")
+        assert other_model.text_calls == 1
+
+    def test_namespace_includes_output_settings(self, cache, embed_model):
+        cached = CachedEmbedding(embed_model, cache=cache)
+        cached.get_text_embedding("hello")
+
+        other_dim = CountingEmbedding(embed_dim=3, model_name="counting")
+        CachedEmbedding(other_dim, cache=cache).get_text_embedding("hello")
+        assert other_dim.text_calls == 1
+
+        other_batch = CountingEmbedding(embed_dim=2, model_name="counting", embed_batch_size=1)
+        CachedEmbedding(other_batch, cache=cache).get_text_embedding("hello")
+        assert other_batch.text_calls == 0
+
+        def namespace(**kwargs) -> str:
+            return CachedEmbedding(OpenAIEmbedding(**kwargs), cache=cache).namespace
+
+        assert namespace(api_key="a", dimensions=256) != namespace(api_key="a")
+        assert namespace(api_key="a", api_base="http://other/v1") != namespace(api_key="a")
+        assert namespace(api_key="a", dimensions=256) == namespace(api_key="b", dimensions=256, timeout=5)
+
+    def test_lru_eviction(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "cache.db", max_entries=2, memory_entries=0)
+
+        cache.put_many("ns", ["a"], [[1.0]])
+        cache.put_many("ns", ["b"], [[2.0]])
+        cache.get_many("ns", ["a"])  # "b" becomes the least recently used
+        cache.put_many("ns", ["c"], [[3.0]])
+
+        assert cache.get_many("ns", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+        assert cache.stats()["size"] == 2
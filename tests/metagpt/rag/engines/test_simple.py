@@ -9,7 +9,7 @@ from llama_index.core.schema import Document, NodeWithScore, TextNode
 from metagpt.rag.engines import SimpleEngine
 from metagpt.rag.retrievers import SimpleHybridRetriever
 from metagpt.rag.retrievers.base import ModifiableRAGRetriever, PersistableRAGRetriever
-from metagpt.rag.schema import BM25RetrieverConfig, ObjectNode
+from metagpt.rag.schema import BM25IndexConfig, BM25RetrieverConfig, ObjectNode
 
 
 class TestSimpleEngine:
@@ -135,7 +135,7 @@ class TestSimpleEngine:
 
         # Exec
         engine = SimpleEngine.from_index(
-            index_config=mock_index,
+            index_config=BM25IndexConfig(persist_path=""),
             embed_model=mock_embedding,
             llm=mock_llm,
         )
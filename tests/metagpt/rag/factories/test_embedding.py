@@ -1,7 +1,9 @@
 import pytest
+from llama_index.core.embeddings import MockEmbedding
 
 from metagpt.configs.embedding_config import EmbeddingType
 from metagpt.configs.llm_config import LLMType
+from metagpt.rag.embeddings import CachedEmbedding
 from metagpt.rag.factories.embedding import RAGEmbeddingFactory
 
 
@@ -56,6 +58,7 @@ class TestRAGEmbeddingFactory:
         mock_openai_embedding = self.mock_openai_embedding(mocker)
 
         mock_config.embedding.api_type = None
+        mock_config.embedding.cache = False
         mock_config.llm.api_type = LLMType.OPENAI
 
         # Exec
@@ -82,6 +85,21 @@ class TestRAGEmbeddingFactory:
         # Assert
         assert test_params == expected_params
 
+    def test_get_rag_embedding_with_cache(self, mocker, mock_config, tmp_path):
+        # Mock
+        mocker.patch("metagpt.rag.factories.embedding.OllamaEmbedding", return_value=MockEmbedding(embed_dim=2))
+        mock_config.embedding.cache = True
+        mock_config.embedding.cache_path = str(tmp_path / "cache.db")
+        mock_config.embedding.cache_max_entries = 10
+
+        # Exec
+        embedding1 = self.embedding_factory.get_rag_embedding(EmbeddingType.OLLAMA)
+        embedding2 = self.embedding_factory.get_rag_embedding(EmbeddingType.OLLAMA)
+
+        # Assert
+        assert isinstance(embedding1, CachedEmbedding)
+        assert embedding1.cache is embedding2.cache
+
     def test_resolve_embedding_type(self, mock_config):
         # Mock
         mock_config.embedding.api_type = EmbeddingType.OPENAI
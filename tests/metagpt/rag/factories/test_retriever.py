@@ -18,6 +18,7 @@ from metagpt.rag.schema import (
     ElasticsearchRetrieverConfig,
     ElasticsearchStoreConfig,
     FAISSRetrieverConfig,
+    HybridRetrieverConfig,
 )
 
 
@@ -64,16 +65,26 @@ class TestRetrieverFactory:
 
     def test_get_retriever_with_bm25_config(self, mocker, mock_nodes):
         mock_config = BM25RetrieverConfig()
-        mocker.patch("rank_bm25.BM25Okapi.__init__", return_value=None)
 
         retriever = self.retriever_factory.get_retriever(configs=[mock_config], nodes=mock_nodes)
 
         assert isinstance(retriever, DynamicBM25Retriever)
 
+    def test_get_retriever_with_bm25_config_loads_persisted_postings(self, mocker, mock_nodes, tmp_path):
+        DynamicBM25Retriever(nodes=mock_nodes).persist(str(tmp_path))
+        mock_tokenizer = mocker.patch("metagpt.rag.retrievers.bm25_retriever.tokenize_remove_stopwords")
+
+        retriever = self.retriever_factory.get_retriever(
+            configs=[BM25RetrieverConfig()], nodes=mock_nodes, persist_path=str(tmp_path)
+        )
+
+        assert isinstance(retriever, DynamicBM25Retriever)
+        assert set(retriever.bm25.doc_lens) == {node.node_id for node in mock_nodes}
+        mock_tokenizer.assert_not_called()
+
     def test_get_retriever_with_multiple_configs_returns_hybrid(self, mocker, mock_nodes, mock_embedding):
         mock_faiss_config = FAISSRetrieverConfig(dimensions=1)
         mock_bm25_config = BM25RetrieverConfig()
-        mocker.patch("rank_bm25.BM25Okapi.__init__", return_value=None)
 
         retriever = self.retriever_factory.get_retriever(
             configs=[mock_faiss_config, mock_bm25_config], nodes=mock_nodes, embed_model=mock_embedding
@@ -81,6 +92,21 @@ class TestRetrieverFactory:
 
         assert isinstance(retriever, SimpleHybridRetriever)
 
+    def test_get_retriever_with_hybrid_config(self, mock_nodes, mock_embedding):
+        hybrid_config = HybridRetrieverConfig(fusion_mode="rrf", weights=[1.0, 0.5], timeout=3)
+
+        retriever = self.retriever_factory.get_retriever(
+            configs=[FAISSRetrieverConfig(dimensions=1), BM25RetrieverConfig(), hybrid_config],
+            nodes=mock_nodes,
+            embed_model=mock_embedding,
+        )
+
+        assert isinstance(retriever, SimpleHybridRetriever)
+        assert len(retriever.retrievers) == 2
+        assert retriever.fusion_mode == "rrf"
+        assert retriever.weights == [1.0, 0.5]
+        assert retriever.timeout == 3
+
     def test_get_retriever_with_chroma_config(self, mocker, mock_chroma_vector_store, mock_embedding):
         mock_config = ChromaRetrieverConfig(persist_path="/path/to/chroma", collection_name="test_collection")
         mock_chromadb = mocker.patch("metagpt.rag.factories.retriever.chromadb.PersistentClient")
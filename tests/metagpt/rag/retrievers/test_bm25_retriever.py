@@ -1,27 +1,43 @@
+import random
+import time
+
 import pytest
 from llama_index.core import VectorStoreIndex
-from llama_index.core.schema import Node
+from llama_index.core.schema import Node, QueryBundle, TextNode
+from rank_bm25 import BM25Okapi
+
+from metagpt.logs import logger
+from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever, IncrementalBM25
+
+
+def _make_corpus(n: int, seed: int = 0) -> list[TextNode]:
+    rnd = random.Random(seed)
+    vocab = [f"word{i}" for i in range(300)] + ["common"] * 30
+    return [TextNode(text=" ".join(rnd.choices(vocab, k=rnd.randint(5, 30))), id_=f"node{i}") for i in range(n)]
 
-from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
+
+def _tokenize(text: str) -> list[str]:
+    return text.split()
 
 
 class TestDynamicBM25Retriever:
     @pytest.fixture(autouse=True)
     def setup(self, mocker):
         self.doc1 = mocker.MagicMock(spec=Node)
+        self.doc1.node_id = "doc1"
         self.doc1.get_content.return_value = "Document content 1"
         self.doc2 = mocker.MagicMock(spec=Node)
+        self.doc2.node_id = "doc2"
         self.doc2.get_content.return_value = "Document content 2"
         self.mock_nodes = [self.doc1, self.doc2]
 
-        index = mocker.MagicMock(spec=VectorStoreIndex)
-        index.storage_context.persist.return_value = "ok"
+        self.index = mocker.MagicMock(spec=VectorStoreIndex)
+        self.index.storage_context.persist.return_value = "ok"
 
         mock_nodes = []
-        mock_tokenizer = mocker.MagicMock()
-        self.mock_bm25okapi = mocker.patch("rank_bm25.BM25Okapi.__init__", return_value=None)
+        mock_tokenizer = mocker.MagicMock(side_effect=_tokenize)
 
-        self.retriever = DynamicBM25Retriever(nodes=mock_nodes, tokenizer=mock_tokenizer, index=index)
+        self.retriever = DynamicBM25Retriever(nodes=mock_nodes, tokenizer=mock_tokenizer, index=self.index)
 
     def test_add_docs_updates_nodes_and_corpus(self):
         # Exec
@@ -29,9 +45,93 @@ class TestDynamicBM25Retriever:
 
         # Assert
         assert len(self.retriever._nodes) == len(self.mock_nodes)
-        assert len(self.retriever._corpus) == len(self.mock_nodes)
-        self.retriever._tokenizer.assert_called()
-        self.mock_bm25okapi.assert_called()
+        assert len(self.retriever.bm25) == len(self.mock_nodes)
+        assert self.retriever._tokenizer.call_count == len(self.mock_nodes)
+        self.index.insert_nodes.assert_called_once()
+
+    def test_add_docs_only_tokenizes_new_nodes(self):
+        self.retriever.add_nodes([self.doc1])
+        self.retriever.add_nodes([self.doc2])
+
+        assert self.retriever._tokenizer.call_count == 2
+        assert self.retriever.bm25.postings["2"] == {"doc2": 1}
+
+    def test_delete_nodes(self):
+        self.retriever.add_nodes(self.mock_nodes)
+
+        self.retriever.delete_nodes(["doc1"])
+
+        assert list(self.retriever._nodes) == ["doc2"]
+        assert "1" not in self.retriever.bm25.postings
+        assert self.retriever.bm25.postings["content"] == {"doc2": 1}
+        self.index.delete_nodes.assert_called_once_with(["doc1"])
+
+    def test_persist(self, tmp_path):
+        self.retriever.add_nodes(self.mock_nodes)
+
+        self.retriever.persist(str(tmp_path))
+
+        self.index.storage_context.persist.assert_called_once_with(str(tmp_path))
+        bm25 = IncrementalBM25.from_persist_dir(tmp_path)
+        assert bm25.postings == self.retriever.bm25.postings
+        assert bm25.doc_lens == self.retriever.bm25.doc_lens
+
+    def test_init_from_persisted_bm25(self, mocker, tmp_path):
+        self.retriever.add_nodes(self.mock_nodes)
+        self.retriever.persist(str(tmp_path))
+        doc3 = mocker.MagicMock(spec=Node)
+        doc3.node_id = "doc3"
+        doc3.get_content.return_value = "Document content 3"
+        tokenizer = mocker.MagicMock(side_effect=_tokenize)
+
+        retriever = DynamicBM25Retriever(
+            nodes=[self.doc2, doc3], tokenizer=tokenizer, bm25=IncrementalBM25.from_persist_dir(tmp_path)
+        )
+
+        tokenizer.assert_called_once_with("Document content 3")  # doc2 is reused, doc1 is dropped
+        assert set(retriever.bm25.doc_lens) == {"doc2", "doc3"}
+        assert retriever.bm25.postings["content"] == {"doc2": 1, "doc3": 1}
+
+
+@pytest.mark.parametrize("top_k", [1, 5, 50])
+def test_bm25_parity_with_bm25okapi(top_k):
+    nodes = _make_corpus(200)
+    retriever = DynamicBM25Retriever(nodes=nodes[:50], tokenizer=_tokenize, similarity_top_k=top_k)
+    retriever.add_nodes(nodes[50:])
+    retriever.delete_nodes([node.node_id for node in nodes[:20]])
+    remaining = nodes[20:]
+    okapi = BM25Okapi([_tokenize(node.get_content()) for node in remaining])
+
+    for query in ["word1 common", "word7 word8 word9", "common", "missing", "word3 word3"]:
+        expected = okapi.get_scores(_tokenize(query))
+        actual = retriever._get_scored_nodes(query)
+        assert [n.score for n in actual] == pytest.approx(list(expected))
+
+        expected_top = sorted(zip(remaining, expected), key=lambda x: x[1], reverse=True)[:top_k]
+        actual_top = retriever.retrieve(QueryBundle(query))
+        assert [n.node.node_id for n in actual_top] == [node.node_id for node, _ in expected_top]
+
+
+def test_bm25_add_nodes_benchmark():
+    nodes = _make_corpus(2000)
+    batches = [nodes[i : i + 100] for i in range(0, len(nodes), 100)]
+
+    start = time.perf_counter()
+    corpus = []
+    for batch in batches:  # the old add_nodes: re-tokenize everything and rebuild BM25Okapi
+        corpus.extend(batch)
+        okapi = BM25Okapi([_tokenize(node.get_content()) for node in corpus])
+    rebuild_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    retriever = DynamicBM25Retriever(nodes=[], tokenizer=_tokenize)
+    for batch in batches:
+        retriever.add_nodes(batch)
+    incremental_time = time.perf_counter() - start
 
-    def test_persist(self):
-        self.retriever.persist("")
+    logger.info(f"bm25 add_nodes x{len(batches)}: rebuild {rebuild_time:.4f}s, incremental {incremental_time:.4f}s")
+    assert len(retriever.bm25) == len(nodes)
+    query = "word1 common"
+    assert [n.score for n in retriever._get_scored_nodes(query)] == pytest.approx(
+        list(okapi.get_scores(_tokenize(query)))
+    )
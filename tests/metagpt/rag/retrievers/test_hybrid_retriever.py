@@ -1,4 +1,8 @@
+import asyncio
+import time
+
 import pytest
+from llama_index.core.retrievers import BaseRetriever
 from llama_index.core.schema import NodeWithScore, TextNode
 
 from metagpt.rag.retrievers import SimpleHybridRetriever
@@ -48,6 +52,89 @@ class TestSimpleHybridRetriever:
         node_scores = {node.node.node_id: node.score for node in results}
         assert node_scores["2"] == 0.95
 
+    @pytest.fixture
+    def two_retrievers(self, mocker):
+        mock_retriever1 = mocker.AsyncMock()
+        mock_retriever1.aretrieve.return_value = [
+            NodeWithScore(node=TextNode(id_="1"), score=10.0),
+            NodeWithScore(node=TextNode(id_="2"), score=5.0),
+            NodeWithScore(node=TextNode(id_="3"), score=0.0),
+        ]
+        mock_retriever2 = mocker.AsyncMock()
+        mock_retriever2.aretrieve.return_value = [
+            NodeWithScore(node=TextNode(id_="3"), score=0.9),
+            NodeWithScore(node=TextNode(id_="2"), score=0.7),
+        ]
+        return mock_retriever1, mock_retriever2
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_rrf(self, two_retrievers):
+        hybrid_retriever = SimpleHybridRetriever(*two_retrievers, fusion_mode="rrf", rrf_k=60)
+
+        results = await hybrid_retriever._aretrieve("test query")
+
+        assert [n.node.node_id for n in results] == ["3", "2", "1"]
+        assert results[0].score == pytest.approx(1 / 63 + 1 / 61)
+        assert results[1].score == pytest.approx(1 / 62 + 1 / 62)
+        assert results[2].score == pytest.approx(1 / 61)
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_relative_score(self, two_retrievers):
+        hybrid_retriever = SimpleHybridRetriever(
+            *two_retrievers, fusion_mode="relative_score", weights=[1.0, 2.0], similarity_top_k=2
+        )
+
+        results = await hybrid_retriever._aretrieve("test query")
+
+        # 1: 1.0; 2: 0.5 + 0; 3: 0 + 2 * 1.0
+        assert [n.node.node_id for n in results] == ["3", "1"]
+        assert [n.score for n in results] == pytest.approx([2.0, 1.0])
+
+    def test_weights_must_match_retrievers(self, two_retrievers):
+        with pytest.raises(ValueError):
+            SimpleHybridRetriever(*two_retrievers, weights=[1.0])
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_concurrently_with_timeout(self, mocker):
+        async def slow_aretrieve(query, delay, node_id):
+            await asyncio.sleep(delay)
+            return [NodeWithScore(node=TextNode(id_=node_id), score=1.0)]
+
+        retrievers = []
+        for delay, node_id in [(0.2, "1"), (0.2, "2"), (5, "3")]:
+            retriever = mocker.MagicMock()
+            retriever.aretrieve.side_effect = lambda q, d=delay, i=node_id: slow_aretrieve(q, d, i)
+            retrievers.append(retriever)
+        hybrid_retriever = SimpleHybridRetriever(*retrievers, timeout=0.5)
+
+        start = time.perf_counter()
+        results = await hybrid_retriever._aretrieve("test query")
+        elapsed = time.perf_counter() - start
+
+        assert [n.node.node_id for n in results] == ["1", "2"]  # the slow one is skipped
+        assert elapsed < 1
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_sync_retrievers_in_threads(self):
+        class SleepingRetriever(BaseRetriever):
+            def __init__(self, delay: float, node_id: str):
+                super().__init__()
+                self.delay, self.node_id = delay, node_id
+
+            def _retrieve(self, query_bundle):
+                time.sleep(self.delay)  # blocking, as BM25
+                return [NodeWithScore(node=TextNode(id_=self.node_id), score=1.0)]
+
+        retrievers = [SleepingRetriever(0.2, "1"), SleepingRetriever(0.2, "2"), SleepingRetriever(2, "3")]
+        hybrid_retriever = SimpleHybridRetriever(*retrievers, timeout=0.5)
+
+        start = time.perf_counter()
+        results = await hybrid_retriever._aretrieve("test query")
+        elapsed = time.perf_counter() - start
+
+        assert [n.node.node_id for n in results] == ["1", "2"]  # the slow one is skipped
+        assert elapsed < 1
+
     def test_add_nodes(self, mock_hybrid_retriever: SimpleHybridRetriever, mock_node):
         mock_hybrid_retriever.add_nodes([mock_node])
         mock_hybrid_retriever.retrievers[0].add_nodes.assert_called_once()
@@ -1,7 +1,11 @@
+import asyncio
+import time
+
 import pytest
 
 from metagpt.logs import logger
 from metagpt.roles.di.data_interpreter import DataInterpreter
+from metagpt.schema import Message
 
 
 @pytest.mark.asyncio
@@ -32,3 +36,45 @@ async def test_interpreter_react_mode(mocker):
     rsp = await di.run(requirement)
     logger.info(rsp)
     assert len(rsp.content) > 0
+
+
+async def write_and_exec_code(mocker, code_candidates: int, codes: list[str]) -> tuple[float, list[str], int]:
+    codes = iter(codes)
+    trials = set()
+
+    async def write_code(self, counter, *args, **kwargs):
+        trials.add(counter)
+        await asyncio.sleep(0.5)  # the LLM
+        return next(codes), self.rc.todo
+
+    mocker.patch.object(DataInterpreter, "_write_code", write_code)
+    di = DataInterpreter(react_mode="react", code_candidates=code_candidates)
+    di.rc.working_memory.add(Message(content="requirement", role="user"))
+    await di.execute_code.build()
+    cells = len(di.execute_code.nb.cells)
+
+    start = time.perf_counter()
+    code, result, success = await di._write_and_exec_code()
+    seconds = time.perf_counter() - start
+
+    assert success and code.endswith("y = 2")
+    executed = [cell.source for cell in di.execute_code.nb.cells[cells:]]
+    output, success = await di.execute_code.run("print(y)")
+    assert output == "2\n"
+    await di.execute_code.terminate()
+    return seconds, executed, len(trials)
+
+
+@pytest.mark.asyncio
+async def test_write_and_exec_code_candidates(mocker):
+    failing, succeeding = "import time\ntime.sleep(0.5)\n1/0", "import time\ntime.sleep(0.5)\ny = 2"
+    seconds, executed, trials = await write_and_exec_code(mocker, 1, [failing, succeeding])
+    assert executed == [failing, succeeding] and trials == 2  # one after another
+
+    parallel_seconds, executed, trials = await write_and_exec_code(mocker, 2, [failing, succeeding])
+    assert executed == [failing, succeeding]  # the second one ran in a fork meanwhile, then in the kernel
+    assert trials == 1  # written together, an LLM round trip less
+    logger.info(f"a failure and a retry: {seconds:.3f}s, 2 candidates in parallel: {parallel_seconds:.3f}s")
+
+    _, executed, _ = await write_and_exec_code(mocker, 2, [succeeding, failing])
+    assert executed == [succeeding]  # the first one succeeded, not run again
@@ -28,7 +28,7 @@ def test_env_serdeser(context):
 
     new_env = Environment(**ser_env_dict, context=context)
     assert len(new_env.roles) == 0
-    assert len(new_env.history) == 25
+    assert len(str(new_env.history)) == 25
 
 
 def test_environment_serdeser(context):
@@ -5,8 +5,16 @@
 @Author  : alexanderwu
 @File    : test_context.py
 """
+import asyncio
+import time
+
+import pytest
+
 from metagpt.configs.llm_config import LLMType
 from metagpt.context import AttrDict, Context
+from metagpt.logs import logger
+from metagpt.provider.llm_provider_registry import create_llm_instance
+from tests.metagpt.provider.mock_llm_config import mock_llm_config_dashscope
 
 
 def test_attr_dict_1():
@@ -63,6 +71,90 @@ def test_context_2():
     assert kwargs.test_key == "test_value"
 
 
+@pytest.mark.asyncio
+async def test_context_llm_cache():
+    ctx = Context()
+    llm_config = ctx.config.get_openai_llm()
+
+    llm1 = ctx.llm_with_cost_manager_from_llm_config(llm_config)
+    llm2 = ctx.llm_with_cost_manager_from_llm_config(llm_config.model_copy())
+    llm1.system_prompt = "You are a tester."
+
+    assert llm1 is not llm2
+    assert llm1.aclient is llm2.aclient  # share the client and its connection pool
+    assert llm2.system_prompt != llm1.system_prompt
+    assert llm1.cost_manager is ctx.cost_manager
+
+    other = ctx.llm_with_cost_manager_from_llm_config(llm_config.model_copy(update={"model": "gpt-other"}))
+    assert other.aclient is not llm1.aclient
+
+    await ctx.aclose_llms()
+    assert llm1.aclient.is_closed()
+    assert ctx.llm().aclient is not llm1.aclient
+
+
+def test_context_llm_cache_per_event_loop():
+    ctx = Context()
+    llm_config = ctx.config.get_openai_llm()
+
+    async def get_llms():
+        return ctx.llm_with_cost_manager_from_llm_config(llm_config), ctx.llm_with_cost_manager_from_llm_config(
+            llm_config
+        )
+
+    llm1, llm2 = asyncio.run(get_llms())
+    assert llm1.aclient is llm2.aclient
+    llm3, _ = asyncio.run(get_llms())
+    assert llm3.aclient is not llm1.aclient  # a client isn't shared with another event loop
+    assert len(ctx._llm_cache) == 1  # the entry of the closed loop is dropped
+
+
+def test_context_llm_cache_without_running_loop():
+    ctx = Context()
+    llm_config = ctx.config.get_openai_llm()
+    llm1 = ctx.llm_with_cost_manager_from_llm_config(llm_config)
+    llm2 = ctx.llm_with_cost_manager_from_llm_config(llm_config)
+    assert llm1.aclient is not llm2.aclient  # not shared by the loops running them later
+    assert not ctx._llm_cache
+
+    async def get_llm():
+        return ctx.llm_with_cost_manager_from_llm_config(llm_config)
+
+    assert asyncio.run(get_llm()).aclient is not llm1.aclient
+
+
+@pytest.mark.asyncio
+async def test_context_llm_cache_cost_manager():
+    ctx = Context()
+    llm1 = ctx.llm_with_cost_manager_from_llm_config(mock_llm_config_dashscope)
+    llm2 = ctx.llm_with_cost_manager_from_llm_config(mock_llm_config_dashscope)
+    assert llm1.aclient is llm2.aclient
+    assert llm1.cost_manager is not llm2.cost_manager  # created by the provider, per copy
+
+    llm1.cost_manager.update_cost(10, 10, "qwen-max")
+    assert llm2.cost_manager.total_prompt_tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_context_llm_cache_benchmark(mocker):
+    ctx = Context()
+    llm_config = ctx.config.get_openai_llm()
+
+    start = time.perf_counter()
+    for _ in range(50):
+        create_llm_instance(llm_config)
+    create_time = time.perf_counter() - start
+
+    create = mocker.patch("metagpt.context.create_llm_instance", wraps=create_llm_instance)
+    start = time.perf_counter()
+    llms = [ctx.llm_with_cost_manager_from_llm_config(llm_config) for _ in range(50)]
+    cached_time = time.perf_counter() - start
+
+    logger.info(f"50 llm instances: create {create_time:.4f}s, cached {cached_time:.4f}s")
+    assert create.call_count == 1
+    assert all(llm.aclient is llms[0].aclient and llm.model == llm_config.model for llm in llms)
+
+
 def test_context_3():
     # ctx = Context()
     # ctx.use_llm(provider=LLMType.OPENAI)
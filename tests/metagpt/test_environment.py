@@ -6,11 +6,12 @@
 @File    : test_environment.py
 """
 
+import asyncio
 from pathlib import Path
 
 import pytest
 
-from metagpt.actions import UserRequirement
+from metagpt.actions import Action, UserRequirement
 from metagpt.environment import Environment
 from metagpt.logs import logger
 from metagpt.roles import Architect, ProductManager, Role
@@ -57,7 +58,75 @@ async def test_publish_and_process_message(env: Environment):
     env.publish_message(Message(role="User", content="需要一个基于LLM做总结的搜索引擎", cause_by=UserRequirement))
     await env.run(k=2)
     logger.info(f"{env.history=}")
-    assert len(env.history) > 10
+    assert len(str(env.history)) > 10
+
+
+class Tracker:
+    running = 0
+    max_running = 0
+
+
+class ActionA(Action):
+    async def run(self, *args, **kwargs):
+        Tracker.running += 1
+        Tracker.max_running = max(Tracker.max_running, Tracker.running)
+        await asyncio.sleep(0.01)
+        Tracker.running -= 1
+        return "A done"
+
+
+class ActionB(ActionA):
+    pass
+
+
+class RoleA(Role):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.set_actions([ActionA])
+        self._watch([UserRequirement])
+
+
+class RoleB(Role):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.set_actions([ActionB])
+        self._watch([ActionA])
+
+
+@pytest.mark.asyncio
+async def test_run_until_idle(env: Environment):
+    Tracker.running = Tracker.max_running = 0
+    env.add_roles([RoleA(name=f"A{i}", profile=f"A{i}") for i in range(4)] + [RoleB(name="B", profile="B")])
+    env.publish_message(Message(content="start", cause_by=UserRequirement))
+
+    runs = await env.run_until_idle(max_concurrency=2)
+    assert Tracker.max_running == 2
+    # RoleB is woken by each RoleA, the wakeups arriving while RoleB is running are coalesced into its next run
+    role_b = env.get_role("B")
+    assert 4 + len(role_b.rc.memory.get_by_action(ActionB)) <= runs <= 8
+    assert len(role_b.rc.memory.get_by_action(ActionA)) == 4
+    assert await env.run_until_idle() == 0
+
+
+@pytest.mark.asyncio
+async def test_run_until_idle_budget(env: Environment, mocker):
+    env.add_roles([RoleA(name="A", profile="A"), RoleB(name="B", profile="B")])
+    env.publish_message(Message(content="start", cause_by=UserRequirement))
+
+    assert await env.run_until_idle(max_runs=1) == 1
+    assert list(env._ready_roles) == [env.get_role("B")]
+    assert await env.run_until_idle() == 1  # RoleB was woken by RoleA
+    assert await env.run_until_idle() == 0
+
+    env.publish_message(Message(content="start again", cause_by=UserRequirement))
+    assert await env.run_until_idle(max_runs=1) == 1
+    await env.get_role("B").run()  # reads the message waking it
+    assert await env.run_until_idle() == 0
+    assert not env._ready_roles
+
+    env.publish_message(Message(content="start again", cause_by=UserRequirement))
+    with pytest.raises(ValueError):
+        await env.run_until_idle(before_run=mocker.Mock(side_effect=ValueError("no money")))
 
 
 if __name__ == "__main__":
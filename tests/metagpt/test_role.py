@@ -109,6 +109,25 @@ async def test_send_to():
     assert m.send_to == {"a", any_to_str(MockRole), any_to_str(Message)}
 
 
+@pytest.mark.asyncio
+async def test_observe():
+    role = MockRole(name="observer")
+    seen = Message(content="seen", cause_by=UserRequirement)
+    role.rc.memory.add(seen)
+    unwatched = Message(content="unwatched", cause_by=MockAction)
+    for msg in [seen, Message(content="new", cause_by=UserRequirement), unwatched]:
+        role.put_message(msg)
+
+    assert await role._observe() == 1
+    assert role.rc.news[0].content == "new"
+    assert role.rc.memory.count() == 3
+
+    role.put_message(unwatched)
+    role.put_message(Message(content="to me", cause_by=MockAction, send_to="observer"))
+    assert await role._observe() == 1
+    assert role.rc.news[0].content == "to me"
+
+
 def test_init_action():
     role = Role()
     role.set_actions([MockAction, MockAction])
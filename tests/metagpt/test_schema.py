@@ -21,6 +21,7 @@ from metagpt.schema import (
     CodeSummarizeContext,
     Document,
     Message,
+    MessageHistory,
     MessageQueue,
     Plan,
     SystemMessage,
@@ -140,6 +141,25 @@ async def test_message_queue():
     assert new_mq.pop_all() == mq.pop_all()
 
 
+def test_message_history(tmp_path):
+    spill_path = tmp_path / "history.jsonl"
+    history = MessageHistory(capacity=2, spill_path=spill_path)
+    for i in range(5):
+        history.add(Message(content=str(i)))
+    assert [i.content for i in history.get()] == ["3", "4"]
+    assert str(history) == "\nuser: 3\nuser: 4"
+    spilled = [Message.load(i) for i in spill_path.read_text().splitlines()]
+    assert [i.content for i in spilled] == ["0", "1", "2"]
+
+    new_history = MessageHistory(**history.model_dump())
+    assert new_history.messages.maxlen == 2
+    assert new_history.get() == history.get()
+
+    disabled = MessageHistory(enabled=False)
+    disabled.add(Message(content="0"))
+    assert len(disabled) == 0
+
+
 @pytest.mark.parametrize(
     ("file_list", "want"),
     [
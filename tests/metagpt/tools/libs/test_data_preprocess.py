@@ -1,10 +1,13 @@
+import time
 from datetime import datetime
 
 import numpy as np
 import numpy.testing as npt
 import pandas as pd
 import pytest
+from sklearn.preprocessing import OrdinalEncoder
 
+from metagpt.logs import logger
 from metagpt.tools.libs.data_preprocess import (
     FillMissingValue,
     LabelEncode,
@@ -77,6 +80,12 @@ def test_ordinal_encode(mock_datasets):
     transformed = oe.fit_transform(mock_datasets.copy())
 
     assert transformed["cat1"].max() == 2
+    npt.assert_array_equal(transformed["cat1"], OrdinalEncoder().fit_transform(mock_datasets[["cat1"]])[:, 0])
+
+    test = mock_datasets.copy()
+    test["cat1"] = ["A", "B", "C", "D", "E"]
+    with pytest.raises(ValueError, match="unknown categories"):
+        oe.transform(test)
 
 
 def test_one_hot_encode(mock_datasets):
@@ -99,6 +108,47 @@ def test_label_encode(mock_datasets):
     assert transformed["cat1"].max() == 4
 
 
+def legacy_label_encode(le: LabelEncode, df: pd.DataFrame) -> pd.DataFrame:
+    """LabelEncode.transform replacing the unseen categories one by one in a list"""
+    new_df = df.copy()
+    for i in range(len(le.features)):
+        data_list = df[le.features[i]].astype(str).tolist()
+        for unique_item in np.unique(df[le.features[i]].astype(str)):
+            if unique_item not in le.le_encoders[i].classes_:
+                data_list = ["unknown" if x == unique_item else x for x in data_list]
+        new_df[le.features[i]] = le.le_encoders[i].transform(data_list)
+    return new_df
+
+
+def test_label_encode_same_as_legacy():
+    train = pd.DataFrame({"cat": ["A", None, np.nan, 1, 1.5], "date": pd.to_datetime(["2020-01-01"] * 4 + [None])})
+    test = pd.DataFrame({"cat": ["B", 1, np.nan, "1", None, 2], "date": pd.to_datetime(["2020-01-02", None] * 3)})
+    le = LabelEncode(features=["cat", "date"])
+    le.fit(train)
+
+    npt.assert_array_equal(le.transform(test), legacy_label_encode(le, test))
+
+
+def test_label_encode_benchmark():
+    rng = np.random.default_rng(0)
+    categories = np.array([f"cat_{i}" for i in range(100)], dtype=object)
+    train = pd.DataFrame({"cat": rng.choice(categories[:90], 1_000_000)})
+    test = pd.DataFrame({"cat": rng.choice(categories, 1_000_000)})  # 10 unseen categories
+    le = LabelEncode(features=["cat"])
+    le.fit(train)
+
+    start = time.perf_counter()
+    expected = legacy_label_encode(le, test)
+    legacy_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    transformed = le.transform(test)
+    seconds = time.perf_counter() - start
+
+    logger.info(f"LabelEncode.transform of 1M rows: {seconds:.3f}s, legacy: {legacy_seconds:.3f}s")
+    npt.assert_array_equal(transformed["cat"], expected["cat"])
+    assert transformed["cat"].nunique() == 91  # the unseen categories share a code
+
+
 def test_get_column_info(mock_datasets):
     df = mock_datasets
     column_info = get_column_info(df)
@@ -1,8 +1,13 @@
+import itertools
+import time
+
 import numpy as np
+import numpy.testing as npt
 import pandas as pd
 import pytest
 from sklearn.datasets import fetch_california_housing, load_breast_cancer, load_iris
 
+from metagpt.logs import logger
 from metagpt.tools.libs.feature_engineering import (
     CatCount,
     CatCross,
@@ -107,6 +112,55 @@ def test_cat_cross(mock_dataset):
 
     assert "cat1_cat2" not in transformed.columns
 
+    cols = ["cat1", "cat2", "date1"]
+    cc = CatCross(cols=cols, max_cat_num=3)
+    cc.fit(mock_dataset)
+    assert cols == ["cat1", "cat2", "date1"]  # not modified
+    assert cc.combs == []
+
+
+def legacy_cat_cross(cols: list, train: pd.DataFrame, test: pd.DataFrame) -> pd.DataFrame:
+    """CatCross mapping the zipped values through the dict of the product of the unique values"""
+    new_df = test.copy()
+    for comb in itertools.combinations(cols, 2):
+        new_col = f"{comb[0]}_{comb[1]}"
+        new_col_combs = list(itertools.product(train[comb[0]].unique(), train[comb[1]].unique()))
+        _map = dict(zip(new_col_combs, range(len(new_col_combs))))
+        new_df[new_col] = pd.Series(zip(new_df[comb[0]], new_df[comb[1]])).map(_map)
+        new_df[new_col] = new_df[new_col].fillna(max(_map.values()) + 1).astype(int)
+    return new_df
+
+
+def test_cat_cross_same_as_legacy(mock_dataset):
+    test = mock_dataset.copy()
+    test["cat1"] = ["A", "F", np.nan, "D", "E", "C", "G", "A"]
+    cc = CatCross(cols=["cat1", "cat2", "label"])
+    cc.fit(mock_dataset)
+
+    transformed = cc.transform(test)
+
+    pd.testing.assert_frame_equal(transformed, legacy_cat_cross(["cat1", "cat2", "label"], mock_dataset, test))
+    assert test.columns.tolist() == mock_dataset.columns.tolist()  # the input is not modified
+
+
+def test_cat_cross_benchmark():
+    rng = np.random.default_rng(0)
+    cols = [f"cat{i}" for i in range(6)]
+    df = pd.DataFrame({col: rng.choice([f"{col}_{i}" for i in range(50)], 200_000) for col in cols})
+    cc = CatCross(cols=cols)
+    cc.fit(df)
+
+    start = time.perf_counter()
+    expected = legacy_cat_cross(cols, df, df)
+    legacy_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    transformed = cc.transform(df)
+    seconds = time.perf_counter() - start
+
+    logger.info(f"CatCross.transform of 15 crosses of 200k rows: {seconds:.3f}s, legacy: {legacy_seconds:.3f}s")
+    npt.assert_array_equal(transformed.to_numpy(), expected.to_numpy())
+    assert transformed.columns.tolist() == expected.columns.tolist()
+
 
 def test_group_stat(mock_dataset):
     gs = GroupStat(group_col="cat1", agg_col="num1", agg_funcs=["mean", "sum"])
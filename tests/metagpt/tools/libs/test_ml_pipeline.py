@@ -0,0 +1,111 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metagpt.logs import logger
+from metagpt.tools.libs.data_preprocess import (
+    FillMissingValue,
+    LabelEncode,
+    MinMaxScale,
+    OneHotEncode,
+    StandardScale,
+)
+from metagpt.tools.libs.feature_engineering import (
+    CatCount,
+    CatCross,
+    GeneralSelection,
+    GroupStat,
+    SplitBins,
+)
+from metagpt.tools.libs.ml_pipeline import MLPipeline, read_chunks
+
+
+def make_dataset(rows: int, num_cols: int = 2, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {f"num{i}": rng.normal(i, 1, rows) for i in range(num_cols)}
+    data["num0"][rng.random(rows) < 0.1] = np.nan
+    data["cat1"] = rng.choice(["A", "B", "C"], rows)
+    data["cat2"] = rng.choice(["X", "Y"], rows)
+    data["label"] = rng.integers(0, 2, rows)
+    return pd.DataFrame(data)
+
+
+def make_steps():
+    return [
+        FillMissingValue(features=["num0"]),
+        StandardScale(features=["num0", "num1"]),
+        CatCount(col="cat1"),
+        CatCross(cols=["cat1", "cat2"]),
+        GroupStat(group_col="cat1", agg_col="num1", agg_funcs=["mean", "max"]),
+        SplitBins(cols=["num1"]),
+        OneHotEncode(features=["cat2"]),
+        LabelEncode(features=["cat1"]),
+        GeneralSelection(label_col="label"),
+    ]
+
+
+def run_steps(steps, df: pd.DataFrame, fit: bool = True) -> pd.DataFrame:
+    for step in steps:
+        df = step.fit_transform(df) if fit else step.transform(df)
+    return df
+
+
+def test_ml_pipeline():
+    train, test = make_dataset(1000), make_dataset(300, seed=1)
+    pipeline = MLPipeline(steps=make_steps())
+
+    transformed = pipeline.fit_transform(train)
+
+    steps = make_steps()
+    pd.testing.assert_frame_equal(transformed, run_steps(steps, train))
+    pd.testing.assert_frame_equal(pipeline.transform(test), run_steps(steps, test, fit=False))
+    pd.testing.assert_frame_equal(train, make_dataset(1000))  # the input is not modified
+
+
+def test_ml_pipeline_chunks(tmp_path):
+    train = make_dataset(1000)
+    train.to_csv(tmp_path / "train.csv", index=False)
+    pipeline = MLPipeline(steps=[FillMissingValue(features=["num0"]), StandardScale(features=["num0", "num1"])])
+
+    pipeline.fit_chunks(lambda: read_chunks(tmp_path / "train.csv", chunksize=128), sample_rows=300)
+
+    fill, scale = pipeline.steps
+    assert fill.model.statistics_[0] == pytest.approx(train["num0"][:300].mean())  # fitted on the sample
+    filled = train[["num0", "num1"]].fillna(fill.model.statistics_[0])
+    assert scale.model.mean_ == pytest.approx(filled.mean().to_numpy())  # partially fitted on all the chunks
+    assert scale.model.n_samples_seen_ == 1000
+
+    pipeline.transform_file(tmp_path / "train.csv", tmp_path / "transformed.csv", chunksize=128)
+    transformed = pd.read_csv(tmp_path / "transformed.csv")
+    pd.testing.assert_frame_equal(transformed, pipeline.transform(train), check_exact=False)
+
+
+def test_ml_pipeline_benchmark():
+    df = make_dataset(200_000, num_cols=40)
+    steps = [FillMissingValue(features=["num0"])]
+    steps += [MinMaxScale(features=[f"num{i}"]) for i in range(1, 8)]
+    steps += [CatCount(col="cat1"), LabelEncode(features=["cat2"])]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    expected = run_steps(steps, df)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    transformed = MLPipeline(steps=steps).fit_transform(df)
+    pipeline_seconds = time.perf_counter() - start
+    _, pipeline_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    logger.info(
+        f"10 steps over 200k rows: pipeline {pipeline_seconds:.3f}s, peak {pipeline_peak / 2**20:.0f}MB, "
+        f"one by one {seconds:.3f}s, peak {peak / 2**20:.0f}MB"
+    )
+    pd.testing.assert_frame_equal(transformed, expected)
+    assert pipeline_seconds < seconds
+    assert pipeline_peak < peak
@@ -2,9 +2,43 @@
 # -*- coding: utf-8 -*-
 # @Desc   : unittest of ahttp_client
 
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from metagpt.config2 import config
+from metagpt.logs import logger
+from metagpt.utils.ahttp_client import (
+    SESSION_POOL,
+    ClientSessionPool,
+    apost,
+    apost_stream,
+)
+
 
-from metagpt.utils.ahttp_client import apost, apost_stream
+@asynccontextmanager
+async def local_server():
+    client_ports = []
+
+    async def handler(request: web.Request):
+        client_ports.append(request.transport.get_extra_info("peername")[1])
+        return web.json_response({"code": "200"})
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    server = TestServer(app)
+    await server.start_server()
+    server.client_ports = client_ports
+    try:
+        yield server
+    finally:
+        await server.close()
+        await SESSION_POOL.close()
 
 
 @pytest.mark.asyncio
@@ -27,3 +61,63 @@ async def test_apost_stream():
     result = apost_stream(url="http://aider.meizu.com/app/weather/listWeather", data={"cityIds": "101240101"})
     async for line in result:
         assert len(line) >= 0
+
+
+@pytest.mark.asyncio
+async def test_apost_reuses_pooled_connection():
+    async with local_server() as server:
+        url = str(server.make_url("/"))
+
+        for _ in range(5):
+            result = await apost(url=url, as_json=True)
+            assert result["code"] == "200"
+        async for line in apost_stream(url=url):
+            assert "200" in line
+
+        assert len(set(server.client_ports)) == 1  # a single kept-alive connection
+        assert await SESSION_POOL.get() is await SESSION_POOL.get()
+
+
+@pytest.mark.asyncio
+async def test_apost_pooled_benchmark():
+    async with local_server() as server:
+        url = str(server.make_url("/"))
+
+        start = time.perf_counter()
+        for _ in range(100):
+            async with aiohttp.ClientSession() as session:  # a session per request, as before
+                async with session.post(url=url) as resp:
+                    await resp.json()
+        fresh_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(100):
+            await apost(url=url, as_json=True)
+        pooled_time = time.perf_counter() - start
+
+    logger.info(f"100 posts: fresh session {fresh_time:.4f}s, pooled session {pooled_time:.4f}s")
+    assert pooled_time < fresh_time
+
+
+def test_session_pool_closes_sessions_of_closed_loops():
+    pool = ClientSessionPool()
+    old_session = asyncio.run(pool.get())
+    assert old_session.connector.limit_per_host == 0  # no limit per host by default
+
+    async def get_new_session():
+        session = await pool.get()
+        await pool.close()
+        return session
+
+    new_session = asyncio.run(get_new_session())
+    assert new_session is not old_session
+    assert old_session.closed
+
+
+@pytest.mark.asyncio
+async def test_session_pool_limits(mocker):
+    mocker.patch.object(config.http_pool, "limit_per_host", 20)
+    pool = ClientSessionPool(limit=50)
+    session = await pool.get()
+    assert (session.connector.limit, session.connector.limit_per_host) == (50, 20)
+    await pool.close()
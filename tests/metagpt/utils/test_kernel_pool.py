@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : test_kernel_pool.py
+@Desc    : Unit tests for kernel_pool.py
+"""
+import asyncio
+
+import pytest
+
+from metagpt.configs.kernel_pool_config import KernelPoolConfig
+from metagpt.utils.kernel_pool import KernelPool, close_kernel_pools, get_kernel_pool
+
+
+async def run(kc, code: str) -> dict:
+    return await kc.execute_interactive(code, timeout=30, output_hook=lambda msg: None)
+
+
+async def output(kc, code: str) -> str:
+    outputs = []
+
+    def output_hook(msg):
+        if msg["msg_type"] == "stream":
+            outputs.append(msg["content"]["text"])
+
+    await kc.execute_interactive(code, timeout=30, output_hook=output_hook)
+    return "".join(outputs)
+
+
+@pytest.mark.asyncio
+async def test_kernel_pool():
+    pool = KernelPool(size=1, preload_modules=["json", "not_installed_module"])
+    try:
+        await pool.fill()
+        km, kc = await pool.acquire()
+        assert (await run(kc, "import sys; assert 'json' in sys.modules"))["content"]["status"] == "ok"
+        await run(kc, "x = 1")
+
+        await pool.release(km, kc)  # shut down, not reused
+        assert not await km.is_alive()
+        await pool.fill()
+        assert len(pool._idle) == 1
+
+        km2, kc2 = await pool.acquire()
+        assert km2 is not km
+        assert (await run(kc2, "x"))["content"]["status"] == "error"  # a new namespace
+        await km2.shutdown_kernel(now=True)
+        await pool.release(km2, kc2)  # a dead kernel is released too
+
+        await pool.fill()
+        km3, kc3 = await pool.acquire()
+        assert await km3.is_alive()
+        await pool.release(km3, kc3)
+    finally:
+        await pool.close()
+    assert not pool._idle and not pool._starting
+
+
+@pytest.mark.asyncio
+async def test_kernel_pool_process_state():
+    """A notebook doesn't see the working directory, environment variables or options set by the previous one"""
+    code = "import os, pandas as pd; print(os.getcwd(), pd.get_option('display.max_rows'), os.environ.get('LEAK'))"
+    pool = KernelPool(size=1, preload_modules=["pandas"])
+    try:
+        await pool.fill()
+        km, kc = await pool.acquire()
+        fresh = await output(kc, code)
+        await run(
+            kc, "import os, pandas as pd; os.chdir('/'); pd.set_option('display.max_rows', 3); os.environ['LEAK'] = '1'"
+        )
+        assert await output(kc, code) != fresh
+        await pool.release(km, kc)
+
+        km, kc = await pool.acquire()
+        assert await output(kc, code) == fresh
+        await pool.release(km, kc)
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_get_kernel_pool():
+    assert get_kernel_pool(KernelPoolConfig()) is None
+
+    config = KernelPoolConfig(size=1, preload_modules=[])
+    pool = get_kernel_pool(config)
+    try:
+        assert get_kernel_pool(config) is pool
+        assert len(pool._starting) == 1  # warming
+        km, kc = await pool.acquire()
+    finally:
+        await close_kernel_pools()
+    assert not pool._idle and not pool._starting
+    assert get_kernel_pool(config) is not pool
+
+    await pool.release(km, kc)
+    assert not km.has_kernel
+    assert not pool._starting  # not refilled once closed
+    await close_kernel_pools()
+
+
+def test_kernel_pools_closed_when_loop_ends(mocker):
+    kernel_managers = []
+    start = KernelPool._start
+
+    async def record_start(self):
+        kernel = await start(self)
+        kernel_managers.append(kernel.km)
+        return kernel
+
+    mocker.patch.object(KernelPool, "_start", record_start)
+
+    async def notebook():
+        pool = get_kernel_pool(KernelPoolConfig(size=1, preload_modules=[]))
+        km, kc = await pool.acquire()
+        await pool.release(km, kc)  # starts a kernel to fill the pool again
+        await pool.acquire()  # not released
+        return pool
+
+    for _ in range(3):
+        pool = asyncio.run(notebook())
+        assert not pool._idle and not pool._starting and not pool._in_use
+        assert kernel_managers and not any(km.has_kernel for km in kernel_managers)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : test_llm_response_cache.py
+@Desc    : Unit tests for llm_response_cache.py
+"""
+import time
+
+import pytest
+
+from metagpt.logs import log_llm_stream
+from metagpt.utils.llm_response_cache import (
+    LLMCacheMissError,
+    LLMResponseCache,
+    bypass_cached_responses,
+    get_response_cache,
+)
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+
+messages = [{"role": "user", "content": "hello"}]
+
+
+class MockCall:
+    def __init__(self, text: str = "world", chunks: list[str] = None):
+        self.text = text
+        self.chunks = chunks or []
+        self.count = 0
+
+    async def __call__(self) -> str:
+        self.count += 1
+        for chunk in self.chunks:
+            log_llm_stream(chunk)
+        return self.text
+
+
+def test_make_key():
+    key = LLMResponseCache.make_key(messages, mock_llm_config)
+    assert key == LLMResponseCache.make_key(list(messages), mock_llm_config.model_copy(update={"api_key": "sk-xxx"}))
+    assert key != LLMResponseCache.make_key(messages, mock_llm_config.model_copy(update={"temperature": 0.5}))
+    assert key != LLMResponseCache.make_key(messages, mock_llm_config, model="gpt-4")
+    assert key != LLMResponseCache.make_key([{"role": "user", "content": "hello!"}], mock_llm_config)
+
+
+@pytest.mark.asyncio
+async def test_read_write(tmp_path):
+    cache = LLMResponseCache(tmp_path / "cache.db", memory_entries=1)
+    call = MockCall()
+
+    assert await cache.aget_or_call("a", call) == "world"
+    assert await cache.aget_or_call("a", call) == "world"
+    assert call.count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    await cache.aget_or_call("b", MockCall("b"))
+    assert list(cache._memory) == ["b"]
+    assert cache.get("a").text == "world"  # evicted from memory, loaded from disk
+    cache.close()
+
+    reopened = LLMResponseCache(tmp_path / "cache.db")
+    assert await reopened.aget_or_call("a", call) == "world"
+    assert call.count == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl(tmp_path, mocker):
+    cache = LLMResponseCache(tmp_path / "cache.db", ttl=10)
+    call = MockCall()
+    await cache.aget_or_call("a", call)
+
+    mocker.patch("metagpt.utils.llm_response_cache.time.time", return_value=time.time() + 11)
+    assert cache.get("a") is None
+    await cache.aget_or_call("a", call)
+    assert call.count == 2
+
+
+@pytest.mark.asyncio
+async def test_record_replay(tmp_path):
+    recorder = LLMResponseCache(tmp_path / "cache.db", mode="record")
+    await recorder.aget_or_call("a", MockCall("old"))
+    assert await recorder.aget_or_call("a", MockCall("new")) == "new"
+
+    replayer = LLMResponseCache(tmp_path / "cache.db", mode="replay")
+    call = MockCall()
+    assert await replayer.aget_or_call("a", call) == "new"
+    with pytest.raises(LLMCacheMissError):
+        await replayer.aget_or_call("b", call)
+    assert call.count == 0
+
+
+@pytest.mark.asyncio
+async def test_bypass_cached_responses(tmp_path):
+    cache = LLMResponseCache(tmp_path / "cache.db")
+    await cache.aget_or_call("a", MockCall("invalid"))
+    with bypass_cached_responses():
+        assert await cache.aget_or_call("a", MockCall("valid")) == "valid"
+    assert await cache.aget_or_call("a", MockCall()) == "valid"
+
+    replayer = LLMResponseCache(tmp_path / "cache.db", mode="replay")
+    call = MockCall()
+    with bypass_cached_responses(), pytest.raises(LLMCacheMissError):
+        await replayer.aget_or_call("a", call)
+    assert call.count == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_replay(tmp_path, mocker):
+    logged = []
+    mocker.patch("metagpt.logs._llm_stream_log", side_effect=logged.append)
+    cache = LLMResponseCache(tmp_path / "cache.db")
+    await cache.aget_or_call("a", MockCall("hello world", chunks=["hello", " world", "\n"]), stream=True)
+    recorded = list(logged)
+    logged.clear()
+
+    assert await cache.aget_or_call("a", MockCall(), stream=True) == "hello world"
+    assert logged == recorded == ["hello", " world", "\n"]
+
+    logged.clear()
+    await cache.aget_or_call("b", MockCall("no stream"))
+    await cache.aget_or_call("b", MockCall(), stream=True)
+    assert logged == ["no stream", "\n"]
+
+
+def test_get_response_cache(tmp_path):
+    assert get_response_cache(mock_llm_config) is None
+
+    config = mock_llm_config.model_copy(
+        update={"response_cache": "replay", "response_cache_path": str(tmp_path / "cache.db")}
+    )
+    cache = get_response_cache(config)
+    assert cache.mode == "replay"
+    assert get_response_cache(config.model_copy(update={"model": "other"})) is cache
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-s"])
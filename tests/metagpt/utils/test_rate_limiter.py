@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : test_rate_limiter.py
+@Desc    : Unit tests for rate_limiter.py
+"""
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from metagpt.logs import logger
+from metagpt.utils.rate_limiter import (
+    RateLimitedError,
+    RateLimiter,
+    get_rate_limiter,
+    get_retry_after,
+)
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+
+
+class MockProvider:
+    """A provider rejecting the requests beyond its requests per minute."""
+
+    def __init__(self, rpm: int):
+        self.bucket = RateLimiter(rpm=rpm)
+        self.accepted = 0
+        self.rejected = 0
+
+    async def request(self):
+        if self.bucket._wait_time(0) > 0:
+            self.rejected += 1
+            raise RateLimitedError()
+        self.bucket._requests -= 1
+        self.accepted += 1
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_rpm():
+    limiter = RateLimiter(rpm=120)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[limiter.acquire() for _ in range(122)])  # 120 at once, then 2 per second
+
+    assert 0.9 < time.perf_counter() - start < 1.5
+
+
+@pytest.mark.asyncio
+async def test_tpm_fifo():
+    limiter = RateLimiter(tpm=60000)  # 1000 tokens per second
+    admitted = []
+
+    async def request(i, tokens):
+        await limiter.acquire(tokens)
+        admitted.append(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(request(0, 59900), request(1, 500), request(2, 300), request(3, 1))
+
+    assert admitted == [0, 1, 2, 3]  # the small request doesn't overtake the larger ones waiting before it
+    assert 0.6 < time.perf_counter() - start < 1.2
+
+
+@pytest.mark.asyncio
+async def test_pause():
+    limiter = RateLimiter(rpm=1000)
+
+    with pytest.raises(RateLimitedError):
+        async with limiter.limit():
+            raise RateLimitedError(retry_after=0.3)
+
+    start = time.perf_counter()
+    await limiter.acquire()
+    assert time.perf_counter() - start >= 0.29
+
+
+def test_get_retry_after():
+    assert get_retry_after(ValueError()) is None
+    assert get_retry_after(RateLimitedError(retry_after=3)) == 3
+    assert get_retry_after(RateLimitedError()) == 1
+
+    response = httpx.Response(429, headers={"retry-after": "2"}, request=httpx.Request("POST", "http://x"))
+    assert get_retry_after(openai.RateLimitError("", response=response, body=None)) == 2
+
+
+def test_get_rate_limiter():
+    assert get_rate_limiter(mock_llm_config) is None
+
+    config = mock_llm_config.model_copy(update={"rpm": 60, "tpm": 1000})
+    limiter = get_rate_limiter(config)
+    assert (limiter.rpm, limiter.tpm) == (60, 1000)
+    assert get_rate_limiter(config.model_copy(update={"api_key": "sk-other"})) is limiter
+    assert get_rate_limiter(config.model_copy(update={"model": "other"})) is not limiter
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_benchmark():
+    rpm, count = 600, 620
+
+    async def backoff_request(provider: MockProvider):
+        for i in range(10):
+            try:
+                return await provider.request()
+            except RateLimitedError:
+                await asyncio.sleep(0.1 * 2**i)
+
+    async def limited_request(provider: MockProvider, limiter: RateLimiter):
+        async with limiter.limit():
+            return await provider.request()
+
+    backoff = MockProvider(rpm)
+    start = time.perf_counter()
+    await asyncio.gather(*[backoff_request(backoff) for _ in range(count)])
+    backoff_time = time.perf_counter() - start
+
+    limited = MockProvider(rpm)
+    limiter = RateLimiter(rpm=rpm)
+    start = time.perf_counter()
+    await asyncio.gather(*[limited_request(limited, limiter) for _ in range(count)])
+    limited_time = time.perf_counter() - start
+
+    logger.info(
+        f"{count} requests at {rpm} rpm: backoff {backoff_time:.2f}s {backoff.rejected} rejected, "
+        f"rate limiter {limited_time:.2f}s {limited.rejected} rejected"
+    )
+    assert backoff.accepted == limited.accepted == count
+    assert backoff.rejected > 0
+    assert limited.rejected == 0
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : test_stream_json_parser.py
+@Desc    : Unit tests for stream_json_parser.py
+"""
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from metagpt.utils.stream_json_parser import StreamJSONParser
+
+
+class Output(BaseModel):
+    title: str
+    tasks: List[str]
+    nested: dict
+
+
+OUTPUT = """Here you are
+[CONTENT]
+{
+    "title": "a, \\"quoted\\" {title}",
+    "tasks": ["a,b", "[c]"],
+    "nested": {"x": [1, {"y": "}"}]},
+    "extra": 1
+}
+[/CONTENT]
+"""
+
+
+def test_stream_json_parser():
+    parser = StreamJSONParser(Output)
+    completed = []
+    for char in OUTPUT:
+        parser.feed(char)
+        if len(parser.fields) > len(completed):
+            completed.append(list(parser.fields)[-1])
+
+    assert completed == ["title", "tasks", "nested", "extra"]
+    assert parser.fields == {
+        "title": 'a, "quoted" {title}',
+        "tasks": ["a,b", "[c]"],
+        "nested": {"x": [1, {"y": "}"}]},
+        "extra": 1,
+    }
+    assert parser.done
+
+
+def test_stream_json_parser_fail_fast():
+    parser = StreamJSONParser(Output)
+    output = '[CONTENT]\n{"title": "ok", "tasks": "not a list", "nested": {}}\n[/CONTENT]'
+    end = output.index(', "nested"')
+
+    parser.feed(output[:end])
+    assert parser.fields == {"title": "ok"}
+    with pytest.raises(ValueError, match="tasks"):
+        parser.feed(output[end:])
+
+
+def test_stream_json_parser_skip():
+    parser = StreamJSONParser(Output)
+
+    parser.feed('{"title": 1}\n[CONTENT]\n{"title": \'single quoted\', "tasks": [], }\n[/CONTENT]')
+
+    assert parser.fields == {"tasks": []}  # the invalid json is left to the repair of the full output
+    assert parser.done
@@ -5,9 +5,33 @@
 @Author  : alexanderwu
 @File    : test_token_counter.py
 """
-import pytest
+import random
+import time
 
-from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
+import pytest
+import tiktoken
+
+from metagpt.logs import logger
+from metagpt.utils import token_counter
+from metagpt.utils.token_counter import (
+    count_input_tokens,
+    count_output_tokens,
+    count_text_tokens,
+)
+
+
+@pytest.fixture
+def byte_encoding(mocker):
+    """A byte level encoding, so that the counting doesn't download the tiktoken files."""
+    encoding = tiktoken.Encoding(
+        name="bytes",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    mocker.patch.object(token_counter, "get_encoding", return_value=encoding)
+    mocker.patch.object(token_counter, "_token_counts", token_counter.OrderedDict())
+    return encoding
 
 
 def test_count_message_tokens():
@@ -69,5 +93,69 @@ def test_count_string_tokens_gpt_4():
     assert count_output_tokens(string, model="gpt-4-0314") == 4
 
 
+def test_count_text_tokens_cache(byte_encoding, mocker):
+    encode_batch = mocker.spy(byte_encoding, "encode_batch")
+
+    assert count_text_tokens(["abc", "de", "abc", ""], byte_encoding) == [3, 2, 3, 0]
+    assert encode_batch.call_count == 1
+    assert encode_batch.call_args.args[0] == ["abc", "de", ""]  # each text is encoded once
+
+    assert count_text_tokens(["de", "abc"], byte_encoding) == [2, 3]
+    assert encode_batch.call_count == 1
+
+    mocker.patch.object(token_counter, "TOKEN_COUNT_CACHE_SIZE", 3)
+    count_text_tokens(["fgh"], byte_encoding)
+    assert len(token_counter._token_counts) == 3
+    assert count_text_tokens(["abc"], byte_encoding) == [3]  # the least recently used "" was evicted
+
+
+def test_count_text_tokens_more_than_cache_size(byte_encoding, mocker):
+    mocker.patch.object(token_counter, "TOKEN_COUNT_CACHE_SIZE", 3)
+    texts = ["a" * i for i in range(10)]
+    assert count_text_tokens(texts, byte_encoding) == list(range(10))
+    assert len(token_counter._token_counts) == 3
+
+
+def test_count_input_tokens_cached(byte_encoding):
+    messages = [
+        {"role": "user", "content": "Hello", "name": "John"},
+        {"role": "assistant", "content": [{"type": "text", "text": "Hi there!"}]},
+    ]
+
+    expected = 2 * 3 + len("userHelloJohnassistantHi there!") + 1 + 3
+    assert count_input_tokens(messages) == expected
+    assert count_input_tokens(messages, model="gpt-4") == expected
+    assert count_output_tokens("Hi there!", model="gpt-4") == 9
+    with pytest.raises(NotImplementedError):
+        count_input_tokens(messages, model="invalid_model")
+
+
+def test_count_input_tokens_benchmark(byte_encoding):
+    rnd = random.Random(0)
+    words = [f"word{i}" for i in range(1000)]
+    history = [
+        {"role": rnd.choice(["user", "assistant"]), "content": " ".join(rnd.choices(words, k=2000))} for _ in range(50)
+    ]
+
+    def count_without_cache(messages):  # the previous count_input_tokens
+        return sum(3 + sum(len(byte_encoding.encode(v)) for v in m.values()) for m in messages) + 3
+
+    # every request of a conversation sends the whole history
+    start = time.perf_counter()
+    expected = [count_without_cache(history[:i]) for i in range(1, len(history) + 1)]
+    uncached_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [count_input_tokens(history[:i]) for i in range(1, len(history) + 1)]
+    cached_time = time.perf_counter() - start
+
+    total = sum(expected)
+    logger.info(
+        f"{total} tokens: uncached {total / uncached_time:.0f} tokens/s, cached {total / cached_time:.0f} tokens/s"
+    )
+    assert actual == expected
+    assert cached_time < uncached_time
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
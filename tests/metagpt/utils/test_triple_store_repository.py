@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@File    : test_triple_store_repository.py
+@Desc    : Unit tests for triple_store_repository.py
+"""
+import time
+
+import pytest
+
+from metagpt.const import METAGPT_ROOT
+from metagpt.logs import logger
+from metagpt.repo_parser import RepoParser
+from metagpt.utils.di_graph_repository import DiGraphRepository
+from metagpt.utils.graph_repository import SPO, GraphKeyword, GraphRepository
+from metagpt.utils.triple_store_repository import TripleStoreRepository
+
+
+@pytest.mark.asyncio
+async def test_triple_store_repository(tmp_path):
+    graph = TripleStoreRepository(name="test", root=tmp_path)
+    await graph.insert_many(
+        [
+            SPO(subject="main.py:Game:draw", predicate="method:hasDescription", object_="Draw image"),
+            SPO(subject="main.py:Game:draw", predicate="method:hasDescription", object_="Show image"),
+            SPO(subject="main.py:Game:draw", predicate="method:hasReturn", object_="Show image"),
+            SPO(subject="main.py:Game", predicate="has_class_method", object_="main.py:Game:draw"),
+        ]
+    )
+    await graph.insert(subject="main.py:Game:draw", predicate="method:hasReturn", object_="Show image")
+    assert len(graph) == 4
+
+    rows = await graph.select(subject="main.py:Game:draw", object_="Show image")
+    assert {r.predicate for r in rows} == {"method:hasDescription", "method:hasReturn"}  # multiple predicates
+    assert len(await graph.select(predicate="method:hasDescription")) == 2
+    assert len(await graph.select(object_="Show image")) == 2
+    assert len(await graph.select(subject="main.py:Game:draw")) == 3
+    assert len(await graph.select(subject="main.py:Game", predicate="has_class_method")) == 1
+    assert len(await graph.select(predicate="method:hasReturn", object_="Draw image")) == 0
+    assert len(await graph.select()) == 4
+
+    assert await graph.delete(predicate="method:hasDescription") == 2
+    assert await graph.delete(predicate="method:hasDescription") == 0
+    assert len(graph) == 2
+    assert "method:hasDescription" not in graph._pos
+
+    await graph.save()
+    assert graph.pathname.exists()
+    loaded = await TripleStoreRepository.load_from(graph.pathname)
+    assert {r.model_dump_json() for r in await loaded.select()} == {r.model_dump_json() for r in await graph.select()}
+
+
+@pytest.mark.asyncio
+async def test_load_di_graph_repository(tmp_path):
+    di_graph = DiGraphRepository(name="test", root=tmp_path)
+    await di_graph.insert(subject="a", predicate="p", object_="b")
+    await di_graph.insert(subject="b", predicate="q", object_="c")
+
+    graph = TripleStoreRepository(name="test", root=tmp_path).load_json(di_graph.json())
+
+    assert [r.model_dump() for r in await graph.select()] == [r.model_dump() for r in await di_graph.select()]
+
+
+@pytest.mark.asyncio
+async def test_triple_store_benchmark():
+    symbols = RepoParser(base_directory=METAGPT_ROOT / "metagpt").generate_symbols()
+    di_graph = DiGraphRepository(name="di_graph")
+    triple_store = TripleStoreRepository(name="triple_store")
+    for file_info in symbols:
+        await GraphRepository.update_graph_db_with_file_info(graph_db=di_graph, file_info=file_info)
+        await GraphRepository.update_graph_db_with_file_info(graph_db=triple_store, file_info=file_info)
+
+    async def select_all(graph: GraphRepository) -> int:
+        count = 0
+        for file_info in symbols[:100]:
+            count += len(await graph.select(subject=file_info.file))
+            count += len(await graph.select(subject=file_info.file, predicate=GraphKeyword.HAS_CLASS))
+        count += len(await graph.select(predicate=GraphKeyword.IS, object_=GraphKeyword.CLASS))
+        return count
+
+    start = time.perf_counter()
+    di_graph_count = await select_all(di_graph)
+    di_graph_time = time.perf_counter() - start
+    start = time.perf_counter()
+    triple_store_count = await select_all(triple_store)
+    triple_store_time = time.perf_counter() - start
+
+    logger.info(
+        f"{len(triple_store)} triples, select x201: DiGraphRepository {di_graph_time:.4f}s, "
+        f"TripleStoreRepository {triple_store_time:.4f}s"
+    )
+    # DiGraph keeps one predicate per (subject, object), so it never finds more triples than the triple store.
+    assert 0 < di_graph_count <= triple_store_count
+    assert triple_store_time < di_graph_time